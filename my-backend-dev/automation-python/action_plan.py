@@ -0,0 +1,121 @@
+# flake8: noqa
+
+import logging
+from collections import namedtuple
+
+# --- 상수 정의 ---
+# 동작별 대기 시간 기본값 (UI가 실제로 바뀌는 동작에만 대기를 붙임)
+DEFAULT_TIMINGS = {
+    "focus": 0, # 앱 활성화 (활성화 함수 자체에 대기 포함)
+    "clear": 0.1, # 입력창 비우기 후
+    "input_text": 0, # 텍스트 입력 후 (입력 백엔드가 값 반영을 확인함)
+    "paste_image": 0.8, # 이미지 붙여넣기 후 (전송 미리보기 창 표시)
+    "send_text": 0.1, # 텍스트 전송 후 (말풍선 추가, 입력창 비워짐)
+    "send_image": 0.5, # 이미지 전송 후 (미리보기 창 닫힘, 업로드 시작)
+}
+
+# 동작 자체의 예상 소요 시간 (대기 제외, 드라이런 비용 추정용)
+ACTION_OVERHEAD = {
+    "focus": 0.25, # osascript 실행 및 활성화 대기
+    "clear": 0.03, # Cmd+A, Delete
+    "input": 0.02, # 입력창 값 직접 설정 및 확인
+    "stage": 0.01, # 프로세스 내 클립보드 기록
+    "paste": 0.02, # Cmd+V
+    "send": 0.02, # Enter
+}
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 실행 계획의 동작 하나 (종류, 값, 실행 후 대기 시간)
+#   op: "focus" | "clear" | "input" | "stage" | "paste" | "send"
+#   value: input일 때 텍스트, stage일 때 클립보드 페이로드 (종류, 값), 그 외 None
+Action = namedtuple("Action", ["op", "value", "wait"])
+# 실행 단위 하나 (이 단위로 전송되는 메시지 인덱스 목록, 메시지 타입, 동작 목록)
+PlanStep = namedtuple("PlanStep", ["indices", "type", "actions"])
+
+# --- 함수 정의 ---
+
+# 연속된 이미지 메시지를 하나의 붙여넣기 단위로 묶습니다.
+def _group_messages(prepared_messages):
+    """보낼 메시지를 전송 단위로 묶습니다. 연속된 이미지 메시지는 한 번의 다중 붙여넣기로 합칩니다."""
+    units = []
+    for msg in prepared_messages:
+        if not msg.payload: # 빈 메시지 등 보낼 내용이 없는 항목
+            continue
+        if msg.type == "image" and units and units[-1][0] == "image":
+            units[-1][1].append(msg)
+        else:
+            units.append((msg.type, [msg]))
+    return units
+
+# 이미지 메시지 묶음의 클립보드 페이로드를 결정합니다.
+def _image_payload(messages):
+    """
+    이미지 메시지 묶음의 클립보드 페이로드를 반환합니다. 한 장이면 미리 준비된 페이로드를 그대로 씁니다.
+    이미지를 준비하지 않은 메시지(드라이런)는 페이로드의 원본 파일 목록을 씁니다.
+    """
+    if len(messages) == 1:
+        return messages[0].payload
+    return ("files", [path for msg in messages for path in ([image.path for image in msg.images] or msg.payload[1])])
+
+# 사용자 한 명의 메시지를 실행 계획으로 컴파일합니다.
+def compile_message_plan(prepared_messages, timings=None):
+    """
+    준비된 메시지 목록(PreparedMessage)을 실행 계획(PlanStep 목록)으로 컴파일합니다.
+
+    - 앱 활성화와 입력창 비우기는 계획 시작 시 한 번만 수행합니다 (전송 후 입력창은 비어 있고 포커스 유지).
+    - 연속된 이미지 메시지는 파일 URL 목록 하나로 합쳐 한 번에 붙여넣습니다.
+    - 텍스트는 입력창에 직접 넣고(클립보드 미사용), 이미지는 클립보드에 올려 붙여넣습니다.
+    - 대기는 붙여넣기/전송처럼 UI가 바뀌는 동작에만 붙입니다.
+    """
+    timings = {**DEFAULT_TIMINGS, **(timings or {})}
+    steps = []
+    for msg_type, messages in _group_messages(prepared_messages):
+        actions = []
+        if not steps:
+            actions.append(Action("focus", None, timings["focus"]))
+            actions.append(Action("clear", None, timings["clear"]))
+        if msg_type == "text":
+            actions.append(Action("input", messages[0].content, timings["input_text"]))
+            actions.append(Action("send", None, timings["send_text"]))
+        else:
+            actions.append(Action("stage", _image_payload(messages), 0))
+            actions.append(Action("paste", None, timings["paste_image"]))
+            actions.append(Action("send", None, timings["send_image"]))
+        steps.append(PlanStep([msg.index for msg in messages], msg_type, actions))
+    return steps
+
+# 실행 계획의 예상 비용을 계산합니다 (드라이런).
+def estimate_plan(plan):
+    """실행 계획의 동작 수, 대기 합계, 동작 자체 소요 시간, 총 예상 시간(초)을 반환합니다."""
+    actions = [action for step in plan for action in step.actions]
+    waits = sum(action.wait for action in actions)
+    overhead = sum(ACTION_OVERHEAD.get(action.op, 0) for action in actions)
+    return {
+        "steps": len(plan),
+        "actions": len(actions),
+        "wait_seconds": round(waits, 3),
+        "overhead_seconds": round(overhead, 3),
+        "total_seconds": round(waits + overhead, 3),
+    }
+
+# 실행 계획을 사람이 읽을 수 있는 형태로 변환합니다.
+def describe_plan(plan):
+    """실행 계획을 단계별 동작 설명 목록으로 반환합니다 (로그/드라이런 응답용)."""
+    described = []
+    for step in plan:
+        ops = []
+        for action in step.actions:
+            if action.op == "input":
+                ops.append(f"input({len(action.value)}자)")
+            elif action.op == "stage":
+                kind, value = action.value
+                detail = f"{len(value)}개 파일" if kind == "files" else (f"{len(value)}자" if kind == "text" else f"{len(value)}바이트")
+                ops.append(f"stage({kind}, {detail})")
+            else:
+                ops.append(action.op)
+            if action.wait:
+                ops[-1] += f"+{action.wait:g}s"
+        described.append({"messages": [i + 1 for i in step.indices], "type": step.type, "actions": ops})
+    return described
@@ -0,0 +1,78 @@
+# flake8: noqa
+
+import logging
+import kakao_ax
+from ocr_matcher import OutcomeMatcher, normalize_text
+
+# --- 상수 정의 ---
+# OCR 결과 문자열
+OCR_SUCCESS = "친구 등록에 성공했습니다"
+OCR_ALREADY_REGISTERED = "이미 등록된 친구입니다"
+OCR_NOT_ALLOWED = "입력하신 번호를 친구로 추가할 수 없습니다"
+OCR_SUCCESS_PATTERNS = [ # 친구 추가 성공 문자열 목록
+    "친구 등록이 완료되었습니다",
+    OCR_SUCCESS,
+    "친구 추가가 완료되었습니다",
+    "친구 추가에 성공했습니다"
+]
+# 결과 라벨별 OCR 패턴 (신뢰도 동점 시 먼저 선언된 라벨 우선)
+ADD_FRIEND_OUTCOME_PATTERNS = {
+    "success": OCR_SUCCESS_PATTERNS,
+    "already_registered": [OCR_ALREADY_REGISTERED],
+    "not_allowed": [OCR_NOT_ALLOWED],
+}
+ADD_FRIEND_MATCHER = OutcomeMatcher(ADD_FRIEND_OUTCOME_PATTERNS) # 오인식 허용 결과 분류기
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 함수 정의 ---
+
+# 결과 라벨을 (status, reason)으로 변환합니다.
+def add_friend_outcome(label):
+    """결과 라벨(success/already_registered/not_allowed)을 로그와 함께 (status, reason)으로 변환합니다."""
+    if label == "success":
+        reason = "친구 추가 성공."
+        log.info(f"[성공] {reason}")
+    elif label == "already_registered":
+        reason = "이미 등록된 친구입니다."
+        log.warning(f"[건너뜀] {reason}")
+    else:
+        reason = "이 번호는 친구로 추가할 수 없습니다."
+        log.error(f"[실패] {reason}")
+    return label, reason
+
+# OCR 텍스트로 친구 추가 결과를 분류합니다.
+def classify_add_friend_result(result_text):
+    """
+    OCR 텍스트를 퍼지 매처로 분류해 (status, reason)을 반환합니다.
+    한두 글자 오인식은 자모 단위 편집 거리로 흡수합니다.
+    """
+    match = ADD_FRIEND_MATCHER.best(result_text)
+    if match is None or match.confidence < ADD_FRIEND_MATCHER.min_confidence:
+        reason = f"OCR을 통한 결과 메시지 인식 불가: {result_text.strip()}"
+        log.error(f"[실패] {reason}")
+        return "fail", reason
+
+    log.info(f"OCR 결과 분류: {match.label} (신뢰도={match.confidence:.2f}, 패턴='{match.pattern}')")
+    return add_friend_outcome(match.label)
+
+# KakaoTalk 창들의 텍스트 요소에서 결과 문구를 찾습니다.
+def find_add_friend_result_text(app):
+    """
+    KakaoTalk 창(결과 팝업/친구 추가 대화 상자)의 텍스트 요소 중 결과 문구와 일치하는 것을 찾아
+    (라벨, 텍스트)를 반환합니다. 화면에 그려진 문자열을 그대로 읽으므로 오인식 없이 정확히 비교합니다. 없으면 None.
+    짧은 간격으로 반복 호출되므로 메인 창과 목록 컨테이너 하위(친구/채팅 목록 행이 수천 개일 수 있음)는 탐색하지 않습니다.
+    """
+    main = kakao_ax.main_window(app)
+    for window in kakao_ax.windows(app):
+        if window == main:
+            continue
+        for node in window.find_all(lambda n: n.role in kakao_ax.TEXT_ROLES, prune_roles=kakao_ax.LIST_ROLES):
+            text = normalize_text(node.text())
+            if not text:
+                continue
+            for label, patterns in ADD_FRIEND_OUTCOME_PATTERNS.items():
+                if any(normalize_text(pattern) in text for pattern in patterns):
+                    return label, node.text()
+    return None
@@ -0,0 +1,180 @@
+# flake8: noqa
+
+import time
+import logging
+import threading
+from collections import deque, namedtuple
+import kakao_ax
+
+# --- 상수 정의 ---
+LOCATOR_MAX_DEPTH = 10 # 컨트롤 탐색 최대 깊이
+LOCATOR_PRUNE_ROLES = ("AXTable", "AXOutline", "AXList") # 하위를 탐색하지 않는 역할 (친구/채팅 목록 행이 수천 개일 수 있음)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 컨트롤 찾기 조건
+#   window: "main"(메인 창) | "focused"(포커스된 창) | 창 제목에 포함되는 문자열 목록
+#   role: 역할, title/description/identifier: 정확히 일치해야 하는 값 (문자열 또는 후보 목록, None이면 비교 안 함)
+Locator = namedtuple("Locator", ["window", "role", "title", "description", "identifier"],
+                     defaults=("focused", None, None, None, None))
+
+# KakaoTalk 컨트롤 찾기 조건 (레이블은 Accessibility Inspector로 확인, 버전에 따라 다르면 여기만 수정)
+KAKAO_LOCATORS = {
+    # 친구 탭 상단의 친구 추가 아이콘 버튼
+    "add_friend_icon": Locator(window="main", role="AXButton", description=("친구 추가", "Add Friend")),
+    # 친구 추가 대화 상자의 노란색 확인 버튼
+    "add_friend_confirm": Locator(window=("친구 추가", "친구등록"), role="AXButton",
+                                  title=("친구 추가", "추가", "확인", "Add Friend", "Add", "OK")),
+    # 채팅창 메시지 입력란 옆의 전송 버튼 (입력 내용이 있을 때만 활성화)
+    "send_button": Locator(window="focused", role="AXButton", title=("전송", "Send")),
+}
+
+# --- 함수 정의 ---
+
+# 값이 찾기 조건(문자열 또는 후보 목록)과 일치하는지 확인합니다.
+def _value_matches(value, expected):
+    if expected is None:
+        return True
+    if not isinstance(value, str) or not value:
+        return False
+    candidates = (expected,) if isinstance(expected, str) else expected
+    value = kakao_ax.normalize_title(value)
+    return any(value == kakao_ax.normalize_title(candidate) for candidate in candidates)
+
+# 노드가 찾기 조건에 맞는지 확인합니다.
+def node_matches(node, locator):
+    """노드의 역할/제목/설명/식별자가 찾기 조건과 모두 일치하는지 반환합니다."""
+    if locator.role is not None and node.role != locator.role:
+        return False
+    return (_value_matches(node.title, locator.title)
+            and _value_matches(node.get("AXDescription"), locator.description)
+            and _value_matches(node.get("AXIdentifier"), locator.identifier))
+
+# 창 아래에서 조건에 맞는 첫 컨트롤을 찾습니다.
+def find_control(window, locator, max_depth=LOCATOR_MAX_DEPTH, prune_roles=LOCATOR_PRUNE_ROLES):
+    """창 아래를 너비 우선으로 탐색해 조건에 맞는 첫 노드를 반환합니다. 목록 컨테이너 하위는 건너뜁니다."""
+    queue = deque([(window, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        if node_matches(node, locator):
+            return node
+        if depth < max_depth and node.role not in prune_roles:
+            queue.extend((child, depth + 1) for child in node.children())
+    return None
+
+# 찾기 조건의 대상 창을 찾습니다.
+def resolve_window(app, window):
+    """찾기 조건의 window 값에 해당하는 창 노드를 반환합니다. 없으면 None."""
+    if window == "main":
+        return kakao_ax.main_window(app)
+    if window == "focused":
+        return kakao_ax.focused_window(app)
+    markers = (window,) if isinstance(window, str) else window
+    for candidate in kakao_ax.windows(app):
+        title = kakao_ax.normalize_title(candidate.title)
+        if any(marker in title for marker in markers):
+            return candidate
+    return None
+
+# 노드의 화면 중앙 좌표를 반환합니다.
+def center_of(node):
+    """노드 화면 영역의 중앙 (x, y)를 반환합니다. 위치를 알 수 없으면 None."""
+    frame = node.frame()
+    if frame is None:
+        return None
+    x, y, w, h = frame
+    return (x + w // 2, y + h // 2)
+
+# --- 클래스 정의 ---
+
+class AXLocator:
+    """
+    이름 붙인 찾기 조건으로 KakaoTalk 컨트롤을 Accessibility 트리에서 찾는 엔진입니다.
+    찾은 요소 참조는 창별로 캐시해 같은 창이 살아 있는 동안 트리를 다시 탐색하지 않고,
+    AXPress로 바로 누르거나 클릭 좌표를 돌려줍니다. 찾지 못하면 호출 측이 화면 인식으로 대체합니다.
+    """
+
+    def __init__(self, locators=None, app_provider=kakao_ax.kakao_app):
+        self.locators = dict(KAKAO_LOCATORS if locators is None else locators)
+        self._app_provider = app_provider
+        self._lock = threading.Lock()
+        self._cache = {} # 조건 이름 -> (창 노드, 컨트롤 노드)
+        self.hits = 0
+        self.misses = 0
+
+    # 이름 붙인 컨트롤을 찾습니다.
+    def locate(self, name):
+        """
+        이름 붙인 컨트롤 노드를 반환합니다. 같은 창에서 찾은 적이 있고 요소가 살아 있으면 캐시된 참조를 씁니다.
+        Accessibility를 쓸 수 없거나 찾지 못하면 None.
+        """
+        locator = self.locators[name]
+        app = self._app_provider()
+        if app is None:
+            return None
+        window = resolve_window(app, locator.window)
+        if window is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(name)
+        if cached is not None:
+            cached_window, node = cached
+            if cached_window == window and node.role is not None and node_matches(node, locator):
+                with self._lock:
+                    self.hits += 1
+                return node
+        started = time.monotonic()
+        node = find_control(window, locator)
+        with self._lock:
+            if node is not None:
+                self._cache[name] = (window, node)
+            else:
+                self._cache.pop(name, None)
+            self.misses += 1
+        log.debug(f"AX 컨트롤 탐색 '{name}': {'찾음' if node is not None else '없음'} "
+                  f"({time.monotonic() - started:.3f}초)")
+        return node
+
+    # 이름 붙인 컨트롤의 클릭 좌표를 반환합니다.
+    def click_point(self, name):
+        """컨트롤 화면 영역의 중앙 좌표를 반환합니다. 찾지 못하면 None."""
+        node = self.locate(name)
+        return center_of(node) if node is not None else None
+
+    # 이름 붙인 컨트롤을 누릅니다.
+    def press(self, name, click=None):
+        """
+        컨트롤을 AXPress로 누르고, 지원하지 않으면 click(x, y)로 중앙을 클릭합니다.
+        누르기에 성공하면 True, 컨트롤을 찾지 못했거나 누를 수 없으면 False (호출 측이 화면 인식으로 대체).
+        """
+        node = self.locate(name)
+        if node is None:
+            return False
+        if node.get("AXEnabled") is False:
+            log.warning(f"AX 컨트롤 '{name}'이(가) 비활성 상태입니다.")
+            return False
+        if "AXPress" in node.actions() and node.perform("AXPress"):
+            log.info(f"AX 컨트롤 '{name}' 누름 (AXPress).")
+            return True
+        point = center_of(node)
+        if click is not None and point is not None:
+            click(*point)
+            log.info(f"AX 컨트롤 '{name}' 위치 클릭: {point}")
+            return True
+        return False
+
+    # 캐시된 참조를 버립니다.
+    def invalidate(self, name=None):
+        """이름 붙인 컨트롤(없으면 전체)의 캐시된 참조를 버립니다."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    # 캐시 상태를 반환합니다.
+    def stats(self):
+        """캐시된 컨트롤 수와 적중/탐색 수를 반환합니다."""
+        with self._lock:
+            return {"cached": len(self._cache), "hits": self.hits, "misses": self.misses}
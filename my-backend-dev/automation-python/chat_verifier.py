@@ -0,0 +1,133 @@
+# flake8: noqa
+
+import logging
+from collections import namedtuple
+import cv2
+import numpy as np
+
+# --- 상수 정의 ---
+# 대화 영역 (창 기준 비율)
+CHAT_TOP_CUT_RATIO = 0.12 # 상단 헤더(상대 이름/메뉴) 제외 비율
+CHAT_BOTTOM_CUT_RATIO = 0.22 # 하단 입력창 제외 비율
+MY_BUBBLE_RIGHT_EDGE_RATIO = 0.8 # 내 말풍선의 오른쪽 끝은 대화 영역 너비의 이 비율보다 오른쪽에 있음
+
+# 내 텍스트 말풍선 (카카오톡 노란색 #FEE500)
+BUBBLE_YELLOW_LOWER = np.array([20, 150, 200]) # HSV 하한값
+BUBBLE_YELLOW_UPPER = np.array([35, 255, 255]) # HSV 상한값
+TEXT_BUBBLE_MIN_AREA = 400 # 텍스트 말풍선 최소 면적
+TEXT_BUBBLE_MIN_YELLOW_RATIO = 0.5 # 텍스트 말풍선으로 판정할 노란색 픽셀 비율
+
+# 이미지 말풍선 (배경과 다른 큰 사각형)
+BACKGROUND_STRIP_RATIO = 0.05 # 배경색 추정에 사용할 왼쪽 띠 너비 비율
+BACKGROUND_DIFF_THRESHOLD = 25 # 배경과 다르다고 판정할 채널 차이
+IMAGE_BUBBLE_MIN_SIDE = 60 # 이미지 말풍선 최소 변 길이(px)
+
+# 전송 실패 표시 (빨간 재전송 아이콘)
+ERROR_RED_LOWER_1 = np.array([0, 120, 120]) # HSV 빨간색 하한값 (낮은 색상)
+ERROR_RED_UPPER_1 = np.array([10, 255, 255]) # HSV 빨간색 상한값 (낮은 색상)
+ERROR_RED_LOWER_2 = np.array([170, 120, 120]) # HSV 빨간색 하한값 (높은 색상)
+ERROR_RED_UPPER_2 = np.array([180, 255, 255]) # HSV 빨간색 상한값 (높은 색상)
+ERROR_MARKER_MIN_AREA = 30 # 실패 아이콘 최소 면적
+ERROR_MARKER_MAX_AREA = 1500 # 실패 아이콘 최대 면적
+ERROR_MARKER_Y_MARGIN = 10 # 실패 아이콘과 말풍선의 세로 위치 허용 오차(px)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 감지된 말풍선 (종류: "text" 또는 "image", 대화 영역 기준 좌표, 실패 표시 여부)
+Bubble = namedtuple("Bubble", ["kind", "x", "y", "w", "h", "error"])
+
+# --- 함수 정의 ---
+
+# 창 캡처에서 대화 영역만 잘라냅니다.
+def crop_conversation_area(frame_bgr):
+    """창 캡처에서 상단 헤더와 하단 입력창을 제외한 대화 영역만 잘라냅니다."""
+    height = frame_bgr.shape[0]
+    top = int(height * CHAT_TOP_CUT_RATIO)
+    bottom = height - int(height * CHAT_BOTTOM_CUT_RATIO)
+    return frame_bgr[top:bottom, :]
+
+# 마스크에서 외곽 컨투어의 경계 사각형 목록을 반환합니다.
+def _bounding_rects(mask):
+    """마스크에서 외곽 컨투어의 (x, y, w, h, area) 목록을 반환합니다."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [cv2.boundingRect(c) + (cv2.contourArea(c),) for c in contours]
+
+# 대화 영역에서 내가 보낸 말풍선(텍스트/이미지)과 실패 표시를 한 번에 감지합니다.
+def detect_bubbles(area_bgr):
+    """
+    대화 영역에서 내가 보낸 말풍선(텍스트/이미지)과 실패 표시를 한 번에 감지합니다.
+    위에서 아래 순서로 정렬된 Bubble 목록을 반환합니다.
+    """
+    area_h, area_w = area_bgr.shape[:2]
+    if area_h == 0 or area_w == 0:
+        return []
+    hsv = cv2.cvtColor(area_bgr, cv2.COLOR_BGR2HSV)
+    right_edge_min = int(area_w * MY_BUBBLE_RIGHT_EDGE_RATIO)
+    kernel = np.ones((5, 5), np.uint8)
+
+    # 1. 노란색 텍스트 말풍선
+    yellow = cv2.inRange(hsv, BUBBLE_YELLOW_LOWER, BUBBLE_YELLOW_UPPER)
+    yellow_closed = cv2.morphologyEx(yellow, cv2.MORPH_CLOSE, kernel)
+    candidates = []
+    for x, y, w, h, area in _bounding_rects(yellow_closed):
+        if area >= TEXT_BUBBLE_MIN_AREA and x + w >= right_edge_min:
+            candidates.append(("text", x, y, w, h))
+
+    # 2. 이미지 말풍선: 배경색과 다른 큰 사각형 중 노란색이 아닌 것
+    strip_w = max(1, int(area_w * BACKGROUND_STRIP_RATIO))
+    background = np.median(area_bgr[:, :strip_w].reshape(-1, 3), axis=0)
+    diff = np.abs(area_bgr.astype(np.int16) - background.astype(np.int16)).max(axis=2)
+    foreground = np.where(diff > BACKGROUND_DIFF_THRESHOLD, 255, 0).astype(np.uint8)
+    foreground = cv2.morphologyEx(foreground, cv2.MORPH_CLOSE, kernel)
+    for x, y, w, h, _ in _bounding_rects(foreground):
+        if w < IMAGE_BUBBLE_MIN_SIDE or h < IMAGE_BUBBLE_MIN_SIDE or x + w < right_edge_min:
+            continue
+        yellow_ratio = cv2.countNonZero(yellow[y:y + h, x:x + w]) / float(w * h)
+        if yellow_ratio < TEXT_BUBBLE_MIN_YELLOW_RATIO:
+            candidates.append(("image", x, y, w, h))
+
+    # 3. 빨간 실패 표시
+    red = cv2.inRange(hsv, ERROR_RED_LOWER_1, ERROR_RED_UPPER_1) | cv2.inRange(hsv, ERROR_RED_LOWER_2, ERROR_RED_UPPER_2)
+    markers = [(x + w // 2, y + h // 2) for x, y, w, h, area in _bounding_rects(red)
+               if ERROR_MARKER_MIN_AREA <= area <= ERROR_MARKER_MAX_AREA]
+
+    bubbles = []
+    for kind, x, y, w, h in candidates:
+        error = any(mx < x and y - ERROR_MARKER_Y_MARGIN <= my <= y + h + ERROR_MARKER_Y_MARGIN
+                    for mx, my in markers)
+        bubbles.append(Bubble(kind, x, y, w, h, error))
+    bubbles.sort(key=lambda b: b.y + b.h)
+    log.debug(f"말풍선 감지: {len(bubbles)}개 (실패 표시 {len(markers)}개)")
+    return bubbles
+
+# 감지된 말풍선을 보낸 메시지 순서와 맞춰 메시지별 전송 상태를 판정합니다.
+def match_message_sequence(bubbles, expected_types):
+    """
+    감지된 말풍선을 보낸 메시지 순서와 아래에서부터 맞춰 메시지별 전송 상태를 판정합니다.
+
+    Args:
+        bubbles (list): detect_bubbles() 결과 (위에서 아래 순서)
+        expected_types (list): 보낸 순서대로의 메시지 타입 목록 ("text" / "image")
+
+    Returns:
+        list: [{"index", "type", "status", "reason"}, ...]
+            status: "delivered" | "failed" | "mismatch" | "missing"
+    """
+    tail = bubbles[-len(expected_types):] if expected_types else []
+    offset = len(expected_types) - len(tail) # 화면에 보이지 않는 앞쪽 메시지 수
+    statuses = []
+    for index, msg_type in enumerate(expected_types):
+        if index < offset:
+            statuses.append({"index": index, "type": msg_type, "status": "missing",
+                             "reason": "대화 하단에서 해당 말풍선을 찾지 못함"})
+            continue
+        bubble = tail[index - offset]
+        if bubble.error:
+            status, reason = "failed", "전송 실패 표시 감지"
+        elif bubble.kind != msg_type:
+            status, reason = "mismatch", f"{msg_type} 메시지 위치에 {bubble.kind} 말풍선 감지"
+        else:
+            status, reason = "delivered", ""
+        statuses.append({"index": index, "type": msg_type, "status": status, "reason": reason})
+    return statuses
@@ -0,0 +1,157 @@
+# flake8: noqa
+
+import json
+import time
+import socket
+import logging
+import pathlib
+import threading
+from collections import Counter, namedtuple
+
+# --- 상수 정의 ---
+BASE_DIR = pathlib.Path(__file__).parent.absolute()
+CLICK_STRATEGY_PATH = BASE_DIR / "click-strategies.json" # 호스트/창 크기별 전략 통계 저장 경로
+STRATEGY_EXPLORE_EVERY = 20 # 이만큼 실행할 때마다 한 번은 최선이 아닌 전략을 먼저 시도 (0이면 탐색 안 함)
+STRATEGY_PRIOR_SUCCESSES = 1 # 성공률 사전값 (시도 기록이 없을 때 1/2 = 50%로 시작)
+STRATEGY_PRIOR_ATTEMPTS = 2
+STRATEGY_LATENCY_ALPHA = 0.3 # 소요 시간 지수 이동 평균 가중치 (최근 시도 반영 비율)
+STRATEGY_DEFAULT_LATENCY = 1.0 # 소요 시간 기록이 없는 전략의 추정 소요 시간(초)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 감지 전략 하나 (이름, 클릭 위치 찾기 함수 locate() -> (x, y) 또는 None, 화면 확인 없이 위치를 추정하는지 여부)
+ClickStrategy = namedtuple("ClickStrategy", ["name", "locate", "blind"])
+# 전략 실행 결과 (성공한 전략 이름 또는 None, 클릭 위치, 시도한 전략 이름 목록)
+StrategyOutcome = namedtuple("StrategyOutcome", ["strategy", "point", "tried"])
+
+# --- 클래스 정의 ---
+
+class StrategySelector:
+    """
+    클릭 대상별로 감지 전략의 성공률과 소요 시간을 기록하고, 기대 비용(소요 시간 / 성공률)이 가장 낮은 전략부터
+    한 번씩 시도하는 선택기입니다. 통계는 호스트와 창 크기별로 나눠 디스크에 저장하며,
+    explore_every번마다 한 번은 다른 전략을 먼저 시도해 환경이 바뀌었을 때 더 빠른 전략을 다시 찾습니다.
+    """
+
+    def __init__(self, path=CLICK_STRATEGY_PATH, host=None, explore_every=STRATEGY_EXPLORE_EVERY, clock=time.monotonic):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.host = host or socket.gethostname()
+        self.explore_every = explore_every
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats = {} # "호스트|창 크기|대상" -> {전략 이름: {"attempts", "successes", "latency"}}
+        self._runs = Counter() # 키 -> 실행 횟수 (탐색 주기 계산용, 저장하지 않음)
+        self.explored = 0
+        self._load()
+
+    def _key(self, target, context):
+        return f"{self.host}|{context or '-'}|{target}"
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            self._stats = json.loads(self.path.read_text(encoding="utf-8"))
+            log.info(f"클릭 전략 통계 로드: {len(self._stats)}개 대상")
+        except Exception as e:
+            log.warning(f"클릭 전략 통계 로드 실패: {e}")
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._stats, ensure_ascii=False, indent=1), encoding="utf-8")
+            tmp_path.replace(self.path)
+        except Exception as e:
+            log.warning(f"클릭 전략 통계 저장 실패: {e}")
+
+    # 전략의 기대 비용을 계산합니다.
+    def _cost(self, entry):
+        """소요 시간 / 성공률 (성공률은 사전값 포함). 기록이 없으면 기본 소요 시간으로 추정합니다."""
+        entry = entry or {}
+        successes = entry.get("successes", 0) + STRATEGY_PRIOR_SUCCESSES
+        attempts = entry.get("attempts", 0) + STRATEGY_PRIOR_ATTEMPTS
+        latency = entry.get("latency", STRATEGY_DEFAULT_LATENCY)
+        return latency / (successes / attempts)
+
+    # 시도할 전략 순서를 정합니다.
+    def order(self, target, strategies, context=None):
+        """
+        기대 비용이 낮은 순으로 전략 목록을 반환합니다 (기록이 같으면 주어진 순서 유지).
+        탐색 차례면 시도 횟수가 가장 적은 다른 전략을 맨 앞으로 옮깁니다.
+        """
+        key = self._key(target, context)
+        with self._lock:
+            table = self._stats.get(key, {})
+            self._runs[key] += 1
+            runs = self._runs[key]
+            ranked = sorted(strategies, key=lambda s: self._cost(table.get(s.name)))
+            if self.explore_every and len(ranked) > 1 and runs % self.explore_every == 0:
+                rest = ranked[1:]
+                pick = min(rest, key=lambda s: table.get(s.name, {}).get("attempts", 0))
+                ranked.remove(pick)
+                ranked.insert(0, pick)
+                self.explored += 1
+                log.info(f"클릭 전략 탐색: {target}에 '{pick.name}' 먼저 시도")
+        return ranked
+
+    # 전략 시도 결과를 기록합니다.
+    def record(self, target, strategy, success, seconds, context=None):
+        """전략 한 번 시도의 성공 여부와 소요 시간을 기록하고 저장합니다."""
+        key = self._key(target, context)
+        with self._lock:
+            entry = self._stats.setdefault(key, {}).setdefault(
+                strategy, {"attempts": 0, "successes": 0, "latency": round(seconds, 4)})
+            entry["attempts"] += 1
+            entry["successes"] += 1 if success else 0
+            entry["latency"] = round((1 - STRATEGY_LATENCY_ALPHA) * entry["latency"] + STRATEGY_LATENCY_ALPHA * seconds, 4)
+            self._save()
+
+    # 전략을 순서대로 한 번씩 시도합니다.
+    def run(self, target, strategies, click, confirm=None, context=None):
+        """
+        정해진 순서로 전략마다 위치를 한 번 찾아 click(x, y)하고, confirm()이 있으면 클릭 결과(창 열림 등)를 확인합니다.
+        처음 성공한 전략에서 멈추고 StrategyOutcome을 반환합니다 (모두 실패하면 strategy=None).
+        confirm이 없으면 위치를 찾은 것을 성공으로 보되, 화면을 보지 않고 위치를 추정하는(blind) 전략은
+        결과를 알 수 없으므로 기록하지 않습니다.
+        """
+        tried = []
+        for strategy in self.order(target, strategies, context):
+            tried.append(strategy.name)
+            started = self._clock()
+            try:
+                point = strategy.locate()
+            except Exception as e:
+                log.warning(f"클릭 전략 '{strategy.name}' 위치 찾기 오류: {e}")
+                point = None
+            success = point is not None
+            if success:
+                click(*point)
+                if confirm is not None:
+                    success = bool(confirm())
+            seconds = self._clock() - started
+            if confirm is not None or not strategy.blind:
+                self.record(target, strategy.name, success, seconds, context)
+            log.info(f"클릭 전략 '{strategy.name}' ({target}): {'성공' if success else '실패'}, {seconds:.2f}초")
+            if success:
+                return StrategyOutcome(strategy.name, point, tried)
+        return StrategyOutcome(None, None, tried)
+
+    # 통계를 반환합니다.
+    def stats(self):
+        """이 호스트의 대상별 전략 통계(기대 비용 순)와 탐색 횟수를 반환합니다."""
+        with self._lock:
+            targets = {}
+            for key, table in self._stats.items():
+                host, _, rest = key.partition("|")
+                if host != self.host:
+                    continue
+                targets[rest] = sorted(({"strategy": name, "cost": round(self._cost(entry), 3), **entry}
+                                        for name, entry in table.items()), key=lambda item: item["cost"])
+            return {"host": self.host, "targets": targets, "explored": self.explored}
+
+
+# 앱 전체가 함께 쓰는 클릭 전략 선택기
+CLICK_STRATEGIES = StrategySelector()
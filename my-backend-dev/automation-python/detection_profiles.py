@@ -0,0 +1,312 @@
+# flake8: noqa
+
+import json
+import time
+import logging
+import pathlib
+import threading
+from collections import namedtuple
+import cv2
+import numpy as np
+import screen_capture
+try:
+    from AppKit import NSWorkspace, NSBundle, NSScreen, NSUserDefaults
+except ImportError:
+    # macOS가 아닌 환경: 환경 감지 불가 (기본 프로필 사용)
+    NSWorkspace = NSBundle = NSScreen = NSUserDefaults = None
+
+# --- 상수 정의 ---
+BASE_DIR = pathlib.Path(__file__).parent.absolute()
+IMAGE_DIR = BASE_DIR / "images" # 기본 프로필 템플릿 경로
+PROFILE_DIR = BASE_DIR / "detection-profiles" # 보정된 프로필 저장 경로 (프로필마다 하위 디렉토리)
+PROFILE_FILE = "profile.json" # 프로필 디렉토리 안의 설정 파일
+KAKAO_BUNDLE_ID = "com.kakao.KakaoTalk"
+
+# 기본 프로필 (밝은 테마에서 맞춘 값, 보정된 프로필에 없는 항목은 여기서 가져옴)
+BASE_TEMPLATES = {
+    "add_icon": str(IMAGE_DIR / "add_icon.png"), # 친구 추가 아이콘
+    "add_btn": str(IMAGE_DIR / "add_btn.png"), # 친구 추가 확인 버튼
+}
+BASE_COLORS = { # HSV 색상 범위 (하한, 상한)
+    "yellow": ([15, 60, 120], [45, 255, 255]), # 노란색 버튼
+    "gray": ([0, 0, 80], [180, 30, 200]), # 회색 버튼
+}
+BASE_ICON_AREA = (20, 500) # 친구 추가 아이콘 컨투어 면적 범위 (최소, 최대)
+BASE_CONFIDENCE = {"add_icon": 0.6, "add_btn": 0.7} # 템플릿 매칭 신뢰도
+
+# 보정 상수
+CALIBRATION_SAMPLES = 3 # 보정 시 캡처할 프레임 수
+CALIBRATION_INTERVAL = 0.2 # 보정 프레임 사이 간격(초)
+CALIBRATION_PERCENTILES = (2, 98) # 색상 범위를 정할 HSV 백분위 (양 끝 이상치 제외)
+CALIBRATION_HSV_MARGIN = (5, 30, 30) # 백분위 범위 바깥으로 넓힐 여유 (H, S, V)
+CALIBRATION_MIN_SATURATION = 60 # 버튼 색으로 보는 최소 채도 (글자/테두리 픽셀 제외)
+CALIBRATION_AREA_RANGE = (0.5, 2.0) # 보정한 아이콘 면적 대비 허용 범위 배수
+CALIBRATION_TARGETS = { # 보정 대상 -> 템플릿 이름, 색상 이름
+    "add_icon": ("add_icon", None),
+    "confirm_button": ("add_btn", "yellow"),
+}
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 감지 환경 (KakaoTalk 버전, 화면 모드 light/dark, 화면 배율)
+DetectionEnvironment = namedtuple("DetectionEnvironment", ["app_version", "appearance", "scale"])
+
+# --- 함수 정의 ---
+
+# 현재 감지 환경을 읽습니다.
+def detect_environment():
+    """실행 중인 KakaoTalk 버전, 시스템 화면 모드, 주 화면 배율을 DetectionEnvironment로 반환합니다 (모르는 항목은 None)."""
+    if NSWorkspace is None:
+        return DetectionEnvironment(None, None, None)
+    version = None
+    for app in NSWorkspace.sharedWorkspace().runningApplications():
+        if (app.bundleIdentifier() or "") == KAKAO_BUNDLE_ID:
+            bundle = NSBundle.bundleWithURL_(app.bundleURL()) if app.bundleURL() is not None else None
+            version = str(bundle.objectForInfoDictionaryKey_("CFBundleShortVersionString")) if bundle is not None else None
+            break
+    style = NSUserDefaults.standardUserDefaults().stringForKey_("AppleInterfaceStyle")
+    appearance = "dark" if style and str(style).lower() == "dark" else "light"
+    screen = NSScreen.mainScreen()
+    scale = float(screen.backingScaleFactor()) if screen is not None else None
+    return DetectionEnvironment(version, appearance, scale)
+
+# 프로필 적용 조건이 환경과 맞는지 점수를 매깁니다.
+def match_score(match, environment):
+    """
+    조건의 모든 항목이 환경과 맞으면 맞은 항목 수를, 하나라도 다르면 None을 반환합니다.
+    버전은 앞부분 일치("25.4"는 "25.4.1"에 맞음), 조건에 없는 항목은 무엇이든 맞는 것으로 봅니다.
+    """
+    score = 0
+    for key, expected in match.items():
+        actual = getattr(environment, key, None)
+        if key == "app_version":
+            ok = actual is not None and (actual == expected or actual.startswith(f"{expected}."))
+        elif key == "scale":
+            ok = actual is not None and abs(float(actual) - float(expected)) < 0.01
+        else:
+            ok = actual == expected
+        if not ok:
+            return None
+        score += 1
+    return score
+
+# 환경을 프로필 디렉토리 이름으로 변환합니다.
+def environment_slug(environment):
+    """예: "25.4.1-dark-2x" (모르는 항목은 "any")."""
+    scale = f"{environment.scale:g}x" if environment.scale else "any"
+    return f"{environment.app_version or 'any'}-{environment.appearance or 'any'}-{scale}"
+
+# 샘플 픽셀로 HSV 색상 범위를 맞춥니다.
+def fit_hsv_range(frames, percentiles=CALIBRATION_PERCENTILES, margin=CALIBRATION_HSV_MARGIN,
+                  min_saturation=CALIBRATION_MIN_SATURATION):
+    """
+    BGR 프레임들에서 채도가 min_saturation 이상인 픽셀(버튼 바탕)의 H/S/V 백분위 범위를 구하고 margin만큼 넓혀
+    (하한, 상한) 리스트로 반환합니다. 해당 픽셀이 없으면 ValueError.
+    """
+    pixels = np.concatenate([cv2.cvtColor(frame, cv2.COLOR_BGR2HSV).reshape(-1, 3) for frame in frames])
+    pixels = pixels[pixels[:, 1] >= min_saturation]
+    if len(pixels) == 0:
+        raise ValueError("샘플 영역에 색이 있는 픽셀이 없습니다.")
+    low = np.percentile(pixels, percentiles[0], axis=0) - margin
+    high = np.percentile(pixels, percentiles[1], axis=0) + margin
+    limits = np.array([179, 255, 255])
+    return ([int(v) for v in np.clip(low, 0, limits)], [int(v) for v in np.clip(high, 0, limits)])
+
+# 아이콘 템플릿에서 컨투어 면적 범위를 맞춥니다.
+def fit_icon_area(template, area_range=CALIBRATION_AREA_RANGE):
+    """아이콘 템플릿(BGR)을 이진화해 가장 큰 컨투어 면적을 구하고 허용 범위 (최소, 최대)를 반환합니다."""
+    gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    area = max((cv2.contourArea(contour) for contour in contours), default=0)
+    if area <= 0:
+        raise ValueError("아이콘 템플릿에서 윤곽을 찾지 못했습니다.")
+    return int(area * area_range[0]), int(area * area_range[1])
+
+# --- 클래스 정의 ---
+
+class DetectionProfile:
+    """
+    한 감지 환경(KakaoTalk 버전/화면 모드/배율)에 맞춘 템플릿 경로, 색상 범위, 아이콘 면적, 매칭 신뢰도 묶음입니다.
+    보정하지 않은 항목은 fallback 프로필(기본 프로필) 값을 씁니다.
+    """
+
+    def __init__(self, name, match=None, templates=None, colors=None, icon_area=None, confidence=None,
+                 path=None, fallback=None):
+        self.name = name
+        self.match = dict(match or {})
+        self.templates = dict(templates or {})
+        self.colors = dict(colors or {})
+        self.icon_area = tuple(icon_area) if icon_area else None
+        self.confidence = dict(confidence or {})
+        self.path = pathlib.Path(path) if path is not None else None # 프로필 디렉토리 (기본 프로필은 None)
+        self.fallback = fallback
+
+    # 템플릿 파일 경로를 반환합니다.
+    def template(self, name):
+        """템플릿 이름의 파일 경로를 반환합니다 (이 프로필에 없으면 기본 프로필)."""
+        if name in self.templates:
+            return self.templates[name]
+        return self.fallback.template(name) if self.fallback is not None else None
+
+    # HSV 색상 범위를 반환합니다.
+    def color(self, name):
+        """색상 이름의 (하한, 상한) numpy 배열을 반환합니다."""
+        if name in self.colors:
+            lower, upper = self.colors[name]
+            return np.array(lower), np.array(upper)
+        return self.fallback.color(name) if self.fallback is not None else None
+
+    # 아이콘 컨투어 면적 범위를 반환합니다.
+    def area(self):
+        return self.icon_area if self.icon_area or self.fallback is None else self.fallback.area()
+
+    # 템플릿 매칭 신뢰도를 반환합니다.
+    def threshold(self, name):
+        if name in self.confidence:
+            return self.confidence[name]
+        return self.fallback.threshold(name) if self.fallback is not None else None
+
+    # 프로필 설정을 저장합니다.
+    def save(self):
+        """프로필 디렉토리에 profile.json을 기록합니다 (템플릿 이미지는 보정 때 따로 저장)."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        data = {"name": self.name, "match": self.match, "colors": self.colors,
+                "icon_area": list(self.icon_area) if self.icon_area else None, "confidence": self.confidence,
+                "templates": sorted(self.templates)}
+        tmp_path = self.path / f"{PROFILE_FILE}.tmp"
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp_path.replace(self.path / PROFILE_FILE)
+
+    def describe(self):
+        return {"name": self.name, "match": self.match, "templates": sorted(self.templates),
+                "colors": sorted(self.colors), "icon_area": self.icon_area is not None}
+
+
+class DetectionProfiles:
+    """
+    감지 프로필 레지스트리입니다. 기본 프로필과 detection-profiles/ 아래 보정된 프로필을 읽고,
+    현재 환경(KakaoTalk 버전/화면 모드/배율)에 가장 구체적으로 맞는 프로필을 선택합니다.
+    calibrate()는 현재 화면에서 템플릿을 새로 캡처하고 색상 범위/아이콘 면적을 맞춰 현재 환경용 프로필에 저장합니다.
+    """
+
+    def __init__(self, root=PROFILE_DIR, detect=detect_environment, capture=screen_capture.grab_region):
+        self.root = pathlib.Path(root) if root is not None else None
+        self._detect = detect
+        self._capture = capture
+        self._lock = threading.Lock()
+        self.base = DetectionProfile("base", templates=BASE_TEMPLATES, colors=BASE_COLORS,
+                                     icon_area=BASE_ICON_AREA, confidence=BASE_CONFIDENCE)
+        self.profiles = [] # 보정된 프로필 목록
+        self.environment = None
+        self._current = None
+        self._load()
+
+    def _load(self):
+        if self.root is None or not self.root.exists():
+            return
+        for path in sorted(self.root.glob(f"*/{PROFILE_FILE}")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                templates = {name: str(path.parent / f"{name}.png") for name in data.get("templates", [])
+                             if (path.parent / f"{name}.png").exists()}
+                self.profiles.append(DetectionProfile(
+                    data.get("name") or path.parent.name, match=data.get("match"), templates=templates,
+                    colors=data.get("colors"), icon_area=data.get("icon_area"), confidence=data.get("confidence"),
+                    path=path.parent, fallback=self.base))
+            except Exception as e:
+                log.warning(f"감지 프로필 로드 실패 ({path}): {e}")
+        if self.profiles:
+            log.info(f"감지 프로필 로드: {', '.join(profile.name for profile in self.profiles)}")
+
+    # 현재 환경에 맞는 프로필을 선택합니다.
+    def select(self, environment=None):
+        """환경을 감지(또는 주어진 환경 사용)해 조건이 가장 많이 맞는 프로필을 현재 프로필로 정하고 반환합니다."""
+        environment = environment or self._detect()
+        with self._lock:
+            best, best_score = self.base, -1
+            for profile in self.profiles:
+                score = match_score(profile.match, environment)
+                if score is not None and score > best_score:
+                    best, best_score = profile, score
+            self.environment = environment
+            self._current = best
+        log.info(f"감지 프로필 선택: {best.name} (환경: {environment_slug(environment)})")
+        return best
+
+    @property
+    def current(self):
+        """현재 프로필 (아직 선택하지 않았으면 지금 환경으로 선택)."""
+        if self._current is None:
+            self.select()
+        return self._current
+
+    # 현재 환경용 프로필을 반환하거나 새로 만듭니다.
+    def _environment_profile(self, environment):
+        name = environment_slug(environment)
+        match = {key: value for key, value in environment._asdict().items() if value is not None}
+        for profile in self.profiles:
+            if profile.match == match:
+                return profile
+        profile = DetectionProfile(name, match=match, path=self.root / name, fallback=self.base)
+        self.profiles.append(profile)
+        return profile
+
+    # 샘플 프레임을 캡처합니다.
+    def _sample(self, rect, samples):
+        frames = []
+        for i in range(samples):
+            frame = self._capture(rect, nominal=False) # 매칭 캡처와 같은 실제 픽셀 해상도
+            if frame is not None:
+                frames.append(frame)
+            if i + 1 < samples:
+                time.sleep(CALIBRATION_INTERVAL)
+        if not frames:
+            raise RuntimeError(f"보정 영역을 캡처할 수 없습니다: {rect}")
+        return frames
+
+    # 현재 화면으로 프로필을 보정합니다.
+    def calibrate(self, target, rect, samples=CALIBRATION_SAMPLES):
+        """
+        화면 영역 rect (x, y, w, h)에 보이는 target("add_icon" 또는 "confirm_button")을 캡처해
+        템플릿을 저장하고, 아이콘이면 컨투어 면적 범위를, 버튼이면 색상 범위를 맞춰 현재 환경용 프로필에 기록합니다.
+        보정한 항목 요약을 반환합니다. 알 수 없는 대상이면 ValueError.
+        캡처한 화면에서 색상 범위/면적을 맞추지 못하면(ValueError) 프로필과 템플릿을 건드리지 않습니다.
+        """
+        if target not in CALIBRATION_TARGETS:
+            raise ValueError(f"보정할 수 없는 대상입니다: {target} (가능: {', '.join(CALIBRATION_TARGETS)})")
+        if self.root is None:
+            raise RuntimeError("프로필 저장 경로가 없어 보정할 수 없습니다.")
+        template_name, color_name = CALIBRATION_TARGETS[target]
+        frames = self._sample(rect, samples)
+        color_range = fit_hsv_range(frames) if color_name is not None else None
+        icon_area = fit_icon_area(frames[-1]) if color_name is None else None
+        environment = self._detect()
+        with self._lock:
+            profile = self._environment_profile(environment)
+            profile.path.mkdir(parents=True, exist_ok=True)
+            template_path = profile.path / f"{template_name}.png"
+            cv2.imwrite(str(template_path), frames[-1])
+            profile.templates[template_name] = str(template_path)
+            fitted = {"profile": profile.name, "template": str(template_path), "samples": len(frames)}
+            if color_name is not None:
+                profile.colors[color_name] = color_range
+                fitted[color_name] = color_range
+            else:
+                profile.icon_area = icon_area
+                fitted["icon_area"] = icon_area
+            profile.save()
+        log.info(f"감지 프로필 보정 완료: {fitted}")
+        self.select(environment)
+        return fitted
+
+    def stats(self):
+        current = self._current
+        return {"environment": self.environment._asdict() if self.environment else None,
+                "current": current.name if current is not None else None,
+                "profiles": [profile.describe() for profile in self.profiles]}
+
+
+# 앱 전체가 함께 쓰는 감지 프로필 레지스트리
+DETECTION_PROFILES = DetectionProfiles()
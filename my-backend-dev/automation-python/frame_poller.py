@@ -0,0 +1,115 @@
+# flake8: noqa
+
+import time
+import hashlib
+import logging
+import threading
+import cv2
+import numpy as np
+
+# --- 상수 정의 ---
+POLL_MIN_INTERVAL = 0.05 # 화면이 바뀐 직후 폴링 간격 (초)
+POLL_MAX_INTERVAL = 0.5 # 화면이 계속 그대로일 때 늘어나는 폴링 간격 상한 (초)
+POLL_BACKOFF = 1.6 # 화면이 그대로일 때마다 폴링 간격에 곱하는 배수
+POLL_SIGNATURE_SIZE = (48, 48) # 변화 감지용 축소 프레임 크기
+POLL_QUANTIZE_SHIFT = 3 # 축소 프레임 밝기 양자화 (하위 비트 버림, 캡처 잡음 무시)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 함수 정의 ---
+
+# 프레임 변화 감지용 해시를 계산합니다.
+def frame_digest(frame, size=POLL_SIGNATURE_SIZE, shift=POLL_QUANTIZE_SHIFT):
+    """BGR 프레임을 축소/흑백/양자화해 해시(bytes)로 반환합니다. 같은 화면이면 같은 값이 나옵니다."""
+    array = np.asarray(frame)
+    if array.ndim == 3:
+        array = cv2.cvtColor(array[:, :, :3], cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(array, size, interpolation=cv2.INTER_AREA) >> shift
+    return hashlib.blake2b(small.tobytes(), digest_size=8).digest()
+
+# --- 클래스 정의 ---
+
+class ChangeAwarePoller:
+    """
+    화면 영역을 반복 캡처하며 대상을 찾는 폴러입니다.
+    축소 프레임 해시가 직전과 같으면(화면 변화 없음) 매칭을 건너뛰고 폴링 간격을 max_interval까지 늘리며,
+    화면이 바뀌면 바로 매칭하고 간격을 min_interval로 되돌립니다.
+    """
+
+    def __init__(self, capture, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL, backoff=POLL_BACKOFF,
+                 clock=time.monotonic, sleep=time.sleep):
+        self._capture = capture # capture(region) -> BGR 배열 또는 None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.polls = 0 # 캡처 횟수
+        self.matches = 0 # 실제로 매칭을 수행한 횟수
+        self.skipped = 0 # 화면 변화가 없어 매칭을 건너뛴 횟수
+        self.found = 0
+        self.timeouts = 0
+        self._match_seconds = [] # 찾기까지 걸린 시간 (최근 기록)
+
+    def _count(self, name, seconds=None):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            if seconds is not None:
+                self._match_seconds.append(seconds)
+                del self._match_seconds[:-50]
+
+    # 대상이 나타날 때까지 폴링합니다.
+    def wait(self, region_provider, match, timeout):
+        """
+        region_provider()로 영역을 얻어 캡처하고, 화면이 바뀌었을 때만 match(frame, region)을 호출합니다.
+        match가 None이 아닌 값을 반환하면 그 값을, timeout까지 찾지 못하면 None을 반환합니다.
+        영역/캡처 실패나 match 오류는 다음 폴링에서 다시 시도합니다.
+        """
+        started = self._clock()
+        interval = self.min_interval
+        last = None # 마지막으로 매칭한 (영역, 프레임 해시)
+        while True:
+            region = region_provider()
+            try:
+                frame = self._capture(region) if region else None
+            except Exception as e:
+                log.debug(f"폴링 캡처 오류: {e}")
+                frame = None
+            if frame is not None:
+                self._count("polls")
+                key = (tuple(region), frame_digest(frame))
+                if key == last:
+                    self._count("skipped")
+                    interval = min(interval * self.backoff, self.max_interval)
+                else:
+                    self._count("matches")
+                    try:
+                        result = match(frame, region)
+                        last = key
+                    except Exception as e:
+                        log.error(f"폴링 매칭 중 오류 발생: {e}", exc_info=True)
+                        result = None
+                    if result is not None:
+                        self._count("found", self._clock() - started)
+                        return result
+                    interval = self.min_interval # 화면이 바뀌는 중: 빠르게 다시 확인
+            else:
+                log.debug(f"폴링 캡처 실패 (영역: {region}). 재시도 중...")
+                interval = min(interval * self.backoff, self.max_interval)
+            remaining = timeout - (self._clock() - started)
+            if remaining <= 0:
+                self._count("timeouts")
+                return None
+            self._sleep(min(interval, remaining))
+
+    # 폴링 통계를 반환합니다.
+    def stats(self):
+        """캡처/매칭/건너뛴 매칭/찾음/시간 초과 횟수와 찾기까지 걸린 시간(최근 평균, 마지막)을 반환합니다."""
+        with self._lock:
+            seconds = list(self._match_seconds)
+            return {"polls": self.polls, "matches": self.matches, "skipped_matches": self.skipped,
+                    "found": self.found, "timeouts": self.timeouts,
+                    "time_to_match": {"avg": round(sum(seconds) / len(seconds), 3) if seconds else None,
+                                      "last": round(seconds[-1], 3) if seconds else None}}
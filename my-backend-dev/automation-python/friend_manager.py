@@ -10,27 +10,38 @@ import pathlib
 import cv2
 import numpy as np
 import shutil
-import pyperclip
-import pytesseract
 import subprocess
 import logging
-from pynput.keyboard import Controller, Key
 import tempfile
 from PIL import Image
 import datetime
 import subprocess
 import os
-
-keyboard = Controller()
+from add_friend_result import add_friend_outcome, classify_add_friend_result, find_add_friend_result_text
+from ocr_pipeline import OcrPipeline
+import vision_workers
+from friend_index import FRIEND_INDEX
+from phone_registry import PHONE_REGISTRY, normalize_phone
+from clipboard import create_pasteboard
+from text_input import TextInput
+from input_macro import create_input_macro
+import kakao_ax
+import ax_events
+from ui_state import (UIStateClassifier, UIStateMachine, FRIENDS_TAB, CHAT_LIST, SEARCH_RESULTS, CHAT_WINDOW,
+                      ADD_FRIEND_DIALOG, RESULT_POPUP, ADD_FRIEND_DIALOG_TITLES, ADD_FRIEND_DIALOG_SUBROLES)
+from ui_session import UI_SESSION, FRIENDS_TAB_TARGET
+from ax_locator import AXLocator
+from click_strategies import CLICK_STRATEGIES, ClickStrategy
+from detection_profiles import DETECTION_PROFILES
+from frame_poller import ChangeAwarePoller
+import screen_capture
 
 # --- 상수 정의 ---
 BASE_DIR = pathlib.Path(__file__).parent.absolute()
 DEBUG_DIR = BASE_DIR / "debugs-screens" # 디버그 스크린샷 저장 경로
 IMAGE_DIR = BASE_DIR / "images" # 이미지 파일 경로
 
-# 이미지 경로
-ICON_ADD = str(IMAGE_DIR / "add_icon.png") # 친구 추가 아이콘 이미지
-# BTN_ADD = str(IMAGE_DIR / "add_btn.png") # find_button 리팩토링 후 사용되지 않는 것으로 보임
+# 이미지 경로, 색상 범위, 아이콘 면적, 매칭 신뢰도는 감지 프로필(detection_profiles)에서 환경별로 가져옴
 
 # 시간 상수 (초 단위)
 SHORT_SLEEP = 0.2 # 짧은 대기 시간
@@ -38,6 +49,13 @@ MEDIUM_SLEEP = 0.6 # 중간 대기 시간
 LONG_SLEEP = 1.2 # 긴 대기 시간
 EXTRA_LONG_SLEEP = 2.0 # 매우 긴 대기 시간
 CLICK_TIMEOUT = 10 # wait_and_click 함수 타임아웃
+ADD_FRIEND_RESULT_TIMEOUT = LONG_SLEEP # 결과 문구가 Accessibility 트리에 나타날 때까지 대기 상한 (초과 시 OCR)
+ADD_FRIEND_DIALOG_TIMEOUT = 2.0 # 아이콘 클릭 후 친구 추가 대화 상자 창 알림 대기 상한
+
+# 파이프라인 상수
+PIPELINE_RECOGNITION = True # 결과 팝업 OCR을 백그라운드에서 수행 (다음 친구 입력과 겹침)
+BATCH_DIALOG = False # True면 친구 추가 대화 상자를 한 번만 열고 친구마다 입력란만 다시 채움
+USE_PHONE_REGISTRY = True # 전화번호 레지스트리에 유효한 결과가 있는 번호는 UI 없이 바로 응답
 
 # UI 상호작용 상수
 FRIENDS_TAB_SHORTCUT = '1' # 친구 탭 단축키 (Cmd+1)
@@ -46,14 +64,15 @@ SEARCH_SHORTCUT = 'f' # 검색 단축키 (Cmd+F)
 PASTE_SHORTCUT = 'v' # 붙여넣기 단축키 (Cmd+V)
 CLOSE_WINDOW_SHORTCUT = 'w' # 창 닫기 단축키 (Cmd+W)
 TAB_KEY = 'tab' # 탭 키
+RESULT_DISMISS_KEY = 'enter' # 결과 팝업 확인(닫기) 키
+RESULT_POPUP_TIMEOUT = 0.5 # 결과 팝업이 보이는지/닫혔는지 확인 대기 상한
+CALIBRATION_CONTROLS = {"add_icon": "add_friend_icon", "confirm_button": "add_friend_confirm"} # 보정 대상 -> AX 컨트롤 이름
 
 # 이미지 매칭/찾기 상수
 DEFAULT_CONFIDENCE = 0.7 # 템플릿 매칭 기본 신뢰도
 ADD_ICON_REGION_SCALE_X_START = 0.7 # 친구 추가 아이콘 검색 영역 X 시작 비율
 ADD_ICON_REGION_SCALE_WIDTH = 0.3 # 친구 추가 아이콘 검색 영역 너비 비율
 ADD_ICON_REGION_SCALE_HEIGHT = 0.2 # 친구 추가 아이콘 검색 영역 높이 비율
-ADD_ICON_MIN_AREA = 20 # 친구 추가 아이콘 최소 면적 (컨투어)
-ADD_ICON_MAX_AREA = 500 # 친구 추가 아이콘 최대 면적 (컨투어)
 ADD_ICON_MIN_ASPECT = 0.5 # 친구 추가 아이콘 최소 가로세로 비율
 ADD_ICON_MAX_ASPECT = 1.5 # 친구 추가 아이콘 최대 가로세로 비율
 ALT_CLICK_REL_X = 0.95 # 대체 클릭 X 상대 좌표
@@ -64,16 +83,25 @@ BUTTON_MIN_WIDTH = 50 # 버튼 최소 너비 (컨투어)
 BUTTON_MIN_ASPECT = 2.0 # 버튼 최소 가로세로 비율
 BUTTON_MAX_ASPECT = 10.0 # 버튼 최대 가로세로 비율
 
-# HSV 색상 범위 (필요시 조정)
-YELLOW_LOWER = np.array([15, 60, 120]) # 노란색 하한값
-YELLOW_UPPER = np.array([45, 255, 255]) # 노란색 상한값
-GRAY_LOWER = np.array([0, 0, 80]) # 회색 하한값
-GRAY_UPPER = np.array([180, 30, 200]) # 회색 상한값
- 
-# OCR 결과 문자열
-OCR_SUCCESS = "친구 등록에 성공했습니다"
-OCR_ALREADY_REGISTERED = "이미 등록된 친구입니다"
-OCR_NOT_ALLOWED = "입력하신 번호를 친구로 추가할 수 없습니다"
+# 키/마우스 입력 계층 (네이티브 이벤트 묶음, 이벤트 사이 최소 간격만 둠)
+INPUT = create_input_macro()
+# 텍스트 입력 백엔드 (입력창 값 직접 설정 후 확인, 안 되면 붙여넣기)
+TEXT_INPUT = TextInput(create_pasteboard(), paste=lambda: INPUT.run("paste"), select_all=lambda: INPUT.run("select_all"))
+# Accessibility 컨트롤 찾기 엔진 (화면 인식보다 먼저 시도)
+LOCATOR = AXLocator()
+# 템플릿 매칭 대기용 폴러 (화면 변화가 없으면 매칭 생략, 폴링 간격 적응)
+CLICK_POLLER = ChangeAwarePoller(capture=lambda region: capture_screen(region))
+# 읽어 둔 템플릿 이미지 ((경로, 수정 시각) -> BGR 배열)
+_TEMPLATE_CACHE = {}
+# 친구 추가 흐름 화면 상태 기계 (결과 문구를 먼저 확인, 기대와 다른 상태는 시간 초과 없이 바로 복구)
+ADD_FLOW = UIStateMachine(
+    UIStateClassifier(probes=[(RESULT_POPUP, lambda app: find_add_friend_result_text(app) is not None)]),
+    recoveries={
+        RESULT_POPUP: lambda: INPUT.run(RESULT_DISMISS_KEY), # 남은 결과 팝업 닫기
+        CHAT_WINDOW: lambda: INPUT.run("close"), # 앞에 있는 채팅창 닫기
+        SEARCH_RESULTS: lambda: INPUT.run("escape"), # 검색 닫기
+        CHAT_LIST: lambda: _press_friends_tab(), # 채팅 탭이면 친구 탭으로 (세션 상태와 무관하게 실제로 누름)
+    }, name="add-friend")
 
 # --- 로깅 설정 ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -81,9 +109,14 @@ log = logging.getLogger(__name__)
 
 # --- 함수 정의 ---
 
-# KakaoTalk 앱을 활성화합니다.
+# KakaoTalk 앱을 활성화합니다 (이미 앞에 있는 것으로 알려져 있으면 생략).
 def focus_kakaotalk():
-    """KakaoTalk 애플리케이션을 활성화합니다."""
+    """KakaoTalk 애플리케이션을 활성화합니다. 세션이 이미 앞에 있다고 알고 있으면 osascript와 대기를 생략합니다."""
+    return UI_SESSION.ensure("focus", _activate_kakaotalk, frontmost=True)
+
+# osascript로 KakaoTalk 앱을 활성화합니다.
+def _activate_kakaotalk():
+    """osascript로 KakaoTalk 애플리케이션을 활성화합니다."""
     try:
         script = 'tell application "KakaoTalk" to activate'
         subprocess.run(['osascript', '-e', script], check=True, capture_output=True, timeout=5)
@@ -100,6 +133,10 @@ def focus_kakaotalk():
         log.error(f"KakaoTalk 활성화 중 예상치 못한 오류 발생: {e}", exc_info=True)
         return False
 
+# 화면 좌표를 클릭합니다.
+def _click(x, y):
+    INPUT.run(("click", x, y))
+
 # 디버그 디렉토리를 비우고 다시 생성합니다.
 def clear_debug_dir():
     """디버그 디렉토리를 비우고 다시 생성합니다."""
@@ -140,7 +177,7 @@ def get_kakaotalk_window_region():
         success2, size = AS.AXValueGetValue(size_ref, AS.kAXValueCGSizeType, None)
         x, y = int(point.x), int(point.y)
         w, h = int(size.width), int(size.height)
-        log.info(f"Accessibility API로 KakaoTalk 창 영역: ({x}, {y}, {w}, {h})")
+        log.debug(f"Accessibility API로 KakaoTalk 창 영역: ({x}, {y}, {w}, {h})")
         return (x, y, w, h)
     except Exception as e:
         log.error(f"Accessibility API로 KakaoTalk 창 위치 가져오기 실패: {e}", exc_info=True)
@@ -195,22 +232,42 @@ def capture_region(region, save_path=None):
     subprocess.run(['screencapture', '-x', '-R', region_str, output], check=True)
     return Image.open(output)
 
+# 화면 영역을 BGR 배열로 캡처합니다.
+def capture_screen(region):
+    """창 영역을 BGR 배열로 캡처합니다 (Quartz 직접 캡처, 실제 픽셀 해상도). 사용할 수 없으면 pyautogui로 캡처합니다."""
+    frame = screen_capture.grab_region(region, nominal=False)
+    if frame is not None:
+        return frame
+    return cv2.cvtColor(np.array(pyautogui.screenshot(region=region)), cv2.COLOR_RGB2BGR)
+
+# 템플릿 이미지를 읽습니다 (파일이 바뀌지 않았으면 캐시 재사용).
+def load_template(image_path):
+    """템플릿 이미지를 컬러로 읽어 반환합니다. 같은 파일(경로, 수정 시각)은 다시 읽지 않습니다. 실패 시 None."""
+    try:
+        key = (image_path, os.path.getmtime(image_path))
+    except OSError:
+        return None
+    template = _TEMPLATE_CACHE.get(key)
+    if template is None:
+        template = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if template is not None:
+            _TEMPLATE_CACHE[key] = template
+    return template
+
 # 화면과 템플릿 이미지를 매칭을 위해 준비합니다 (컬러 유지).
 # 템플릿이 화면 영역보다 크면 리사이즈합니다.
-def preprocess_image(image_path, region):
+def preprocess_image(image_path, region, screen=None):
     """
     화면과 템플릿 이미지를 매칭을 위해 준비합니다 (컬러 유지).
-    템플릿이 화면 영역보다 크면 리사이즈합니다.
+    템플릿이 화면 영역보다 크면 리사이즈합니다. screen(BGR 배열)이 주어지면 다시 캡처하지 않습니다.
     성공 시 (screen_np, template), 실패 시 (None, None) 반환.
     """
     try:
-        # 화면 영역 캡처
-        screen = pyautogui.screenshot(region=region)
-        screen_np = np.array(screen) # RGB 형식
-        screen_np = cv2.cvtColor(screen_np, cv2.COLOR_RGB2BGR) # OpenCV 일관성을 위해 BGR로 변환
+        # 화면 영역 캡처 (BGR)
+        screen_np = screen if screen is not None else capture_screen(region)
 
-        # 템플릿 이미지 컬러로 로드
-        template = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        # 템플릿 이미지 컬러로 로드 (캐시)
+        template = load_template(image_path)
         if template is None:
             log.error(f"템플릿 이미지 로드 실패: {image_path}")
             return None, None
@@ -275,6 +332,7 @@ def find_add_friend_icon_direct(region):
         # 선택 사항: 노이즈 제거를 위해 모폴로지 연산(침식/팽창) 적용
 
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area, max_area = DETECTION_PROFILES.current.area() # 환경별 아이콘 면적 범위
 
         debug_image = top_right_np.copy()
         potential_icons = [] # 잠재적 아이콘 후보 리스트
@@ -282,7 +340,7 @@ def find_add_friend_icon_direct(region):
         for contour in contours:
             area = cv2.contourArea(contour)
             # 면적 기준으로 필터링
-            if ADD_ICON_MIN_AREA < area < ADD_ICON_MAX_AREA:
+            if min_area < area < max_area:
                 x, y, w, h = cv2.boundingRect(contour)
                 aspect_ratio = float(w) / h if h > 0 else 0
                 # 가로세로 비율 및 '+' 모양 특성 확인 (예: solidity, circularity)
@@ -323,6 +381,13 @@ def find_add_friend_icon_direct(region):
         log.error(f"친구 추가 아이콘 직접 찾기 중 오류 발생: {e}", exc_info=True)
         return None
 
+# 오른쪽 상단 모서리의 미리 정의된 상대 위치를 계산합니다.
+def alt_add_friend_point(region):
+    """창 영역 기준 친구 추가 아이콘의 예상 위치 (x, y)를 반환합니다 (화면을 확인하지 않는 추정)."""
+    r_x, r_y, r_w, r_h = region
+    # 상대 위치 상수를 기반으로 절대 좌표 계산
+    return r_x + int(r_w * ALT_CLICK_REL_X), r_y + int(r_h * ALT_CLICK_REL_Y)
+
 # 대체 방법: 오른쪽 상단 모서리의 미리 정의된 상대 위치를 클릭합니다.
 def alt_add_friend_click(region):
     """
@@ -330,16 +395,11 @@ def alt_add_friend_click(region):
     이미지 감지보다 신뢰성이 낮습니다. 클릭 시도 시 True를 반환합니다.
     """
     try:
-        r_x, r_y, r_w, r_h = region
-        # 상대 위치 상수를 기반으로 절대 좌표 계산
-        click_x = r_x + int(r_w * ALT_CLICK_REL_X)
-        click_y = r_y + int(r_h * ALT_CLICK_REL_Y)
+        click_x, click_y = alt_add_friend_point(region)
 
         log.info(f"대체 클릭 시도 (상대 위치): ({click_x}, {click_y})")
 
-        pyautogui.moveTo(click_x, click_y, duration=0.1)
-        time.sleep(SHORT_SLEEP)
-        pyautogui.click()
+        INPUT.run(("click", click_x, click_y))
         time.sleep(MEDIUM_SLEEP) # 클릭 후 동작 시간 확보
         log.info("대체 클릭 수행 완료.")
         return True
@@ -374,15 +434,13 @@ def find_button(region, button_type="yellow", search_area="bottom"):
             return None
         screen_np = cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
 
-        # 색상 마스킹
+        # 색상 마스킹 (환경별 감지 프로필의 색상 범위)
         hsv = cv2.cvtColor(screen_np, cv2.COLOR_BGR2HSV)
-        if button_type == "yellow":
-            mask = cv2.inRange(hsv, YELLOW_LOWER, YELLOW_UPPER)
-        elif button_type == "gray":
-            mask = cv2.inRange(hsv, GRAY_LOWER, GRAY_UPPER)
-        else:
+        color_range = DETECTION_PROFILES.current.color(button_type) if button_type in ("yellow", "gray") else None
+        if color_range is None:
             log.error(f"잘못된 button_type: {button_type}. 'yellow' 또는 'gray'를 사용하세요.")
             return None
+        mask = cv2.inRange(hsv, *color_range)
 
         # 선택 사항: 마스크 정리를 위한 모폴로지 연산
         # kernel = np.ones((3,3), np.uint8)
@@ -425,12 +483,59 @@ def find_button(region, button_type="yellow", search_area="bottom"):
         log.error(f"{button_type} 버튼 찾기 중 오류 발생: {e}", exc_info=True)
         return None
 
+# 템플릿 매칭을 한 번 수행합니다.
+def match_template_once(image_path, region, confidence=DEFAULT_CONFIDENCE, screen=None):
+    """
+    창 영역을 한 번 캡처(또는 주어진 screen 사용)해 템플릿과 비교하고, 점수가 confidence 이상이면
+    매칭 중앙의 화면 좌표 (x, y)를 반환합니다. 찾지 못하거나 전처리에 실패하면 None.
+    """
+    timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+    # 화면 및 템플릿 전처리 (컬러)
+    screen_bgr, template_bgr = preprocess_image(image_path, region, screen=screen)
+    if screen_bgr is None or template_bgr is None:
+        log.warning("이미지 전처리 실패.")
+        return None
+
+    # 템플릿 매칭을 위해 그레이스케일로 변환
+    screen_gray = cv2.cvtColor(screen_bgr, cv2.COLOR_BGR2GRAY)
+    template_gray = cv2.cvtColor(template_bgr, cv2.COLOR_BGR2GRAY)
+
+    # 전처리 후 잠재적 리사이즈 후 크기 다시 확인
+    if template_gray.shape[0] > screen_gray.shape[0] or template_gray.shape[1] > screen_gray.shape[1]:
+        log.error("전처리 후에도 템플릿이 여전히 화면 영역보다 큽니다.")
+        return None
+
+    # 템플릿 매칭 수행 (비전 워커 프로세스에서 실행)
+    max_val, max_loc = vision_workers.match_template(screen_gray, template_gray)
+    log.debug(f"템플릿 매칭 점수: {max_val:.4f} (신뢰도 임계값: {confidence})")
+    if max_val < confidence:
+        log.debug("매칭 점수가 임계값 미만입니다.")
+        return None
+
+    # 화면 기준 중앙 좌표 계산 (Retina 캡처는 픽셀이 포인트보다 많으므로 배율로 나눔)
+    t_h, t_w = template_gray.shape # 그레이스케일 크기 사용
+    match_x, match_y = max_loc
+    scale = screen_gray.shape[1] / region[2] if region[2] else 1.0
+    center_x = region[0] + int((match_x + t_w // 2) / scale)
+    center_y = region[1] + int((match_y + t_h // 2) / scale)
+
+    # 디버그: 컬러 화면 캡처에 사각형 그리기
+    debug_screen = screen_bgr.copy()
+    cv2.rectangle(debug_screen, (match_x, match_y), (match_x + t_w, match_y + t_h), (0, 0, 255), 2)
+    debug_marked_path = DEBUG_DIR / f"matched_{os.path.basename(image_path)}_{timestamp}.png"
+    cv2.imwrite(str(debug_marked_path), debug_screen)
+    log.debug(f"매칭 성공. 표시된 이미지 저장됨: {debug_marked_path}")
+    log.info(f"{os.path.basename(image_path)} 매칭: 위치=({center_x}, {center_y}), 점수={max_val:.4f}.")
+    return center_x, center_y
+
 # 화면에 이미지가 나타날 때까지 기다렸다가 클릭합니다.
-# '친구 추가' 아이콘에 대한 특별 처리를 사용합니다.
-def wait_and_click(image_path, confidence=DEFAULT_CONFIDENCE, timeout=CLICK_TIMEOUT):
+# '친구 추가' 아이콘은 감지 전략 선택기로 가장 빠른 방법부터 한 번씩 시도합니다.
+def wait_and_click(image_path, confidence=DEFAULT_CONFIDENCE, timeout=CLICK_TIMEOUT, confirm=None):
     """
     화면에 이미지가 나타날 때까지 기다렸다가 클릭합니다.
-    '친구 추가' 아이콘에 대한 특별 처리를 사용합니다.
+    '친구 추가' 아이콘은 컨투어 감지/상대 위치/템플릿 매칭 중 이 호스트와 창 크기에서 기대 비용이 가장 낮은 전략부터
+    한 번씩 시도하고, confirm()이 주어지면 클릭 결과(대화 상자 열림 등)로 성공을 판정해 전략 통계에 기록합니다.
+    모두 실패하면 남은 시간 동안 템플릿 매칭을 반복합니다.
     성공 시 True, 실패 시 TimeoutError 발생.
     """
     log.info(f"{timeout}초 동안 {os.path.basename(image_path)} 찾아서 클릭 대기 중...")
@@ -445,93 +550,31 @@ def wait_and_click(image_path, confidence=DEFAULT_CONFIDENCE, timeout=CLICK_TIME
         log.error("클릭 진행 불가, KakaoTalk 창 영역 가져오기 실패.")
         raise Exception("KakaoTalk 창 영역 가져오기 실패")
 
-    # --- 친구 추가 아이콘 특별 처리 ---
+    # --- 친구 추가 아이콘: 전략 선택기 (가장 빠른 방법부터 한 번씩) ---
     if "add_icon.png" in image_path:
-        log.debug("친구 추가 아이콘 특별 감지 시도 중.")
-        # 방법 1: 직접 컨투어 감지
-        icon_pos = find_add_friend_icon_direct(region)
-        if (icon_pos):
-            pyautogui.moveTo(icon_pos[0], icon_pos[1], duration=0.1)
-            time.sleep(SHORT_SLEEP)
-            pyautogui.click()
-            log.info(f"직접 감지로 친구 추가 아이콘 클릭 성공: {icon_pos}.")
-            return True
-        else:
-            log.warning("직접 친구 추가 아이콘 감지 실패.")
-
-        # 방법 2: 대체 상대 위치 클릭 (아이콘 감지 실패 시 대체)
-        log.debug("친구 추가 아이콘 대체 클릭 시도 중.")
-        if alt_add_friend_click(region):
-            log.info("대체 방식으로 친구 추가 아이콘 클릭 성공.")
-            # 아이콘을 찾았는지 확인할 수 없지만 클릭이 작동했다고 가정
+        strategies = [
+            ClickStrategy("contour", lambda: find_add_friend_icon_direct(region), blind=False),
+            ClickStrategy("relative", lambda: alt_add_friend_point(region), blind=True),
+            ClickStrategy("template", lambda: match_template_once(image_path, region, confidence), blind=False),
+        ]
+        outcome = CLICK_STRATEGIES.run("add_icon", strategies, click=_click, confirm=confirm,
+                                       context=f"{region[2]}x{region[3]}")
+        if outcome.strategy is not None:
+            log.info(f"친구 추가 아이콘 클릭 성공: {outcome.point} (전략 '{outcome.strategy}', 시도 {outcome.tried}).")
             return True
-        else:
-            log.error("친구 추가 아이콘 대체 클릭 방식도 실패.")
-            # 아이콘에 대한 마지막 수단으로 템플릿 매칭으로 넘어감
-            # 또는 이 방법들이 결정적이어야 한다면 오류 발생시킴
-            # 현재는 템플릿 매칭으로 넘어감.
-            log.warning("친구 추가 아이콘 템플릿 매칭으로 대체 시도.")
-
-    # --- 일반 템플릿 매칭 ---
-    while time.time() - start_time < timeout:
-        timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-        try:
-            # 창 이동/리사이즈 경우를 대비해 영역 새로고침
-            current_region = get_kakaotalk_window_region()
-            if not current_region:
-                log.warning("대기 중 KakaoTalk 창 영역 손실. 재시도 중...")
-                time.sleep(MEDIUM_SLEEP)
-                continue
-
-            # 화면 및 템플릿 전처리 (컬러)
-            screen_bgr, template_bgr = preprocess_image(image_path, current_region)
-            if screen_bgr is None or template_bgr is None:
-                log.warning("이미지 전처리 실패. 재시도 중...")
-                time.sleep(MEDIUM_SLEEP)
-                continue
-
-            # 템플릿 매칭을 위해 그레이스케일로 변환
-            screen_gray = cv2.cvtColor(screen_bgr, cv2.COLOR_BGR2GRAY)
-            template_gray = cv2.cvtColor(template_bgr, cv2.COLOR_BGR2GRAY)
-
-            # 전처리 후 잠재적 리사이즈 후 크기 다시 확인
-            if template_gray.shape[0] > screen_gray.shape[0] or template_gray.shape[1] > screen_gray.shape[1]:
-                log.error("전처리 후에도 템플릿이 여전히 화면 영역보다 큽니다.")
-                time.sleep(MEDIUM_SLEEP)
-                continue
-
-            # 템플릿 매칭 수행
-            result = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(result)
-            log.debug(f"템플릿 매칭 점수: {max_val:.4f} (신뢰도 임계값: {confidence})")
-
-            if max_val >= confidence:
-                # 화면 기준 중앙 좌표 계산
-                t_h, t_w = template_gray.shape # 그레이스케일 크기 사용
-                match_x, match_y = max_loc
-                center_x = current_region[0] + match_x + t_w // 2
-                center_y = current_region[1] + match_y + t_h // 2
-
-                # 디버그: 컬러 화면 캡처에 사각형 그리기
-                debug_screen = screen_bgr.copy()
-                cv2.rectangle(debug_screen, (match_x, match_y), (match_x + t_w, match_y + t_h), (0, 0, 255), 2)
-                debug_marked_path = DEBUG_DIR / f"matched_{os.path.basename(image_path)}_{timestamp}.png"
-                cv2.imwrite(str(debug_marked_path), debug_screen)
-                log.debug(f"매칭 성공. 표시된 이미지 저장됨: {debug_marked_path}")
-
-                # 중앙 클릭
-                pyautogui.moveTo(center_x, center_y, duration=0.1)
-                time.sleep(SHORT_SLEEP)
-                pyautogui.click()
-                log.info(f"{os.path.basename(image_path)} 클릭 성공: 위치=({center_x}, {center_y}), 점수={max_val:.4f}.")
-                return True
-            else:
-                log.debug("매칭 점수가 임계값 미만입니다.")
-
-        except Exception as e:
-            log.error(f"템플릿 매칭 루프 중 오류 발생: {e}", exc_info=True)
-
-        time.sleep(MEDIUM_SLEEP) # 재시도 전 대기
+        log.warning(f"친구 추가 아이콘 전략 {outcome.tried} 모두 실패. 템플릿 매칭을 반복합니다.")
+
+    # --- 일반 템플릿 매칭 (화면이 바뀔 때만 매칭, 변화가 없으면 폴링 간격을 점점 늘림) ---
+    # 창 이동/리사이즈 경우를 대비해 폴링마다 영역 새로고침
+    remaining = timeout - (time.time() - start_time)
+    point = CLICK_POLLER.wait(get_kakaotalk_window_region,
+                              lambda frame, current_region: match_template_once(image_path, current_region, confidence, screen=frame),
+                              remaining)
+    if point is not None:
+        # 중앙 클릭
+        INPUT.run(("click", point[0], point[1]))
+        log.info(f"{os.path.basename(image_path)} 클릭 성공: 위치={point}.")
+        return True
 
     # 타임아웃 도달
     log.error(f"타임아웃: {timeout}초 내에 {os.path.basename(image_path)}를 찾지 못했습니다.")
@@ -547,15 +590,32 @@ def wait_and_click(image_path, confidence=DEFAULT_CONFIDENCE, timeout=CLICK_TIME
 
     raise TimeoutError(f"{timeout}초 내에 이미지 {os.path.basename(image_path)}를 찾지 못했습니다.")
 
-# Cmd+1을 사용하여 KakaoTalk 친구 탭으로 이동합니다.
+# 현재 화면으로 감지 프로필을 보정합니다.
+def calibrate_detection(target, rect=None, samples=None):
+    """
+    target("add_icon"/"confirm_button")이 보이는 화면 영역 rect (x, y, w, h)로 현재 환경용 감지 프로필을 보정합니다.
+    rect가 없으면 Accessibility로 해당 컨트롤을 찾아 그 영역을 씁니다 (아이콘은 친구 탭, 버튼은 친구 추가 대화 상자를 띄운 상태).
+    영역을 정할 수 없으면 ValueError.
+    """
+    if rect is None:
+        node = LOCATOR.locate(CALIBRATION_CONTROLS[target]) if target in CALIBRATION_CONTROLS else None
+        rect = node.frame() if node is not None else None
+        if rect is None:
+            raise ValueError(f"'{target}' 컨트롤을 Accessibility로 찾지 못했습니다. 화면 영역(rect)을 지정하세요.")
+    kwargs = {"samples": samples} if samples else {}
+    return DETECTION_PROFILES.calibrate(target, tuple(rect), **kwargs)
+
+# Cmd+1을 사용하여 KakaoTalk 친구 탭으로 이동합니다 (이미 친구 탭인 것으로 알려져 있으면 생략).
 def navigate_to_friends_tab():
-    """Cmd+1을 사용하여 KakaoTalk 친구 탭으로 이동합니다."""
+    """Cmd+1을 사용하여 KakaoTalk 친구 탭으로 이동합니다. 세션이 이미 친구 탭이라고 알고 있으면 단축키와 대기를 생략합니다."""
+    return UI_SESSION.ensure("friends_tab", _press_friends_tab, **FRIENDS_TAB_TARGET)
+
+# Cmd+1을 누르고 탭 로딩을 기다립니다.
+def _press_friends_tab():
+    """Cmd+1을 눌러 친구 탭으로 이동하고 탭 로딩을 기다립니다."""
     log.info("친구 탭으로 이동 중...")
     try:
-        keyboard.press(Key.cmd)
-        keyboard.press(FRIENDS_TAB_SHORTCUT)
-        keyboard.release(FRIENDS_TAB_SHORTCUT)
-        keyboard.release(Key.cmd)
+        INPUT.run(f"cmd+{FRIENDS_TAB_SHORTCUT}")
         time.sleep(MEDIUM_SLEEP) # 탭 로딩 시간 확보
         log.info("친구 탭으로 이동 완료.")
         return True
@@ -563,131 +623,321 @@ def navigate_to_friends_tab():
         log.error(f"친구 탭 이동 실패: {e}", exc_info=True)
         return False
 
+# 결과 팝업 문구를 Accessibility로 읽어 친구 추가 결과를 분류합니다.
+def read_add_friend_result_ax(app, timeout=ADD_FRIEND_RESULT_TIMEOUT):
+    """
+    결과 문구가 Accessibility 트리에 나타나는 즉시 읽어 (status, reason)을 반환합니다.
+    timeout 안에 문구를 찾지 못하면 None (OCR로 대체).
+    """
+    started = time.monotonic()
+    found = ax_events.wait_until(lambda: find_add_friend_result_text(app), timeout) # 결과 팝업 창 알림이 오면 즉시 확인
+    if found is None:
+        log.info(f"{timeout}초 안에 결과 문구를 Accessibility로 찾지 못해 OCR로 확인합니다.")
+        return None
+    label, text = found
+    log.info(f"Accessibility 결과 문구: '{text}' -> {label} ({time.monotonic() - started:.3f}초)")
+    return add_friend_outcome(label)
+
+# 친구 추가 결과 팝업 영역을 캡처합니다 (UI 스레드).
+def capture_add_friend_popup():
+    """친구 추가 결과 팝업(또는 메인 창)에서 결과 문구 영역만 잘라 캡처한 PIL Image를 반환합니다."""
+    log.debug("OCR 캡처용 팝업 영역 재설정 중...")
+    popup_bounds = get_kakaotalk_popup_or_main_window_region().get('bounds')
+    if not popup_bounds:
+        raise Exception("OCR 확인 전 KakaoTalk 팝업/메인 창 영역 손실.")
+    x, y, w, h = popup_bounds
+    # 좌측 50% 제거, 우측 부분 = (50% + 25%)
+    left_cut_ratio = 0.5
+    right_extend_ratio = left_cut_ratio * 0.5
+    cap_x = x + int(w * left_cut_ratio)
+    cap_w = int(w * (1 - left_cut_ratio + right_extend_ratio))
+    # 상하 20%씩 줄이기
+    top_cut_ratio = 0.2
+    bottom_cut_ratio = 0.2
+    cap_y = y + int(h * top_cut_ratio)
+    cap_h = int(h * (1 - top_cut_ratio - bottom_cut_ratio))
+    capture_reg = (cap_x, cap_y, cap_w, cap_h)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+    popup_path = DEBUG_DIR / f"popup_capture_{timestamp}.png"
+    result_img = capture_region(capture_reg, popup_path)
+    result_img.load() # 워커 스레드로 넘기기 전에 픽셀 데이터 로드
+    log.debug(f"OCR 캡처용 영역 스크린샷 저장됨: {popup_path}")
+    return result_img
+
+# 캡처된 결과 팝업 이미지를 OCR로 인식해 친구 추가 결과를 분류합니다 (워커 스레드에서 실행 가능).
+def recognize_add_friend_result(result_img):
+    """캡처된 결과 팝업 이미지를 OCR로 인식해 (status, reason)을 반환합니다. UI를 건드리지 않습니다."""
+    custom_config = r'--oem 3 --psm 6 -l kor+eng'
+    result_text = vision_workers.image_to_string(result_img, config=custom_config, lang="kor+eng") # 비전 워커 프로세스에서 실행
+    log.info(f"OCR 결과 텍스트: '{result_text.strip()}'")
+
+    # OCR 결과 분류 (오인식 문자 허용)
+    return classify_add_friend_result(result_text)
+
+# 백그라운드 OCR 결과를 친구별 결과에 순서대로 반영합니다.
+def _apply_add_friend_recognitions(recognized, results):
+    """백그라운드 OCR 결과를 친구별 결과에 순서대로 반영합니다."""
+    for result_index, outcome, error in recognized:
+        entry = results[result_index]
+        if error is not None:
+            entry["status"] = "fail"
+            entry["reason"] = f"결과 팝업 OCR 처리 오류: {error}"
+        else:
+            entry["status"], entry["reason"] = outcome
+        log.info(f"{entry['username']} 친구 추가 결과 반영: {entry['status']} ({entry['reason']})")
+
+# 친구 탭으로 이동해 친구 추가 대화 상자를 엽니다.
+def open_add_friend_dialog():
+    """KakaoTalk을 활성화하고 친구 탭에서 친구 추가 아이콘을 찾아 클릭해 대화 상자를 엽니다. 실패 시 예외 발생."""
+    # KakaoTalk이 활성화되어 있고 친구 탭에 있는지 확인
+    if not focus_kakaotalk():
+        raise Exception("초기 KakaoTalk 활성화 실패.")
+    if not navigate_to_friends_tab():
+        raise Exception("친구 탭 이동 실패.")
+    ADD_FLOW.expect(FRIENDS_TAB, via=(CHAT_LIST, SEARCH_RESULTS)) # 벗어난 상태(채팅창/결과 팝업 등)는 바로 복구
+
+    # 친구 추가 아이콘 클릭 (Accessibility로 찾지 못하면 화면 인식)
+    log.debug("친구 추가 아이콘 클릭 중...")
+    mark = ax_events.AX_EVENTS.mark()
+    if not LOCATOR.press("add_friend_icon", click=_click):
+        # 감지 전략의 성공은 대화 상자가 실제로 열렸는지로 판정 (Accessibility를 쓸 수 없으면 클릭만)
+        app = kakao_ax.kakao_app()
+        confirm = None
+        if app is not None:
+            confirm = lambda: ax_events.wait_until(lambda: find_add_friend_dialog(app), ADD_FRIEND_DIALOG_TIMEOUT) is not None
+        profile = DETECTION_PROFILES.current
+        wait_and_click(profile.template("add_icon"), confidence=profile.threshold("add_icon"), timeout=10, confirm=confirm)
+    if ax_events.observing():
+        # 대화 상자 창이 생기거나 포커스되는 즉시 진행 (생성 알림의 제목은 비어 있을 수 있어 하위 역할로도 확인)
+        if ax_events.wait_for_window(ADD_FRIEND_DIALOG_TITLES, ADD_FRIEND_DIALOG_TIMEOUT, after=mark,
+                                     subroles=ADD_FRIEND_DIALOG_SUBROLES) is None:
+            log.warning(f"{ADD_FRIEND_DIALOG_TIMEOUT}초 안에 친구 추가 대화 상자 창 알림을 받지 못했습니다.")
+    else:
+        time.sleep(MEDIUM_SLEEP) # 친구 추가 대화 상자 대기
+    ADD_FLOW.expect(ADD_FRIEND_DIALOG, via=FRIENDS_TAB)
+
+# 친구 추가 대화 상자 입력이 앱에 반영되었는지 확인합니다.
+def _add_friend_input_processed():
+    """확인 버튼이 활성화되면 True (앱이 이름/전화번호 입력을 받았다는 신호). 버튼을 찾을 수 없으면 확인하지 않고 True."""
+    node = LOCATOR.locate("add_friend_confirm")
+    return node is None or node.get("AXEnabled") is not False
+
+# 새로 연 친구 추가 대화 상자에 이름과 전화번호를 입력합니다.
+def fill_add_friend_form(username, phone):
+    """
+    새로 연 대화 상자에 이름과 전화번호를 입력합니다. 입력란은 열린 대화 상자를 재사용할 때와 같은 방식(화면 순서)으로
+    Accessibility로 찾아 채우고, 찾을 수 없을 때만 이름 입력란에 포커스가 있다고 보고 탭으로 전화번호 입력란으로 이동합니다.
+    확인 버튼이 활성화되지 않으면(앱이 입력을 받지 않음) 예외 발생.
+    """
+    app = kakao_ax.kakao_app()
+    window = find_add_friend_dialog(app) if app is not None else None
+    fields = add_friend_fields(window) if window is not None else []
+    if len(fields) >= 2:
+        if not fill_add_friend_fields(fields, username, phone):
+            raise Exception("친구 추가 대화 상자에 입력한 이름/전화번호가 반영되지 않았습니다 (확인 버튼 비활성).")
+        return
+
+    # 대체: 입력란을 찾지 못함 (Accessibility 사용 불가 등)
+    log.debug(f"사용자 이름 입력: {username}")
+    TEXT_INPUT.enter(username)
+    INPUT.run(*[TAB_KEY, ("wait", 0.2)] * 3) # 전화번호 필드로 이동
+    time.sleep(SHORT_SLEEP)
+    log.debug(f"전화번호 입력: {phone}")
+    if TEXT_INPUT.enter(phone, confirm=_add_friend_input_processed) is None:
+        raise Exception("친구 추가 대화 상자에 입력한 이름/전화번호가 반영되지 않았습니다 (확인 버튼 비활성).")
+
+# 친구 추가 대화 상자 입력란에 이름과 전화번호를 채웁니다.
+def fill_add_friend_fields(fields, username, phone, methods=("auto", "paste")):
+    """
+    이름/전화번호 입력란을 차례로 포커스해 전체 선택 후 입력하고, 확인 버튼이 활성화되면 True를 반환합니다.
+    활성화되지 않으면 다음 입력 방식(붙여넣기)으로 두 입력란을 모두 다시 채웁니다.
+    """
+    for method in methods:
+        entered = None
+        for field, text, confirm in ((fields[0], username, None), (fields[1], phone, _add_friend_input_processed)):
+            field.set("AXFocused", True)
+            INPUT.run("select_all") # 이전 값을 덮어쓰도록 선택
+            entered = TEXT_INPUT.enter(text, method=method, confirm=confirm)
+        if entered is not None:
+            return True
+        log.warning(f"친구 추가 확인 버튼이 활성화되지 않았습니다 (입력 방식: {method}).")
+    return False
+
+# 열려 있는 친구 추가 대화 상자 창을 찾습니다.
+def find_add_friend_dialog(app):
+    """제목에 친구 추가 대화 상자 문자열이 포함된 창 노드를 반환합니다. 없으면 None."""
+    for window in kakao_ax.windows(app):
+        title = kakao_ax.normalize_title(window.title)
+        if any(marker in title for marker in ADD_FRIEND_DIALOG_TITLES):
+            return window
+    return None
+
+# 친구 추가 대화 상자 입력란을 화면 순서로 반환합니다.
+def add_friend_fields(window):
+    """대화 상자 입력란을 화면 순서(위->아래, 왼쪽->오른쪽)로 반환합니다 (첫 번째가 이름, 두 번째가 전화번호)."""
+    fields = window.find_all(lambda node: node.role in kakao_ax.INPUT_ROLES)
+    def position(node):
+        x, y, _, _ = node.frame() or (0, 0, 0, 0)
+        return (y, x)
+    return sorted(fields, key=position)
+
+# 배치 추가 동안 열어 두는 친구 추가 대화 상자
+class AddFriendDialog:
+    """
+    친구 추가 대화 상자를 한 번만 열어 두고 친구마다 이름/전화번호 입력란만 다시 채우는 세션입니다.
+    탭 이동과 아이콘 검색은 대화 상자를 처음 열 때(또는 사라져 다시 열 때)만 수행합니다.
+    열린 대화 상자의 입력란은 Accessibility로 찾아 포커스하며, 찾지 못하면 대화 상자를 닫고 새로 엽니다.
+    """
+
+    def __init__(self, app_provider=kakao_ax.kakao_app):
+        self._app_provider = app_provider
+        self.is_open = False
+        self._fresh = False # 방금 열어 이름 입력란에 포커스가 있는 상태
+        self.opened = 0 # 대화 상자를 연 횟수
+        self.reused = 0 # 열린 대화 상자를 재사용한 횟수
+
+    # 대화 상자 창 노드를 찾습니다.
+    def _window(self):
+        app = self._app_provider()
+        return find_add_friend_dialog(app) if app is not None else None
+
+    # 대화 상자를 새로 엽니다.
+    def open(self):
+        """친구 탭으로 이동해 대화 상자를 엽니다. 실패 시 예외 발생."""
+        self.is_open = False
+        open_add_friend_dialog()
+        self.is_open, self._fresh = True, True
+        self.opened += 1
+
+    # 대화 상자에 이름과 전화번호를 채웁니다.
+    def fill(self, username, phone):
+        """
+        열린 대화 상자의 입력란을 비우고 이름과 전화번호를 채웁니다.
+        대화 상자가 없거나 입력란을 찾지 못하면 새로 열어 처음 입력 방식으로 채웁니다.
+        """
+        if self.is_open and not self._fresh:
+            window = self._window()
+            fields = add_friend_fields(window) if window is not None else []
+            if len(fields) >= 2:
+                if not fill_add_friend_fields(fields, username, phone):
+                    raise Exception("친구 추가 대화 상자에 입력한 이름/전화번호가 반영되지 않았습니다 (확인 버튼 비활성).")
+                self.reused += 1
+                log.debug(f"열린 친구 추가 대화 상자 재사용: {username}")
+                return
+            log.info("친구 추가 대화 상자 입력란을 찾지 못해 대화 상자를 다시 엽니다.")
+            self.close()
+        if not self.is_open:
+            self.open()
+        fill_add_friend_form(username, phone)
+        self._fresh = False
+
+    # 결과 팝업을 닫고 대화 상자가 남아 있는지 확인합니다.
+    def dismiss_result(self, captured=False):
+        """
+        결과 팝업이 보이면 확인 키로 닫고, 대화 상자가 사라졌으면 다음 친구 때 다시 열도록 표시합니다.
+        팝업이 없을 때 확인 키를 누르면 친구 추가 양식이 다시 제출되므로, 팝업을 확인했을 때만 누릅니다.
+        captured: 결과를 OCR용으로 캡처한 팝업에서 읽은 경우 True.
+                  Accessibility에 문구가 보이지 않아도 팝업은 떠 있으므로 문구 확인 없이 닫습니다.
+        """
+        app = self._app_provider()
+        if app is None and not captured:
+            return # Accessibility 없이 확인 불가: 팝업이 남아 있으면 다음 입력 때 입력란 확인 실패로 대화 상자를 다시 엶
+        if captured:
+            INPUT.run(RESULT_DISMISS_KEY)
+            time.sleep(SHORT_SLEEP) # Accessibility로 닫힘을 확인할 수 없으므로 잠시 대기
+        elif kakao_ax.wait_for(lambda: find_add_friend_result_text(app), RESULT_POPUP_TIMEOUT) is None:
+            log.info("결과 팝업이 보이지 않아 확인 키를 누르지 않습니다.")
+        else:
+            INPUT.run(RESULT_DISMISS_KEY)
+            kakao_ax.wait_for(lambda: find_add_friend_result_text(app) is None, RESULT_POPUP_TIMEOUT)
+        if app is not None and find_add_friend_dialog(app) is None:
+            log.info("결과 팝업을 닫은 뒤 친구 추가 대화 상자가 사라져 다음 친구 때 다시 엽니다.")
+            self.is_open = False
+
+    # 대화 상자를 닫습니다.
+    def close(self):
+        """열려 있는 대화 상자를 Cmd+W로 닫습니다."""
+        if not self.is_open:
+            return
+        self.is_open = False
+        if focus_kakaotalk():
+            INPUT.run("close")
+            time.sleep(MEDIUM_SLEEP)
+
 # 사용자 이름과 전화번호를 사용하여 단일 친구를 추가합니다.
-def add_friend(username, phone):
-    """사용자 이름과 전화번호를 사용하여 단일 친구를 추가합니다."""
+def add_friend(username, phone, pipeline=None, result_key=None, dialog=None):
+    """
+    사용자 이름과 전화번호를 사용하여 단일 친구를 추가합니다.
+    pipeline(OcrPipeline)이 주어지면 결과 팝업 캡처를 워커에 넘기고 status="pending"으로 반환하며,
+    실제 결과는 result_key와 함께 파이프라인에서 회수됩니다.
+    dialog(AddFriendDialog)가 주어지면 열린 대화 상자를 재사용하고, 끝나면 결과 팝업만 닫습니다.
+    """
     log.info(f"친구 추가 시도: 사용자명='{username}', 전화번호='{phone}'")
     status = "fail" # 기본 상태
     reason = "알 수 없는 오류" # 기본 사유
 
     try:
-        # KakaoTalk이 활성화되어 있고 친구 탭에 있는지 확인
-        if not focus_kakaotalk():
-            raise Exception("초기 KakaoTalk 활성화 실패.")
-        if not navigate_to_friends_tab():
-            raise Exception("친구 탭 이동 실패.")
-
-        # 1. 친구 추가 아이콘 클릭
-        log.debug("친구 추가 아이콘 클릭 중...")
-        wait_and_click(ICON_ADD, confidence=0.6, timeout=10) # 필요시 특정 신뢰도 사용
-        time.sleep(MEDIUM_SLEEP) # 친구 추가 대화 상자 대기
-
-        # 2. 사용자 이름 입력 (선택 사항, 전화번호로 추가 시 필요 없을 수 있음)
-        log.debug(f"사용자 이름 입력: {username}")
-        pyperclip.copy(username)
-        time.sleep(SHORT_SLEEP)
-        keyboard.press(Key.cmd)
-        keyboard.press(PASTE_SHORTCUT)
-        keyboard.release(PASTE_SHORTCUT)
-        keyboard.release(Key.cmd)
-        time.sleep(SHORT_SLEEP)
-        for _ in range(3):
-            keyboard.press(Key.tab)
-            keyboard.release(Key.tab)
-            time.sleep(0.2)
-        time.sleep(SHORT_SLEEP)
-
-        # 3. 전화번호 입력
-        # 전화번호 입력 필드 찾기. 탭 또는 클릭 필요할 수 있음.
-        # 친구 추가 아이콘 클릭 후 또는 사용자 이름 입력 + 탭 후에 전화번호 필드가 활성화된다고 가정
-        log.debug(f"전화번호 입력: {phone}")
-
-        # 전화번호 붙여넣기
-        pyperclip.copy(phone)
-        time.sleep(SHORT_SLEEP)
-        keyboard.press(Key.cmd)
-        keyboard.press(PASTE_SHORTCUT)
-        keyboard.release(PASTE_SHORTCUT)
-        keyboard.release(Key.cmd)
-        time.sleep(MEDIUM_SLEEP)
-
-        # 4. 추가/확인 버튼 클릭 (보통 노란색)
-        log.debug("노란색 '추가' 버튼 검색 중...")
-        region = get_kakaotalk_window_region()
-        if not region: raise Exception("버튼 검색 전 KakaoTalk 창 영역 손실.")
-
-        button_pos = find_button(region, button_type="yellow", search_area="bottom")
-        if not button_pos:
-            # 대체: 버튼을 찾지 못한 경우 Enter 키 누르기 시도
-            log.warning("색상 감지로 노란색 버튼을 찾지 못했습니다. Enter 키 누르기 시도.")
-            keyboard.press(Key.enter)
-            keyboard.release(Key.enter)
-            # raise Exception("노란색 '추가' 버튼을 찾을 수 없습니다.") # 또는 Enter 시도
+        # 1~3. 대화 상자 열기 및 이름/전화번호 입력
+        if dialog is not None:
+            dialog.fill(username, phone)
         else:
-            pyautogui.moveTo(button_pos[0], button_pos[1], duration=0.1)
-            pyautogui.click()
-            log.info("노란색 버튼 클릭 완료.")
-
-        time.sleep(LONG_SLEEP) # 확인 대화 상자/메시지 대기
-
-        # 5. OCR을 통해 결과 확인
-        log.debug("OCR 캡처용 팝업 영역 재설정 중...")
-        popup_bounds = get_kakaotalk_popup_or_main_window_region().get('bounds')
-        if not popup_bounds:
-            raise Exception("OCR 확인 전 KakaoTalk 팝업/메인 창 영역 손실.")
-        x, y, w, h = popup_bounds
-        # 좌측 50% 제거, 우측 부분 = (50% + 25%)
-        left_cut_ratio = 0.5
-        right_extend_ratio = left_cut_ratio * 0.5
-        cap_x = x + int(w * left_cut_ratio)
-        cap_w = int(w * (1 - left_cut_ratio + right_extend_ratio))
-        # 상하 20%씩 줄이기
-        top_cut_ratio = 0.2
-        bottom_cut_ratio = 0.2
-        cap_y = y + int(h * top_cut_ratio)
-        cap_h = int(h * (1 - top_cut_ratio - bottom_cut_ratio))
-        capture_reg = (cap_x, cap_y, cap_w, cap_h)
-        timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-        popup_path = DEBUG_DIR / f"popup_capture_{timestamp}.png"
-        result_img = capture_region(capture_reg, popup_path)
-        log.debug(f"OCR 캡처용 영역 스크린샷 저장됨: {popup_path}")
-
-        # OCR 수행
-        custom_config = r'--oem 3 --psm 6 -l kor+eng'
-        result_text = pytesseract.image_to_string(result_img, config=custom_config, lang="kor+eng")
-        log.info(f"OCR 결과 텍스트: '{result_text.strip()}'")
-
-        # OCR 결과에서 줄바꿈, 공백 제거
-        normalized_text = result_text.replace('\n', '').replace('\r', '').replace(' ', '')
-        OCR_SUCCESS_PATTERNS = [
-            "친구등록이완료되었습니다",
-            "친구등록에성공했습니다",
-            "친구추가가완료되었습니다",
-            "친구추가에성공했습니다"
-        ]
-        if any(success_str in normalized_text for success_str in OCR_SUCCESS_PATTERNS):
-            status = "success"
-            reason = "친구 추가 성공."
-            log.info(f"[성공] {reason}")
-        elif OCR_ALREADY_REGISTERED.replace(' ', '') in normalized_text:
-            status = "already_registered"
-            reason = "이미 등록된 친구입니다."
-            log.warning(f"[건너뜀] {reason}")
-        elif OCR_NOT_ALLOWED.replace(' ', '') in normalized_text:
-            status = "not_allowed"
-            reason = "이 번호는 친구로 추가할 수 없습니다."
-            log.error(f"[실패] {reason}")
+            open_add_friend_dialog()
+            fill_add_friend_form(username, phone)
+
+        # 클릭 전에 이미 결과 문구가 보이면 (이전 결과가 남은 경우) 새 결과와 구분할 수 없으므로 OCR로 확인
+        app = kakao_ax.kakao_app()
+        if app is not None and find_add_friend_result_text(app) is not None:
+            log.warning("클릭 전부터 결과 문구가 보여 이번 결과는 OCR로 확인합니다.")
+            app = None
+
+        # 4. 추가/확인 버튼 클릭 (보통 노란색, Accessibility로 찾지 못하면 색상 감지, 그다음 보정된 버튼 템플릿 매칭)
+        if not LOCATOR.press("add_friend_confirm", click=_click):
+            log.debug("노란색 '추가' 버튼 검색 중...")
+            region = get_kakaotalk_window_region()
+            if not region: raise Exception("버튼 검색 전 KakaoTalk 창 영역 손실.")
+
+            button_pos = find_button(region, button_type="yellow", search_area="bottom")
+            if not button_pos:
+                # 색상 범위가 맞지 않는 환경: 감지 프로필의 확인 버튼 템플릿으로 한 번 매칭
+                profile = DETECTION_PROFILES.current
+                template_path = profile.template("add_btn")
+                if template_path and os.path.exists(template_path):
+                    button_pos = match_template_once(template_path, region, profile.threshold("add_btn"))
+            if not button_pos:
+                # 대체: 버튼을 찾지 못한 경우 Enter 키 누르기 시도
+                log.warning("색상 감지/템플릿 매칭으로 노란색 버튼을 찾지 못했습니다. Enter 키 누르기 시도.")
+                INPUT.run("enter")
+                # raise Exception("노란색 '추가' 버튼을 찾을 수 없습니다.") # 또는 Enter 시도
+            else:
+                INPUT.run(("click", button_pos[0], button_pos[1]))
+                log.info("노란색 버튼 클릭 완료.")
+
+        # 5. 결과 확인: 결과 문구를 Accessibility로 바로 읽음 (나타나는 즉시 진행)
+        ax_outcome = read_add_friend_result_ax(app) if app is not None else None
+        captured = ax_outcome is None # OCR로 확인하는 경우 팝업이 Accessibility에 보이지 않음
+        if ax_outcome is not None:
+            status, reason = ax_outcome
         else:
-            status = "fail"
-            reason = f"OCR을 통한 결과 메시지 인식 불가: {result_text.strip()}"
-            log.error(f"[실패] {reason}")
+            # 6. 대체: 결과 팝업 캡처 (UI 스레드) 후 OCR
+            if app is None:
+                time.sleep(LONG_SLEEP) # 확인 대화 상자/메시지 대기 (Accessibility 대기를 거치지 않은 경우)
+            result_img = capture_add_friend_popup()
+            if pipeline is not None:
+                # 파이프라인이 있으면 OCR을 워커에 넘기고 바로 진행
+                pipeline.submit(result_key, result_img)
+                status = "pending"
+                reason = "결과 팝업 OCR 확인 대기 중."
+                log.info(f"{username}: 결과 팝업 캡처 완료, OCR 확인은 백그라운드에서 진행.")
+            else:
+                status, reason = recognize_add_friend_result(result_img)
 
-        # 친구 추가 대화 상자/창 닫기 (Cmd+W가 작동한다고 가정)
-        keyboard.press(Key.cmd)
-        keyboard.press('w')
-        keyboard.release('w')
-        keyboard.release(Key.cmd)
-        time.sleep(MEDIUM_SLEEP)
+        if dialog is not None:
+            # 결과 팝업만 닫고 대화 상자는 다음 친구를 위해 유지
+            dialog.dismiss_result(captured=captured)
+        else:
+            # 친구 추가 대화 상자/창 닫기 (Cmd+W가 작동한다고 가정)
+            INPUT.run("close")
+            time.sleep(MEDIUM_SLEEP)
 
     except FileNotFoundError as e:
         reason = str(e)
@@ -701,13 +951,12 @@ def add_friend(username, phone):
         reason = f"예상치 못한 오류 발생: {e}"
         log.error(f"{username} 친구 추가 실패: {reason}", exc_info=True)
         # 상태는 'fail' 유지
-        # 오류 발생 시 창 닫기 시도
+        # 오류 발생 시 창 닫기 시도 (배치 모드면 다음 친구가 대화 상자를 새로 엶)
         try:
-            if focus_kakaotalk():
-                keyboard.press(Key.cmd)
-                keyboard.press('w')
-                keyboard.release('w')
-                keyboard.release(Key.cmd)
+            if dialog is not None:
+                dialog.close()
+            elif focus_kakaotalk():
+                INPUT.run("close")
                 time.sleep(MEDIUM_SLEEP)
         except Exception as close_e:
             log.warning(f"오류 후 창 닫기 실패: {close_e}")
@@ -715,67 +964,161 @@ def add_friend(username, phone):
     return {"username": username, "phone": phone, "status": status, "reason": reason}
 
 # 리스트에서 여러 친구를 KakaoTalk에 추가합니다.
-def add_friends_via_kakao(friends_data):
+def add_friends_via_kakao(friends_data, pipeline_recognition=PIPELINE_RECOGNITION, batch_dialog=BATCH_DIALOG,
+                          use_registry=USE_PHONE_REGISTRY):
     """
     리스트에서 여러 친구를 KakaoTalk에 추가합니다.
 
     Args:
         friends_data (list): [{"username": 이름, "phone": 번호}, ...] 형식의 딕셔너리 리스트
+        pipeline_recognition (bool): True면 결과 팝업 OCR을 워커에서 처리하고 UI는 바로 다음 친구로 진행합니다.
+        batch_dialog (bool): True면 친구 추가 대화 상자를 한 번만 열고 친구마다 입력란만 다시 채웁니다.
+        use_registry (bool): True면 전화번호 레지스트리에 유효한 결과가 있는 번호는 UI 없이 바로 응답합니다.
 
     Returns:
-        list: 각 친구에 대한 결과 딕셔너리 리스트
+        list: 각 친구에 대한 결과 딕셔너리 리스트 (요청 순서). 레지스트리나 요청 내 중복 번호로
+              응답한 항목은 "cached": True.
     """
     log.info(f"{len(friends_data)}명의 친구 일괄 추가 시작.")
     clear_debug_dir()
-    results = []
-
-    # 초기 활성화 확인
-    if not focus_kakaotalk():
-        log.critical("일괄 추가 시작 불가: 초기 KakaoTalk 활성화 실패.")
-        # 모두 실패로 표시
-        for friend in friends_data:
-             results.append({
-                "username": friend.get('username', 'N/A'),
-                "phone": friend.get('phone', 'N/A'),
-                "status": "fail",
-                "reason": "초기 KakaoTalk 활성화 실패."
-             })
-        return results
-
-    for friend in friends_data:
+    results = [None] * len(friends_data)
+    registry = PHONE_REGISTRY if use_registry else None
+
+    # UI를 거치기 전에 번호 누락, 요청 내 중복, 레지스트리에 알려진 번호를 먼저 처리
+    todo = [] # UI로 처리할 (결과 위치, 사용자 이름, 전화번호, E.164 번호)
+    first_by_phone = {} # 번호 -> 요청 내 첫 항목의 결과 위치
+    duplicates = [] # (결과 위치, 첫 항목의 결과 위치)
+    for index, friend in enumerate(friends_data):
         # 사용자 이름 없으면 전화번호 기반으로 생성
         username = friend.get('username', f"UnknownUser_{friend.get('phone', 'NoPhone')}")
         phone = friend.get('phone')
 
         if not phone:
             log.warning(f"전화번호 누락으로 친구 '{username}' 건너뜀.")
-            results.append({
+            results[index] = {
                 "username": username,
                 "phone": phone,
                 "status": "skip",
                 "reason": "전화번호 누락"
-            })
+            }
+            continue
+
+        normalized = normalize_phone(phone)
+        if normalized is None:
+            log.warning(f"전화번호 '{phone}'을(를) E.164로 정규화하지 못해 레지스트리 없이 처리합니다.")
+        key = normalized or str(phone).strip()
+        if key in first_by_phone:
+            log.info(f"요청 내 중복 번호 '{phone}' ({username}): 첫 항목 결과를 사용합니다.")
+            duplicates.append((index, first_by_phone[key]))
+            continue
+        first_by_phone[key] = index
+
+        known = registry.lookup(normalized) if registry is not None and normalized else None
+        if known is not None:
+            recorded = datetime.datetime.fromtimestamp(known.updated_at).strftime('%Y-%m-%d %H:%M')
+            log.info(f"레지스트리 결과 사용: {username} ({normalized}) -> {known.status} ({recorded})")
+            results[index] = {
+                "username": username,
+                "phone": phone,
+                "status": known.status,
+                "reason": f"{known.reason or known.status} (이전 처리 결과, {recorded})",
+                "cached": True
+            }
             continue
+        todo.append((index, username, phone, normalized))
+
+    log.info(f"UI 처리 {len(todo)}건, 레지스트리/중복/누락으로 바로 응답 {len(friends_data) - len(todo)}건.")
+
+    # 초기 활성화 확인
+    if todo:
+        ax_events.ensure_observer() # 창 알림 구독 (대화 상자/결과 팝업을 폴링 없이 감지)
+        UI_SESSION.verify() # 세션이 알고 있는 UI 상태를 실제 상태로 맞춘 뒤 시작
+    if todo and not focus_kakaotalk():
+        log.critical("일괄 추가 시작 불가: 초기 KakaoTalk 활성화 실패.")
+        # UI로 처리할 친구 모두 실패로 표시
+        for index, username, phone, _ in todo:
+            results[index] = {
+                "username": username,
+                "phone": phone,
+                "status": "fail",
+                "reason": "초기 KakaoTalk 활성화 실패."
+            }
+        todo = []
+
+    # 비동기 인식 단계 (UI 스레드는 캡처만, OCR은 워커에서)
+    pipeline = OcrPipeline(recognize_add_friend_result, name="add-friend") if pipeline_recognition and todo else None
+    # 배치 모드: 대화 상자를 열어 두고 재사용 (탭 이동/아이콘 검색은 처음 한 번만)
+    dialog = AddFriendDialog() if batch_dialog and todo else None
+
+    for position, (index, username, phone, _) in enumerate(todo):
+        # 완료된 백그라운드 인식 결과 반영
+        if pipeline is not None:
+            _apply_add_friend_recognitions(pipeline.collect_ready(), results)
 
         try:
-            result = add_friend(username, phone)
-            results.append(result)
+            results[index] = add_friend(username, phone, pipeline=pipeline, result_key=index, dialog=dialog)
             # 친구 추가 사이에 약간의 지연 추가
             time.sleep(SHORT_SLEEP)
         except Exception as e:
             # add_friend 자체에서 발생한 예외 처리
             log.error(f"{username} 처리 중 예외 발생: {e}", exc_info=True)
-            results.append({
+            results[index] = {
                 "username": username,
                 "phone": phone,
                 "status": "fail",
                 "reason": f"add_friend 내 처리되지 않은 예외: {e}"
-            })
+            }
             # 다음 친구를 위해 활성화 복구 시도
             if not focus_kakaotalk():
-                 log.critical("오류 후 KakaoTalk 활성화 손실, 일괄 추가 계속 불가.")
-                 # 선택 사항: 남은 친구들을 실패로 표시
-                 break # 추가 친구 처리 중단
+                log.critical("오류 후 KakaoTalk 활성화 손실, 일괄 추가 계속 불가.")
+                # 남은 친구들을 실패로 표시
+                for rest_index, rest_username, rest_phone, _ in todo[position + 1:]:
+                    results[rest_index] = {
+                        "username": rest_username,
+                        "phone": rest_phone,
+                        "status": "fail",
+                        "reason": "KakaoTalk 활성화 손실로 처리 중단."
+                    }
+                break # 추가 친구 처리 중단
+
+    # 배치 모드에서 열어 둔 대화 상자 닫기
+    if dialog is not None:
+        try:
+            dialog.close()
+        except Exception as e:
+            log.warning(f"친구 추가 대화 상자 닫기 실패: {e}")
+        log.info(f"친구 추가 대화 상자: {dialog.opened}회 열기, {dialog.reused}회 재사용.")
+
+    # 남은 백그라운드 인식 결과를 기다려 순서대로 반영
+    if pipeline is not None:
+        log.info(f"결과 팝업 OCR {pipeline.pending_count()}건 대기 중...")
+        _apply_add_friend_recognitions(pipeline.drain(), results)
+        pipeline.shutdown()
+
+    # UI로 확인한 결과를 레지스트리에 기록 (유효 시간이 정의된 결과만 저장됨)
+    if registry is not None:
+        for index, username, _, normalized in todo:
+            result = results[index]
+            if normalized and result is not None:
+                registry.record(normalized, result["status"], result.get("reason"), username)
+
+    # 요청 내 중복 번호는 첫 항목의 결과로 응답
+    for index, first_index in duplicates:
+        friend = friends_data[index]
+        first = results[first_index]
+        results[index] = {
+            "username": friend.get('username', f"UnknownUser_{friend.get('phone')}"),
+            "phone": friend.get('phone'),
+            "status": first["status"],
+            "reason": f"요청 내 중복 번호: {first['reason']}",
+            "cached": True
+        }
+
+    # 새로 추가된 친구를 친구 목록 색인에 반영 (전체 목록을 다시 읽지 않음)
+    for result in results:
+        result.setdefault("cached", False)
+        if result["status"] == "success" and not result["cached"]:
+            FRIEND_INDEX.add(result["username"])
 
     log.info(f"친구 일괄 추가 완료. 처리 결과: {len(results)}건.")
     return results
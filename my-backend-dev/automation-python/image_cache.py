@@ -0,0 +1,222 @@
+# flake8: noqa
+
+import io
+import os
+import hashlib
+import logging
+import pathlib
+import threading
+from collections import OrderedDict, namedtuple
+from PIL import Image, ImageOps
+try:
+    from cairosvg import svg2png  # SVG를 PNG로 변환
+except ImportError:
+    svg2png = None
+
+# --- 상수 정의 ---
+BASE_DIR = pathlib.Path(__file__).parent.absolute()
+IMAGE_CACHE_DIR = BASE_DIR / "image-cache" # 준비된 이미지 캐시 저장 경로
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024 # 캐시 최대 크기 (512MB, 초과 시 LRU 제거)
+
+# 렌더링 파라미터 기본값
+IMAGE_MAX_DIMENSION = 2048 # 긴 변 최대 픽셀 (초과 시 축소)
+JPEG_QUALITY = 85 # JPEG 재압축 품질
+SVG_RENDER_DPI = 300 # SVG 래스터화 DPI
+PASSTHROUGH_EXTENSIONS = {".gif"} # 변환하지 않고 원본 그대로 보내는 확장자 (애니메이션 유지)
+HASH_CHUNK_SIZE = 1024 * 1024 # 해시 계산 시 읽기 단위
+DIGEST_CACHE_SIZE = 1024 # 내용 해시를 기억하는 원본 파일 수 (초과 시 오래 사용하지 않은 것부터 잊음)
+RENDER_VERSION = 2 # 렌더링 방식 버전 (바뀌면 캐시 키가 달라져 이전 결과를 쓰지 않음, 2: EXIF 방향 적용)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 준비된 이미지 (붙여넣기용 파일 경로, 클립보드용 TIFF 파일 경로, 캐시 키, 크기 정보)
+PreparedImage = namedtuple("PreparedImage", ["source", "path", "tiff_path", "key", "width", "height", "bytes"])
+
+
+class ImageCache:
+    """
+    원본 파일 내용 해시와 렌더링 파라미터를 키로 하는 이미지 준비 캐시입니다.
+    SVG 래스터화, 최대 크기 축소, JPEG/PNG 재압축, 클립보드용 TIFF 인코딩 결과를 디스크에 저장하고
+    전체 용량 기준 LRU로 제거합니다. 같은 배너를 여러 수신자에게 보내도 준비는 한 번만 합니다.
+    """
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries = OrderedDict() # 키 -> PreparedImage (오래 사용하지 않은 순)
+        self._digests = OrderedDict() # 경로 -> (mtime, 크기, 내용 해시) (같은 파일 재해시 방지, 오래 사용하지 않은 순)
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._load_existing()
+
+    # 디스크에 남아 있는 캐시 항목을 불러옵니다.
+    def _load_existing(self):
+        """디스크에 남아 있는 캐시 항목을 최근 사용 시각 순으로 불러옵니다."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for path in self.cache_dir.iterdir():
+            if path.suffix in (".png", ".jpg", ".tiff"):
+                files.setdefault(path.stem, []).append(path)
+        loaded = []
+        for key, paths in files.items():
+            tiff = next((p for p in paths if p.suffix == ".tiff"), None)
+            image = next((p for p in paths if p.suffix != ".tiff"), None)
+            if tiff is None or image is None:
+                for p in paths: # 불완전한 항목 정리
+                    p.unlink(missing_ok=True)
+                continue
+            try:
+                with Image.open(image) as img:
+                    width, height = img.size
+            except Exception:
+                for p in paths:
+                    p.unlink(missing_ok=True)
+                continue
+            size = image.stat().st_size + tiff.stat().st_size
+            mtime = max(image.stat().st_mtime, tiff.stat().st_mtime)
+            loaded.append((mtime, PreparedImage(None, str(image), str(tiff), key, width, height, size)))
+        for _, entry in sorted(loaded, key=lambda item: item[0]):
+            self._entries[entry.key] = entry
+            self._total_bytes += entry.bytes
+        if loaded:
+            log.info(f"이미지 캐시 로드: {len(loaded)}건, {self._total_bytes / 1024 / 1024:.1f}MB")
+        self._evict()
+
+    # 파일 내용 해시를 계산합니다 (변경되지 않은 파일은 재사용).
+    def _digest(self, source_path):
+        """
+        파일 내용의 SHA-256 해시를 반환합니다. 경로/mtime/크기가 같으면 이전 결과를 재사용합니다.
+        경로마다 최신 결과 하나만 기억하고, DIGEST_CACHE_SIZE개를 넘으면 오래 사용하지 않은 경로부터 잊습니다.
+        """
+        stat = os.stat(source_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            known = self._digests.get(source_path)
+            if known is not None and known[:2] == stamp:
+                self._digests.move_to_end(source_path)
+                return known[2]
+        hasher = hashlib.sha256()
+        with open(source_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._digests[source_path] = stamp + (digest,)
+            self._digests.move_to_end(source_path)
+            while len(self._digests) > DIGEST_CACHE_SIZE:
+                self._digests.popitem(last=False)
+        return digest
+
+    # 원본 이미지를 준비(래스터화/축소/재압축/TIFF 인코딩)하고 캐시합니다.
+    def prepare(self, source_path, max_dimension=IMAGE_MAX_DIMENSION, jpeg_quality=JPEG_QUALITY, dpi=SVG_RENDER_DPI):
+        """
+        원본 이미지를 전송용으로 준비하고 PreparedImage를 반환합니다. 캐시에 있으면 바로 반환합니다.
+        변환할 수 없는 형식(GIF 등)이나 변환 실패 시 원본 경로를 그대로 담아 반환합니다 (tiff_path는 None).
+        """
+        ext = os.path.splitext(source_path)[1].lower()
+        if ext in PASSTHROUGH_EXTENSIONS:
+            return PreparedImage(source_path, source_path, None, None, None, None, None)
+
+        key = hashlib.sha256(
+            f"{self._digest(source_path)}:{max_dimension}:{jpeg_quality}:{dpi}:{RENDER_VERSION}".encode()
+        ).hexdigest()[:32]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and os.path.exists(entry.path) and os.path.exists(entry.tiff_path):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                log.debug(f"이미지 캐시 적중: {os.path.basename(source_path)} -> {entry.path}")
+                return entry._replace(source=source_path)
+
+        # 캐시 미스: 잠금 밖에서 변환 (다른 이미지 준비를 막지 않도록)
+        try:
+            entry = self._render(source_path, ext, key, max_dimension, jpeg_quality, dpi)
+        except Exception as e:
+            log.error(f"이미지 준비 실패, 원본을 사용합니다: {source_path} ({e})", exc_info=True)
+            return PreparedImage(source_path, source_path, None, None, None, None, None)
+
+        with self._lock:
+            self._misses += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.bytes
+            self._entries[key] = entry
+            self._total_bytes += entry.bytes
+            self._evict(keep=key)
+        log.info(f"이미지 준비 완료: {os.path.basename(source_path)} -> {entry.width}x{entry.height}, "
+                 f"{entry.bytes / 1024:.0f}KB (캐시 {self._total_bytes / 1024 / 1024:.1f}MB)")
+        return entry
+
+    # 원본을 읽어 준비된 파일과 TIFF 파일을 만듭니다.
+    def _render(self, source_path, ext, key, max_dimension, jpeg_quality, dpi):
+        """원본을 읽어 준비된 이미지 파일과 클립보드용 TIFF 파일을 캐시 디렉토리에 만듭니다."""
+        if ext == ".svg":
+            if svg2png is None:
+                raise RuntimeError("cairosvg 라이브러리가 설치되지 않아 SVG를 변환할 수 없습니다.")
+            with open(source_path, "rb") as f:
+                png_bytes = svg2png(bytestring=f.read(), dpi=dpi)
+            img = Image.open(io.BytesIO(png_bytes))
+        else:
+            img = Image.open(source_path)
+        img.load()
+        # 휴대폰 사진의 EXIF 방향을 픽셀에 적용 (재인코딩하면 방향 태그가 사라져 돌아간 채 전송됨)
+        img = ImageOps.exif_transpose(img)
+
+        # 최대 크기 축소
+        if max(img.size) > max_dimension:
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        # 투명도가 있으면 PNG, 없으면 JPEG로 재압축
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha:
+            img = img.convert("RGBA")
+            out_path = self.cache_dir / f"{key}.png"
+            img.save(out_path, format="PNG", optimize=True)
+        else:
+            img = img.convert("RGB")
+            out_path = self.cache_dir / f"{key}.jpg"
+            img.save(out_path, format="JPEG", quality=jpeg_quality, optimize=True)
+
+        # 클립보드용 TIFF 미리 인코딩
+        tiff_path = self.cache_dir / f"{key}.tiff"
+        img.save(tiff_path, format="TIFF", compression="tiff_lzw")
+
+        size = out_path.stat().st_size + tiff_path.stat().st_size
+        return PreparedImage(source_path, str(out_path), str(tiff_path), key, img.width, img.height, size)
+
+    # 용량 한도를 넘으면 오래 사용하지 않은 항목부터 제거합니다.
+    def _evict(self, keep=None):
+        """총 용량이 한도를 넘으면 오래 사용하지 않은 항목부터 디스크에서 제거합니다."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if key == keep:
+                if len(self._entries) == 1:
+                    break
+                self._entries.move_to_end(key)
+                continue
+            self._entries.pop(key)
+            self._total_bytes -= entry.bytes
+            for path in (entry.path, entry.tiff_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            log.debug(f"이미지 캐시 제거 (LRU): {key}")
+
+    # 준비된 TIFF 바이트를 읽습니다.
+    def tiff_bytes(self, prepared):
+        """준비된 이미지의 클립보드용 TIFF 바이트를 반환합니다. 없으면 None."""
+        if not prepared.tiff_path:
+            return None
+        with open(prepared.tiff_path, "rb") as f:
+            return f.read()
+
+    # 캐시 통계를 반환합니다.
+    def stats(self):
+        """캐시 항목 수, 총 용량, 적중/미스 수를 반환합니다."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes,
+                    "hits": self._hits, "misses": self._misses}
@@ -0,0 +1,329 @@
+# flake8: noqa
+
+import time
+import logging
+import unicodedata
+from collections import deque
+try:
+    import ApplicationServices as AS
+    from AppKit import NSWorkspace
+except ImportError:
+    # macOS가 아닌 환경: Accessibility API 사용 불가
+    AS = None
+    NSWorkspace = None
+
+# --- 상수 정의 ---
+KAKAO_BUNDLE_ID = "com.kakao.KakaoTalk"
+KAKAO_APP_NAMES = ("KakaoTalk", "카카오톡")
+AX_POLL_INTERVAL = 0.05 # 조건 대기 시 AX 트리 재확인 간격
+AX_MAX_DEPTH = 12 # 트리 탐색 최대 깊이
+ROW_ROLES = ("AXRow",) # 검색 결과 목록의 행 역할
+LIST_ROLES = ("AXTable", "AXOutline", "AXList") # 목록 컨테이너 역할 (행이 수천 개일 수 있어 하위는 행만 읽음)
+TEXT_ROLES = ("AXStaticText", "AXTextField") # 행 안에서 이름을 담는 요소 역할
+INPUT_ROLES = ("AXTextField", "AXTextArea", "AXSearchField") # 텍스트 입력 요소 역할
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 클래스 정의 ---
+
+class AXNode:
+    """AXUIElement 래퍼입니다. 속성 조회/설정, 동작 수행, 하위 트리 탐색을 제공합니다."""
+
+    def __init__(self, element):
+        self.element = element
+
+    # 속성 값을 읽습니다.
+    def get(self, attribute, default=None):
+        """속성 값을 반환합니다. 속성이 없거나 읽기 실패 시 default."""
+        try:
+            err, value = AS.AXUIElementCopyAttributeValue(self.element, attribute, None)
+        except Exception:
+            return default
+        return value if err == 0 and value is not None else default
+
+    # 속성 값을 설정합니다.
+    def set(self, attribute, value):
+        """속성 값을 설정하고 성공 여부를 반환합니다."""
+        try:
+            return AS.AXUIElementSetAttributeValue(self.element, attribute, value) == 0
+        except Exception:
+            return False
+
+    # 동작을 수행합니다.
+    def perform(self, action):
+        """AXPress, AXRaise 등의 동작을 수행하고 성공 여부를 반환합니다."""
+        try:
+            return AS.AXUIElementPerformAction(self.element, action) == 0
+        except Exception:
+            return False
+
+    # 지원하는 동작 목록을 반환합니다.
+    def actions(self):
+        """지원하는 동작 이름 목록을 반환합니다."""
+        try:
+            err, names = AS.AXUIElementCopyActionNames(self.element, None)
+        except Exception:
+            return []
+        return list(names or []) if err == 0 else []
+
+    @property
+    def role(self):
+        return self.get("AXRole")
+
+    @property
+    def title(self):
+        return self.get("AXTitle")
+
+    @property
+    def value(self):
+        return self.get("AXValue")
+
+    # 요소를 값으로 갖는 속성을 노드로 읽습니다.
+    def node(self, attribute):
+        """요소 하나를 값으로 갖는 속성(AXFocusedWindow 등)을 노드로 반환합니다. 없으면 None."""
+        element = self.get(attribute)
+        return self.__class__(element) if element is not None else None
+
+    # 요소 목록을 값으로 갖는 속성을 노드 목록으로 읽습니다.
+    def nodes(self, attribute):
+        """요소 목록을 값으로 갖는 속성(AXChildren, AXWindows 등)을 노드 목록으로 반환합니다."""
+        return [self.__class__(element) for element in self.get(attribute) or []]
+
+    # 자식 노드 목록을 반환합니다.
+    def children(self):
+        """자식 노드 목록을 반환합니다."""
+        return self.nodes("AXChildren")
+
+    # 노드가 표시하는 텍스트를 반환합니다.
+    def text(self):
+        """제목, 값, 설명 순으로 처음 나오는 문자열을 반환합니다. 없으면 빈 문자열."""
+        for attribute in ("AXTitle", "AXValue", "AXDescription"):
+            value = self.get(attribute)
+            if isinstance(value, str) and value:
+                return value
+        return ""
+
+    # 화면상 위치와 크기를 반환합니다.
+    def frame(self):
+        """화면상 (x, y, w, h)를 반환합니다. 얻을 수 없으면 None."""
+        pos_ref, size_ref = self.get("AXPosition"), self.get("AXSize")
+        if pos_ref is None or size_ref is None:
+            return None
+        ok_pos, point = AS.AXValueGetValue(pos_ref, AS.kAXValueCGPointType, None)
+        ok_size, size = AS.AXValueGetValue(size_ref, AS.kAXValueCGSizeType, None)
+        if not (ok_pos and ok_size):
+            return None
+        return (int(point.x), int(point.y), int(size.width), int(size.height))
+
+    # 하위 트리를 너비 우선으로 순회합니다.
+    def walk(self, max_depth=AX_MAX_DEPTH, prune_roles=()):
+        """자신을 포함한 하위 노드를 너비 우선으로 순회합니다. prune_roles 역할의 노드는 하위를 탐색하지 않습니다."""
+        queue = deque([(self, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            yield node
+            if depth < max_depth and (not prune_roles or node.role not in prune_roles):
+                queue.extend((child, depth + 1) for child in node.children())
+
+    # 조건에 맞는 하위 노드를 모두 찾습니다.
+    def find_all(self, predicate, max_depth=AX_MAX_DEPTH, prune_roles=()):
+        """조건(predicate)에 맞는 하위 노드를 모두 반환합니다 (prune_roles 역할의 하위는 건너뜀)."""
+        return [node for node in self.walk(max_depth, prune_roles) if predicate(node)]
+
+    # 조건에 맞는 첫 하위 노드를 찾습니다.
+    def find(self, predicate, max_depth=AX_MAX_DEPTH):
+        """조건(predicate)에 맞는 첫 하위 노드를 반환합니다. 없으면 None."""
+        return next((node for node in self.walk(max_depth) if predicate(node)), None)
+
+    # 같은 UI 요소를 가리키는지 비교합니다 (AXUIElement는 CFEqual로 비교됨).
+    def __eq__(self, other):
+        return isinstance(other, AXNode) and self.element == other.element
+
+    def __hash__(self):
+        return hash(self.element)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} role={self.role!r} text={self.text()!r}>"
+
+
+class FakeAXNode(AXNode):
+    """
+    딕셔너리로 만든 가짜 AX 트리의 노드입니다 (Linux 테스트용, fake_element로 생성).
+    속성은 딕셔너리 값 그대로, 화면 위치는 "AXFrame" (x, y, w, h)로 지정하고,
+    수행한 동작은 요소의 "performed" 목록에 남기며 "on_<동작>" 콜백이 있으면 호출합니다.
+    """
+
+    def get(self, attribute, default=None):
+        value = self.element.get(attribute)
+        return default if value is None else value
+
+    def set(self, attribute, value):
+        if attribute not in self.element or self.element.get("AXEnabled") is False:
+            return False
+        self.element[attribute] = value
+        return True
+
+    def perform(self, action):
+        if action not in self.actions():
+            return False
+        self.element.setdefault("performed", []).append(action)
+        callback = self.element.get(f"on_{action}")
+        if callback is not None:
+            callback(self)
+        return True
+
+    def actions(self):
+        return list(self.element.get("AXActions", []))
+
+    def frame(self):
+        frame = self.element.get("AXFrame")
+        return tuple(frame) if frame is not None else None
+
+    def __eq__(self, other):
+        return isinstance(other, FakeAXNode) and self.element is other.element
+
+    def __hash__(self):
+        return id(self.element)
+
+# --- 함수 정의 ---
+
+# 가짜 AX 트리 요소를 만듭니다.
+def fake_element(role, *children, **attributes):
+    """
+    FakeAXNode로 감쌀 가짜 요소 딕셔너리를 만듭니다 (Linux 테스트용).
+    예: fake_element("AXWindow", fake_element("AXButton", AXTitle="추가", AXActions=["AXPress"]), AXTitle="친구 추가")
+    """
+    element = {"AXRole": role, "AXChildren": list(children)}
+    element.update(attributes)
+    return element
+
+# Accessibility 권한이 있는지 확인합니다.
+def is_available():
+    """Accessibility API를 사용할 수 있는지(macOS + 손쉬운 사용 권한) 반환합니다."""
+    if AS is None:
+        return False
+    try:
+        return bool(AS.AXIsProcessTrusted())
+    except Exception:
+        return False
+
+# KakaoTalk 프로세스 ID를 찾습니다.
+def find_kakaotalk_pid():
+    """실행 중인 KakaoTalk의 프로세스 ID를 반환합니다. 없으면 None."""
+    if NSWorkspace is None:
+        return None
+    for app in NSWorkspace.sharedWorkspace().runningApplications():
+        if (app.bundleIdentifier() or "") == KAKAO_BUNDLE_ID or app.localizedName() in KAKAO_APP_NAMES:
+            return app.processIdentifier()
+    return None
+
+# KakaoTalk 앱 노드를 반환합니다.
+def kakao_app():
+    """KakaoTalk 앱의 AXNode를 반환합니다. 실행 중이 아니거나 권한이 없으면 None."""
+    if not is_available():
+        return None
+    pid = find_kakaotalk_pid()
+    if pid is None:
+        return None
+    return AXNode(AS.AXUIElementCreateApplication(pid))
+
+# 조건이 만족될 때까지 기다립니다.
+def wait_for(condition, timeout, interval=AX_POLL_INTERVAL):
+    """
+    condition()이 참 값을 반환할 때까지 짧은 간격으로 확인하고 그 값을 반환합니다.
+    고정 대기 대신 UI 상태가 바뀌는 즉시 진행하기 위해 사용합니다. 시간 초과 시 None.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = condition()
+        except Exception as e:
+            log.debug(f"AX 조건 확인 중 오류 (재시도): {e}")
+            result = None
+        if result:
+            return result
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+
+# 이름 비교용 정규화
+def normalize_title(text):
+    """이름 비교용으로 NFC 정규화, 앞뒤 공백 제거, 연속 공백 축약을 수행합니다."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+# 앱의 창 목록을 반환합니다.
+def windows(app):
+    """앱의 창 노드 목록을 반환합니다."""
+    return app.nodes("AXWindows")
+
+# 포커스된 창을 반환합니다.
+def focused_window(app):
+    """앱에서 포커스된 창 노드를 반환합니다. 없으면 None."""
+    return app.node("AXFocusedWindow")
+
+# 포커스된 UI 요소를 반환합니다.
+def focused_element(app):
+    """앱에서 키보드 포커스를 가진 요소 노드를 반환합니다. 없으면 None."""
+    return app.node("AXFocusedUIElement")
+
+# 포커스된 텍스트 입력 요소를 반환합니다.
+def focused_text_field(app):
+    """키보드 포커스를 가진 요소가 텍스트 입력 요소이면 반환합니다. 아니면 None."""
+    element = focused_element(app)
+    return element if element is not None and element.role in INPUT_ROLES else None
+
+# 제목이 일치하는 창을 찾습니다.
+def find_window(app, title):
+    """제목이 정확히 일치하는 창 노드를 반환합니다. 없으면 None."""
+    wanted = normalize_title(title)
+    return next((win for win in windows(app) if normalize_title(win.title) == wanted), None)
+
+# 메인 창(친구/채팅 목록)을 반환합니다.
+def main_window(app):
+    """제목이 앱 이름인 메인 창 노드를 반환합니다. 없으면 None."""
+    return next((win for win in windows(app) if normalize_title(win.title) in KAKAO_APP_NAMES), None)
+
+# 포커스된 창이 주어진 제목인지 확인합니다.
+def focused_window_titled(app, title):
+    """포커스된 창의 제목이 정확히 일치하면 그 창 노드를, 아니면 None을 반환합니다."""
+    window = focused_window(app)
+    if window is not None and normalize_title(window.title) == normalize_title(title):
+        return window
+    return None
+
+# 목록 컨테이너를 찾습니다.
+def find_lists(root, max_depth=AX_MAX_DEPTH):
+    """root 아래의 목록 컨테이너 노드를 반환합니다. 목록 안(행)은 탐색하지 않습니다."""
+    lists = []
+    queue = deque([(root, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        if node.role in LIST_ROLES:
+            lists.append(node)
+            continue
+        if depth < max_depth:
+            queue.extend((child, depth + 1) for child in node.children())
+    return lists
+
+# 목록 컨테이너의 행을 반환합니다.
+def list_rows(container):
+    """목록 컨테이너의 행 노드 목록을 반환합니다 (AXRows가 없으면 자식 중 행 역할)."""
+    return container.nodes("AXRows") or [node for node in container.children() if node.role in ROW_ROLES]
+
+# 검색 결과 목록에서 이름이 정확히 일치하는 행을 찾습니다.
+def find_rows_titled(root, title, max_depth=AX_MAX_DEPTH):
+    """
+    root 아래 목록의 행 중 이름 텍스트가 정확히 일치하는 행 노드 목록을 반환합니다.
+    트리 전체가 아니라 목록 컨테이너와 그 행만 확인합니다.
+    """
+    if root is None:
+        return []
+    wanted = normalize_title(title)
+    rows = []
+    for container in find_lists(root, max_depth):
+        for row in list_rows(container):
+            texts = [normalize_title(node.text()) for node in row.find_all(lambda n: n.role in TEXT_ROLES, 3)]
+            if wanted in texts:
+                rows.append(row)
+    return rows
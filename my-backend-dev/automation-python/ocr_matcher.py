@@ -0,0 +1,209 @@
+# flake8: noqa
+
+import logging
+import unicodedata
+from collections import deque, namedtuple
+
+# --- 상수 정의 ---
+# 한글 음절 분해용 자모 테이블 (호환 자모)
+HANGUL_SYLLABLE_START = 0xAC00 # '가'
+HANGUL_SYLLABLE_END = 0xD7A3 # '힣'
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ" # 초성 19자
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ" # 중성 21자
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"] # 종성 28자 (없음 포함)
+
+# 퍼지 매칭 상수
+DEFAULT_MAX_ERROR_RATIO = 0.2 # 패턴 자모 길이 대비 허용 편집 거리 비율
+MIN_FUZZY_LENGTH = 6 # 이 길이(자모) 미만의 짧은 패턴은 정확히 일치해야 함
+DEFAULT_MIN_CONFIDENCE = 0.75 # classify()가 라벨을 반환하기 위한 최소 신뢰도
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 매칭 결과 (라벨, 신뢰도 0~1, 매칭된 원본 패턴, 자모 편집 거리)
+OutcomeMatch = namedtuple("OutcomeMatch", ["label", "confidence", "pattern", "distance"])
+
+# --- 함수 정의 ---
+
+# OCR 텍스트를 매칭용으로 정규화합니다.
+def normalize_text(text):
+    """NFC 정규화 후 공백/구두점을 제거하고 영문은 소문자로 바꿉니다."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    return "".join(ch.lower() for ch in text if ch.isalnum())
+
+# 한글 음절을 초성/중성/종성 자모로 분해합니다.
+def to_jamo(text):
+    """한글 음절을 자모 시퀀스로 분해합니다. 한글 외 문자는 그대로 유지합니다."""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_SYLLABLE_START <= code <= HANGUL_SYLLABLE_END:
+            offset = code - HANGUL_SYLLABLE_START
+            out.append(CHOSEONG[offset // 588])
+            out.append(JUNGSEONG[(offset % 588) // 28])
+            jong = JONGSEONG[offset % 28]
+            if jong:
+                out.append(jong)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+class OutcomeMatcher:
+    """
+    여러 결과 라벨의 패턴을 한 번에 컴파일해 OCR 텍스트를 한 번만 훑어 분류합니다.
+    정확 일치는 Aho-Corasick 오토마톤으로, 오인식 문자는 패턴별 비트 병렬(Myers)
+    근사 부분 문자열 매칭으로 자모 단위 편집 거리를 계산합니다.
+    """
+
+    def __init__(self, patterns, max_error_ratio=DEFAULT_MAX_ERROR_RATIO,
+                 min_confidence=DEFAULT_MIN_CONFIDENCE, min_fuzzy_length=MIN_FUZZY_LENGTH):
+        """
+        Args:
+            patterns (dict): {라벨: [패턴 문자열, ...]} 형식. 선언 순서가 동점 시 우선순위입니다.
+            max_error_ratio (float): 패턴 자모 길이 대비 허용 편집 거리 비율
+            min_confidence (float): classify()가 라벨을 반환하기 위한 최소 신뢰도
+            min_fuzzy_length (int): 퍼지 매칭을 허용할 최소 패턴 자모 길이
+        """
+        self.min_confidence = min_confidence
+        self._entries = [] # (라벨, 원본 패턴, 자모 패턴, 허용 거리, 우선순위)
+        seen = set()
+        for priority, (label, label_patterns) in enumerate(patterns.items()):
+            for pattern in label_patterns:
+                jamo = to_jamo(normalize_text(pattern))
+                if not jamo or (label, jamo) in seen:
+                    continue
+                seen.add((label, jamo))
+                max_k = int(len(jamo) * max_error_ratio) if len(jamo) >= min_fuzzy_length else 0
+                self._entries.append((label, pattern, jamo, max_k, priority))
+        self._build_automaton()
+        self._build_bit_vectors()
+        log.debug(f"OutcomeMatcher 컴파일 완료: 라벨 {len(patterns)}개, 패턴 {len(self._entries)}개")
+
+    # Aho-Corasick 오토마톤(goto/fail/output)을 구성합니다.
+    def _build_automaton(self):
+        """Aho-Corasick 오토마톤(goto/fail/output)을 구성합니다."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for index, entry in enumerate(self._entries):
+            node = 0
+            for ch in entry[2]:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = nxt
+            self._output[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    # 퍼지 매칭이 허용된 패턴마다 Myers 알고리즘용 문자 비트마스크를 준비합니다.
+    def _build_bit_vectors(self):
+        """퍼지 매칭이 허용된 패턴마다 Myers 알고리즘용 문자 비트마스크를 준비합니다."""
+        self._fuzzy = [] # (엔트리 인덱스, peq, mask, high_bit, 길이)
+        for index, (_, _, jamo, max_k, _) in enumerate(self._entries):
+            if max_k <= 0:
+                continue
+            peq = {}
+            for pos, ch in enumerate(jamo):
+                peq[ch] = peq.get(ch, 0) | (1 << pos)
+            m = len(jamo)
+            self._fuzzy.append((index, peq, (1 << m) - 1, 1 << (m - 1), m))
+
+    # 텍스트를 한 번 훑어 패턴별 최소 편집 거리를 계산합니다.
+    def _scan_distances(self, jamo_text):
+        """텍스트를 한 번 훑어 패턴별 최소 편집 거리(정확 일치는 0)를 계산합니다."""
+        best = {}
+        # Myers 상태: [Pv, Mv, score]
+        states = [[mask, 0, m] for (_, _, mask, _, m) in self._fuzzy]
+        node = 0
+        for ch in jamo_text:
+            # 1) Aho-Corasick 정확 매칭
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for index in self._output[node]:
+                best[index] = 0
+
+            # 2) 비트 병렬 근사 매칭 (Myers/Hyyrö, 텍스트 내 임의 위치에서 시작 허용)
+            for state, (index, peq, mask, high, _) in zip(states, self._fuzzy):
+                pv, mv, score = state
+                eq = peq.get(ch, 0)
+                xv = eq | mv
+                xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+                ph = mv | (~(xh | pv) & mask)
+                mh = pv & xh
+                if ph & high:
+                    score += 1
+                elif mh & high:
+                    score -= 1
+                ph = (ph << 1) & mask
+                mh = (mh << 1) & mask
+                state[0] = mh | (~(xv | ph) & mask)
+                state[1] = ph & xv
+                state[2] = score
+                if score < best.get(index, score + 1):
+                    best[index] = score
+        return best
+
+    # 라벨별 최고 신뢰도 매칭을 반환합니다.
+    def scan(self, text):
+        """
+        텍스트를 한 번 훑어 라벨별 최고 신뢰도 매칭을 반환합니다.
+        허용 편집 거리를 넘는 매칭은 제외됩니다.
+
+        Returns:
+            dict: {라벨: OutcomeMatch}
+        """
+        jamo_text = to_jamo(normalize_text(text))
+        if not jamo_text:
+            return {}
+        results = {}
+        for index, distance in self._scan_distances(jamo_text).items():
+            label, pattern, jamo, max_k, _ = self._entries[index]
+            if distance > max_k:
+                continue
+            confidence = 1.0 - distance / len(jamo)
+            current = results.get(label)
+            if current is None or confidence > current.confidence:
+                results[label] = OutcomeMatch(label, confidence, pattern, distance)
+        return results
+
+    # 가장 신뢰도가 높은 매칭 하나를 반환합니다.
+    def best(self, text):
+        """가장 신뢰도가 높은 OutcomeMatch를 반환합니다. 동점이면 먼저 선언된 라벨이 우선합니다. 없으면 None."""
+        matches = self.scan(text)
+        if not matches:
+            return None
+        priorities = {entry[0]: entry[4] for entry in self._entries}
+        return max(matches.values(), key=lambda m: (m.confidence, -priorities[m.label]))
+
+    # 텍스트를 분류해 (라벨, 신뢰도)를 반환합니다.
+    def classify(self, text):
+        """
+        텍스트를 분류해 (라벨, 신뢰도)를 반환합니다.
+        최소 신뢰도에 미치지 못하면 (None, 최고 신뢰도)를 반환합니다.
+        """
+        match = self.best(text)
+        if match is None:
+            return None, 0.0
+        if match.confidence < self.min_confidence:
+            return None, match.confidence
+        return match.label, match.confidence
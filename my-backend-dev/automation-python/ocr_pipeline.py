@@ -0,0 +1,97 @@
+# flake8: noqa
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 상수 정의 ---
+DEFAULT_OCR_WORKERS = 1 # OCR 워커 수 (tesseract 자체가 멀티코어를 사용하므로 1개로 충분)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+
+class OcrPipeline:
+    """
+    UI 스레드가 캡처한 프레임을 백그라운드 워커에서 인식하는 비동기 검증 단계입니다.
+    UI 스레드는 submit() 후 바로 다음 작업으로 넘어가고, 결과는 제출 순서대로 회수합니다.
+    """
+
+    def __init__(self, recognize, max_workers=DEFAULT_OCR_WORKERS, name="ocr"):
+        """
+        Args:
+            recognize (callable): 워커에서 실행할 인식 함수. submit()에 넘긴 인자를 그대로 받습니다.
+            max_workers (int): 워커 스레드 수
+            name (str): 로그 및 스레드 이름 접두사
+        """
+        self._recognize = recognize
+        self._name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._pending = [] # 제출 순서를 유지하는 (key, future) 목록
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+    # 인식 작업을 워커에 제출합니다.
+    def submit(self, key, *args, **kwargs):
+        """인식 작업을 워커에 제출하고 Future를 반환합니다. key는 결과 회수 시 함께 돌려줍니다."""
+        future = self._executor.submit(self._recognize, *args, **kwargs)
+        with self._lock:
+            self._pending.append((key, future))
+        log.debug(f"[{self._name}] 인식 작업 제출: key={key} (대기 {len(self._pending)}건)")
+        return future
+
+    # 아직 회수되지 않은 작업 수를 반환합니다.
+    def pending_count(self):
+        """아직 회수되지 않은 작업 수를 반환합니다."""
+        with self._lock:
+            return len(self._pending)
+
+    # 앞에서부터 완료된 작업만 제출 순서대로 회수합니다 (블로킹 없음).
+    def collect_ready(self):
+        """
+        앞에서부터 연속으로 완료된 작업을 제출 순서대로 회수합니다 (블로킹 없음).
+
+        Returns:
+            list: [(key, result, error), ...] error는 워커 예외 또는 None
+        """
+        ready = []
+        with self._lock:
+            while self._pending and self._pending[0][1].done():
+                key, future = self._pending.pop(0)
+                ready.append(self._unwrap(key, future, None))
+        return ready
+
+    # 남은 모든 작업이 끝날 때까지 기다려 제출 순서대로 회수합니다.
+    def drain(self, timeout=None):
+        """
+        남은 모든 작업이 끝날 때까지 기다려 제출 순서대로 회수합니다.
+
+        Args:
+            timeout (float): 작업당 최대 대기 시간(초). None이면 무제한.
+
+        Returns:
+            list: [(key, result, error), ...]
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return [self._unwrap(key, future, timeout) for key, future in pending]
+
+    # Future에서 결과 또는 예외를 꺼냅니다.
+    def _unwrap(self, key, future, timeout):
+        """Future에서 결과 또는 예외를 꺼내 (key, result, error)로 반환합니다."""
+        try:
+            return key, future.result(timeout=timeout), None
+        except Exception as e:
+            log.error(f"[{self._name}] 인식 작업 실패: key={key}, 오류={e}", exc_info=True)
+            return key, None, e
+
+    # 워커를 종료합니다.
+    def shutdown(self, wait=True):
+        """워커를 종료합니다. 회수되지 않은 작업은 버려집니다."""
+        self._executor.shutdown(wait=wait)
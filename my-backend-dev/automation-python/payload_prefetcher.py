@@ -0,0 +1,162 @@
+# flake8: noqa
+
+import os
+import logging
+import unicodedata
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 상수 정의 ---
+PREFETCH_LOOKAHEAD = 3 # 현재 사용자 이후 미리 준비할 사용자 수
+PREFETCH_WORKERS = 2 # 준비 작업 워커 스레드 수
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 준비된 메시지 (원래 인덱스, 타입, 정규화된 내용, 준비된 이미지 목록, 클립보드 페이로드 (종류, 값), 오류)
+PreparedMessage = namedtuple("PreparedMessage", ["index", "type", "content", "images", "payload", "error"])
+# 준비된 사용자 그룹 (사용자 이름, 준비된 메시지 목록, 그룹 오류)
+PreparedGroup = namedtuple("PreparedGroup", ["username", "messages", "error"])
+
+# --- 함수 정의 ---
+
+# 텍스트 메시지 내용을 정규화합니다.
+def normalize_message_text(content):
+    """NFC 정규화, 줄바꿈 통일, 끝 공백 제거를 수행합니다 (IME/붙여넣기 시 자모 분리 방지)."""
+    text = unicodedata.normalize("NFC", content)
+    return text.replace("\r\n", "\n").replace("\r", "\n").rstrip()
+
+# 이미지 메시지의 경로 목록을 검증합니다.
+def _validate_image_paths(content):
+    """쉼표로 구분된 이미지 경로를 검증해 (경로 목록, 오류)를 반환합니다."""
+    if not isinstance(content, str):
+        return [], f"잘못된 이미지 경로 수신: {content}"
+    paths = [p.strip() for p in content.split(',') if p.strip()]
+    if not paths:
+        return [], "유효한 이미지 파일이 없습니다."
+    for path in paths:
+        if not os.path.isabs(path):
+            return paths, f"절대 경로가 아닌 이미지 경로 수신: {path}"
+        if not os.path.exists(path):
+            return paths, f"이미지 파일 없음: {path}"
+        if not os.path.isfile(path):
+            return paths, f"이미지 경로가 파일이 아님: {path}"
+    return paths, None
+
+# 메시지 하나를 검증하고 전송용으로 준비합니다.
+def prepare_message(index, msg, image_cache):
+    """
+    메시지 하나를 검증하고 이미지 디코딩/변환, 클립보드 페이로드 준비까지 수행합니다.
+    image_cache가 None이면(드라이런) 경로만 검증하고 이미지는 준비하지 않으며, 페이로드는 원본 파일 목록입니다.
+    """
+    msg_type = msg.get("type", "unknown")
+    content = msg.get("content", "")
+    if not content:
+        return PreparedMessage(index, msg_type, content, [], None, None) # 빈 메시지는 전송 루프에서 건너뜀
+
+    if msg_type == "text":
+        text = normalize_message_text(content)
+        return PreparedMessage(index, msg_type, text, [], ("text", text), None)
+
+    if msg_type == "image":
+        paths, error = _validate_image_paths(content)
+        if error:
+            return PreparedMessage(index, msg_type, content, [], None, error)
+        if image_cache is None:
+            return PreparedMessage(index, msg_type, content, [], ("files", paths), None)
+        images = [image_cache.prepare(path) for path in paths]
+        if len(images) == 1 and images[0].tiff_path:
+            payload = ("tiff", image_cache.tiff_bytes(images[0]))
+        else:
+            payload = ("files", [image.path for image in images])
+        return PreparedMessage(index, msg_type, content, images, payload, None)
+
+    return PreparedMessage(index, msg_type, content, [], None, f"지원되지 않는 메시지 타입 '{msg_type}'")
+
+# 사용자 그룹의 페이로드 시그니처를 계산합니다.
+def payload_signature(group):
+    """사용자 그룹이 보내는 메시지 순서의 시그니처 ((타입, 내용), ...)를 반환합니다. 같으면 같은 페이로드입니다."""
+    return tuple((msg.get("type"), msg.get("content")) for msg in group.get("messages") or [])
+
+# 같은 페이로드를 보내는 사용자끼리 연속되도록 처리 순서를 정합니다.
+def order_groups_by_payload(message_groups):
+    """
+    같은 페이로드 시그니처를 가진 사용자가 연속되도록 처리 순서(원래 인덱스 목록)를 반환합니다.
+    시그니처 묶음은 처음 등장한 순서를, 묶음 안에서는 원래 순서를 유지합니다.
+    """
+    buckets = {}
+    for index, group in enumerate(message_groups):
+        buckets.setdefault(payload_signature(group), []).append(index)
+    return [index for indices in buckets.values() for index in indices]
+
+# 사용자 그룹 하나의 모든 메시지를 준비합니다.
+def prepare_group(group, image_cache):
+    """
+    사용자 그룹 하나의 모든 메시지를 준비합니다. 잘못된 메시지가 있으면 그룹 오류로 기록합니다.
+    image_cache가 None이면 검증만 수행합니다 (드라이런).
+    """
+    username = group.get("username")
+    try:
+        prepared = [prepare_message(idx, msg, image_cache) for idx, msg in enumerate(group.get("messages") or [])]
+    except Exception as e:
+        log.error(f"{username} 메시지 준비 중 오류 발생: {e}", exc_info=True)
+        return PreparedGroup(username, [], f"메시지 준비 실패: {e}")
+    errors = [f"메시지 #{m.index + 1}: {m.error}" for m in prepared if m.error]
+    return PreparedGroup(username, prepared, "; ".join(errors) if errors else None)
+
+
+class PayloadPrefetcher:
+    """
+    message_groups를 제한된 개수만큼 미리 준비하는 선행 단계입니다.
+    UI 스레드가 사용자 N을 처리하는 동안 워커 스레드가 N+1.. 사용자의 경로 검증, 이미지 준비,
+    클립보드 페이로드 준비를 끝내 두므로 UI 루프는 붙여넣기만 수행합니다.
+    바로 앞 사용자와 페이로드가 같으면 다시 준비하지 않고 준비 결과를 공유합니다.
+    """
+
+    def __init__(self, message_groups, image_cache, lookahead=PREFETCH_LOOKAHEAD, max_workers=PREFETCH_WORKERS):
+        self._groups = list(message_groups)
+        self._image_cache = image_cache
+        self._lookahead = max(1, lookahead)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futures = deque()
+        self._next = 0
+        self._last_signature = None # 마지막으로 제출한 그룹의 페이로드 시그니처
+        self._last_future = None
+        self.reused = 0 # 준비 결과를 공유한 사용자 수
+
+    # 선행 창을 채웁니다.
+    def _fill(self):
+        """선행 창(lookahead + 현재 1건)이 찰 때까지 다음 그룹 준비를 제출합니다."""
+        while self._next < len(self._groups) and len(self._futures) <= self._lookahead:
+            group = self._groups[self._next]
+            signature = payload_signature(group)
+            if self._last_future is not None and signature == self._last_signature:
+                future = self._last_future # 같은 페이로드: 준비 결과 공유
+                self.reused += 1
+            else:
+                future = self._executor.submit(prepare_group, group, self._image_cache)
+                self._last_signature, self._last_future = signature, future
+            self._futures.append((group, future))
+            self._next += 1
+
+    def __iter__(self):
+        """(원본 그룹, PreparedGroup)을 원래 순서대로 반환합니다."""
+        try:
+            self._fill()
+            while self._futures:
+                group, future = self._futures.popleft()
+                self._fill() # 현재 그룹을 처리하는 동안 다음 그룹 준비
+                try:
+                    prepared = future.result()._replace(username=group.get("username"))
+                except Exception as e:
+                    prepared = PreparedGroup(group.get("username"), [], f"메시지 준비 실패: {e}")
+                if prepared.error:
+                    log.warning(f"{prepared.username} 입력 오류 (UI 진입 전 감지): {prepared.error}")
+                yield group, prepared
+        finally:
+            self.close()
+
+    # 워커를 종료합니다.
+    def close(self):
+        """워커를 종료합니다. 아직 시작하지 않은 준비 작업은 취소됩니다."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,144 @@
+# flake8: noqa
+
+import re
+import time
+import sqlite3
+import logging
+import pathlib
+import threading
+from collections import namedtuple
+
+# --- 상수 정의 ---
+BASE_DIR = pathlib.Path(__file__).parent.absolute()
+PHONE_REGISTRY_PATH = BASE_DIR / "phone-registry.sqlite3" # 전화번호별 마지막 친구 추가 결과 저장 경로
+DEFAULT_COUNTRY_CODE = "82" # 국가 번호 없이 들어온 번호에 붙일 국가 번호 (대한민국)
+E164_MIN_DIGITS = 8 # 국가 번호 포함 최소 자릿수
+E164_MAX_DIGITS = 15 # E.164 최대 자릿수
+
+DAY = 24 * 60 * 60
+# 결과별 유효 시간(초). 여기에 없는 결과(fail 등)는 저장하지 않고 매번 다시 시도합니다.
+PHONE_REGISTRY_TTL = {
+    "success": 30 * DAY, # 친구가 삭제될 수 있으므로 기한을 둠
+    "already_registered": 30 * DAY,
+    "not_allowed": 7 * DAY, # 상대 설정이 바뀔 수 있어 짧게
+}
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 저장된 전화번호 결과 (E.164 번호, 결과 상태, 사유, 당시 사용자 이름, 기록 시각(epoch 초))
+RegistryEntry = namedtuple("RegistryEntry", ["phone", "status", "reason", "username", "updated_at"])
+
+# --- 함수 정의 ---
+
+# 전화번호를 E.164 형식으로 정규화합니다.
+def normalize_phone(phone, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    전화번호를 E.164 형식(+국가번호...)으로 정규화합니다. 하이픈/공백/괄호는 제거합니다.
+    "010-1234-5678" -> "+821012345678", "+82 10-1234-5678" -> "+821012345678", "0082..." -> "+82..."
+    국가 번호 뒤에 국내 번호의 맨 앞 0이 그대로 붙은 경우("+82 010-...")는 0을 뺍니다. 정규화할 수 없으면 None.
+    """
+    if not phone:
+        return None
+    text = str(phone).strip()
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("+"):
+        pass # 이미 국가 번호 포함
+    elif digits.startswith("00"): # 국제 전화 접두어
+        digits = digits[2:]
+    elif digits.startswith("0"): # 국내 번호: 맨 앞 0을 국가 번호로 대체
+        digits = country_code + digits[1:]
+    elif not (digits.startswith(country_code) and len(digits) > 10):
+        digits = country_code + digits
+    if digits.startswith(country_code + "0"): # 국가 번호 뒤의 국내 접두어 0
+        digits = country_code + digits[len(country_code) + 1:]
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        return None
+    return "+" + digits
+
+# --- 클래스 정의 ---
+
+class PhoneRegistry:
+    """
+    정규화된 전화번호별 마지막 친구 추가 결과를 sqlite에 저장하는 레지스트리입니다.
+    결과마다 유효 시간(ttl)을 두고, 유효한 결과가 있는 번호는 UI를 거치지 않고 바로 응답합니다.
+    """
+
+    def __init__(self, path=PHONE_REGISTRY_PATH, ttl=None):
+        self.path = str(path)
+        self.ttl = dict(PHONE_REGISTRY_TTL if ttl is None else ttl)
+        self._lock = threading.Lock()
+        self._conn = None # 처음 사용할 때 연결 (import만으로 파일을 만들지 않도록)
+        self.hits = 0
+        self.misses = 0
+
+    # 데이터베이스 연결을 반환합니다 (락을 잡은 상태에서 호출).
+    def _db(self):
+        """처음 호출될 때 데이터베이스를 열고 테이블을 만듭니다."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS phones ("
+                " phone TEXT PRIMARY KEY, status TEXT NOT NULL, reason TEXT, username TEXT, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # 번호의 유효한 결과를 조회합니다.
+    def lookup(self, phone, now=None):
+        """
+        E.164 번호의 저장된 결과가 유효 시간 안이면 RegistryEntry를, 없거나 만료되었으면 None을 반환합니다.
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT phone, status, reason, username, updated_at FROM phones WHERE phone = ?", (phone,)
+            ).fetchone()
+        entry = RegistryEntry(*row) if row else None
+        ttl = self.ttl.get(entry.status) if entry else None
+        now = time.time() if now is None else now
+        if entry is None or ttl is None or now - entry.updated_at > ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    # 번호의 결과를 기록합니다.
+    def record(self, phone, status, reason=None, username=None, now=None):
+        """결과를 기록하고 저장 여부를 반환합니다. 유효 시간이 정의되지 않은 결과(fail 등)는 저장하지 않습니다."""
+        if status not in self.ttl:
+            return False
+        now = time.time() if now is None else now
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO phones (phone, status, reason, username, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (phone, status, reason, username, now),
+            )
+            conn.commit()
+        return True
+
+    # 번호의 기록을 지웁니다.
+    def forget(self, phone):
+        """번호의 저장된 결과를 지웁니다."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("DELETE FROM phones WHERE phone = ?", (phone,))
+            conn.commit()
+
+    # 레지스트리 상태를 반환합니다.
+    def stats(self):
+        """결과별 저장 건수와 조회 적중/미스 수를 반환합니다."""
+        with self._lock:
+            rows = self._db().execute("SELECT status, COUNT(*) FROM phones GROUP BY status").fetchall()
+        return {"entries": dict(rows), "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 친구 추가 API가 함께 쓰는 전화번호 레지스트리
+PHONE_REGISTRY = PhoneRegistry()
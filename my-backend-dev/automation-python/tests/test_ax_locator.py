@@ -0,0 +1,114 @@
+# flake8: noqa
+
+from kakao_ax import AXNode, FakeAXNode, fake_element
+from ax_locator import AXLocator, Locator
+
+
+LOCATORS = {
+    "add": Locator(window="main", role="AXButton", description=("친구 추가", "Add Friend")),
+    "confirm": Locator(window=("친구 추가",), role="AXButton", title="확인"),
+}
+
+
+def _main_window(button):
+    return fake_element("AXWindow", fake_element("AXGroup", button), AXTitle="카카오톡")
+
+
+def test_locate_finds_control_and_caches_it(fake_app):
+    button = fake_element("AXButton", AXDescription="친구 추가", AXActions=["AXPress"])
+    app = fake_app(_main_window(button))
+    locator = AXLocator(LOCATORS, app_provider=lambda: app)
+    first = locator.locate("add")
+    assert first == FakeAXNode(button)
+    assert locator.locate("add") == first
+    assert locator.stats() == {"cached": 1, "hits": 1, "misses": 1}
+
+
+def test_locate_matches_window_by_title_marker(fake_app):
+    button = fake_element("AXButton", AXTitle="확인")
+    dialog = fake_element("AXWindow", button, AXTitle="친구 추가")
+    app = fake_app(_main_window(fake_element("AXButton")), dialog)
+    assert AXLocator(LOCATORS, app_provider=lambda: app).locate("confirm") == FakeAXNode(button)
+
+
+def test_locate_skips_list_contents(fake_app):
+    button = fake_element("AXButton", AXDescription="친구 추가")
+    window = fake_element("AXWindow", fake_element("AXList", fake_element("AXRow", button)), AXTitle="카카오톡")
+    app = fake_app(window)
+    locator = AXLocator(LOCATORS, app_provider=lambda: app)
+    assert locator.locate("add") is None
+    assert locator.stats()["cached"] == 0
+
+
+def test_cache_is_dropped_when_window_changes(fake_app):
+    old_button = fake_element("AXButton", AXDescription="친구 추가")
+    new_button = fake_element("AXButton", AXDescription="Add Friend")
+    app = fake_app(_main_window(old_button))
+    locator = AXLocator(LOCATORS, app_provider=lambda: app)
+    assert locator.locate("add") == FakeAXNode(old_button)
+    app.element["AXWindows"] = [_main_window(new_button)]
+    assert locator.locate("add") == FakeAXNode(new_button)
+    assert locator.stats()["misses"] == 2
+
+
+def test_cache_is_dropped_when_element_dies_or_changes(fake_app):
+    button = fake_element("AXButton", AXDescription="친구 추가")
+    app = fake_app(_main_window(button))
+    locator = AXLocator(LOCATORS, app_provider=lambda: app)
+    locator.locate("add")
+    button["AXDescription"] = "다른 버튼"
+    assert locator.locate("add") is None
+    button["AXDescription"] = "친구 추가"
+    locator.locate("add")
+    button["AXRole"] = None
+    assert locator.locate("add") is None
+    assert locator.stats() == {"cached": 0, "hits": 0, "misses": 4}
+
+
+def test_invalidate_forces_search(fake_app):
+    button = fake_element("AXButton", AXDescription="친구 추가")
+    app = fake_app(_main_window(button))
+    locator = AXLocator(LOCATORS, app_provider=lambda: app)
+    locator.locate("add")
+    locator.invalidate("add")
+    locator.locate("add")
+    locator.invalidate()
+    locator.locate("add")
+    assert locator.stats() == {"cached": 1, "hits": 0, "misses": 3}
+
+
+def test_press_prefers_ax_press_then_clicks(fake_app):
+    pressable = fake_element("AXButton", AXDescription="친구 추가", AXActions=["AXPress"])
+    app = fake_app(_main_window(pressable))
+    locator = AXLocator(LOCATORS, app_provider=lambda: app)
+    clicks = []
+    assert locator.press("add", click=lambda x, y: clicks.append((x, y)))
+    assert pressable["performed"] == ["AXPress"] and clicks == []
+    clickable = fake_element("AXButton", AXDescription="친구 추가", AXFrame=(10, 20, 30, 40))
+    app.element["AXWindows"] = [_main_window(clickable)]
+    assert locator.press("add", click=lambda x, y: clicks.append((x, y)))
+    assert clicks == [(25, 40)]
+
+
+def test_press_refuses_disabled_control(fake_app):
+    button = fake_element("AXButton", AXDescription="친구 추가", AXActions=["AXPress"], AXEnabled=False)
+    app = fake_app(_main_window(button))
+    assert not AXLocator(LOCATORS, app_provider=lambda: app).press("add")
+    assert "performed" not in button
+
+
+def test_node_equality_follows_element_identity():
+    element = fake_element("AXButton", AXTitle="확인")
+    twin = fake_element("AXButton", AXTitle="확인")
+    assert FakeAXNode(element) == FakeAXNode(element)
+    assert hash(FakeAXNode(element)) == hash(FakeAXNode(element))
+    assert FakeAXNode(element) != FakeAXNode(twin)
+    assert len({FakeAXNode(element), FakeAXNode(element), FakeAXNode(twin)}) == 2
+
+
+def test_real_node_equality_compares_elements():
+    element = ("ax-element", 1)
+    assert AXNode(element) == AXNode(("ax-element", 1))
+    assert hash(AXNode(element)) == hash(AXNode(("ax-element", 1)))
+    assert AXNode(element) != AXNode(("ax-element", 2))
+    assert AXNode(element) != element
@@ -0,0 +1,48 @@
+# flake8: noqa
+
+import cv2
+import numpy as np
+from chat_verifier import Bubble, detect_bubbles, match_message_sequence
+
+YELLOW = (0, 229, 254) # 카카오톡 내 말풍선 #FEE500 (BGR)
+PHOTO = (140, 90, 40) # 이미지 말풍선 내용
+RED = (0, 0, 255)
+
+
+def _conversation():
+    """흰 배경 대화 영역: 내 텍스트 말풍선(실패 표시 포함), 내 이미지 말풍선, 왼쪽의 상대 노란 영역."""
+    area = np.full((300, 400, 3), 255, dtype=np.uint8)
+    cv2.rectangle(area, (30, 20), (120, 50), YELLOW, -1) # 왼쪽(상대 쪽)이라 제외
+    cv2.rectangle(area, (280, 30), (380, 60), YELLOW, -1) # 텍스트 말풍선
+    cv2.circle(area, (265, 45), 5, RED, -1) # 텍스트 말풍선 왼쪽 실패 표시
+    cv2.rectangle(area, (280, 100), (380, 180), PHOTO, -1) # 이미지 말풍선
+    cv2.rectangle(area, (300, 220), (380, 250), YELLOW, -1) # 마지막 텍스트 말풍선
+    return area
+
+
+def test_detect_bubbles_finds_my_bubbles_in_order():
+    bubbles = detect_bubbles(_conversation())
+    assert [(b.kind, b.error) for b in bubbles] == [("text", True), ("image", False), ("text", False)]
+    assert bubbles[0].x == 280 and bubbles[1].y == 100
+
+
+def test_detect_bubbles_on_empty_area():
+    assert detect_bubbles(np.full((200, 300, 3), 255, dtype=np.uint8)) == []
+    assert detect_bubbles(np.zeros((0, 300, 3), dtype=np.uint8)) == []
+
+
+def _bubble(kind, error=False):
+    return Bubble(kind, 0, 0, 10, 10, error)
+
+
+def test_match_message_sequence_aligns_from_bottom():
+    bubbles = [_bubble("text"), _bubble("text", error=True), _bubble("image"), _bubble("text")]
+    statuses = match_message_sequence(bubbles, ["text", "text", "text"])
+    assert [s["status"] for s in statuses] == ["failed", "mismatch", "delivered"]
+    assert statuses[1]["reason"] == "text 메시지 위치에 image 말풍선 감지"
+
+
+def test_match_message_sequence_reports_scrolled_off_messages_as_missing():
+    statuses = match_message_sequence([_bubble("image"), _bubble("text")], ["text", "text", "image", "text"])
+    assert [(s["index"], s["status"]) for s in statuses] == [(0, "missing"), (1, "missing"), (2, "delivered"), (3, "delivered")]
+    assert match_message_sequence([_bubble("text")], []) == []
@@ -0,0 +1,86 @@
+# flake8: noqa
+
+import pytest
+import input_macro
+from input_macro import InputMacro, InputEvent, RecordingBackend, KEY_CODES, MODIFIERS, create_input_macro
+
+
+def _macro():
+    backend = RecordingBackend()
+    return InputMacro(backend, min_gap=0), backend
+
+
+def _keys(events):
+    return [(event.kind, event.code, event.flags) for event in events]
+
+
+def test_click_records_move_down_up():
+    macro, backend = _macro()
+    macro.run(("click", 10.6, 20))
+    assert [(e.kind, e.point, e.clicks) for e in backend.events] == [
+        ("mouse_move", (10, 20), 1), ("mouse_down", (10, 20), 1), ("mouse_up", (10, 20), 1)]
+
+
+def test_double_click_counts_clicks():
+    macro, backend = _macro()
+    macro.run(("double_click", 5, 6))
+    assert [(e.kind, e.clicks) for e in backend.events] == [
+        ("mouse_move", 1), ("mouse_down", 1), ("mouse_up", 1), ("mouse_down", 2), ("mouse_up", 2)]
+
+
+def test_typed_keys_and_repeats():
+    macro, backend = _macro()
+    macro.run("a", "tab*2", "Enter")
+    a, tab, enter = KEY_CODES["a"], KEY_CODES["tab"], KEY_CODES["enter"]
+    assert _keys(backend.events) == [
+        ("key_down", a, 0), ("key_up", a, 0),
+        ("key_down", tab, 0), ("key_up", tab, 0), ("key_down", tab, 0), ("key_up", tab, 0),
+        ("key_down", enter, 0), ("key_up", enter, 0)]
+
+
+def test_hotkey_holds_modifiers_in_order():
+    macro, backend = _macro()
+    macro.run("cmd+shift+a")
+    cmd, cmd_flag = MODIFIERS["cmd"]
+    shift, shift_flag = MODIFIERS["shift"]
+    both = cmd_flag | shift_flag
+    assert _keys(backend.events) == [
+        ("key_down", cmd, cmd_flag), ("key_down", shift, both),
+        ("key_down", KEY_CODES["a"], both), ("key_up", KEY_CODES["a"], both),
+        ("key_up", shift, cmd_flag), ("key_up", cmd, 0)]
+
+
+def test_alias_expands_to_hotkey():
+    macro, backend = _macro()
+    macro.run("paste")
+    assert [event.code for event in backend.events] == [MODIFIERS["cmd"][0], KEY_CODES["v"], KEY_CODES["v"],
+                                                        MODIFIERS["cmd"][0]]
+
+
+def test_wait_is_not_posted():
+    macro, backend = _macro()
+    events = macro.run("esc", ("wait", 0), "esc")
+    assert InputEvent("wait", None, 0, None, 0, 0.0) in events
+    assert [event.kind for event in backend.events] == ["key_down", "key_up", "key_down", "key_up"]
+
+
+def test_history_and_replay():
+    macro, backend = _macro()
+    events = macro.run(("click", 1, 2), "enter")
+    assert macro.history == [((("click", 1, 2), "enter"), events)]
+    macro.replay(events)
+    assert backend.events == events * 2
+
+
+@pytest.mark.parametrize("step", ["cmd+nope", "hyper+a", ("drag", 1, 2)])
+def test_unknown_steps_are_rejected_before_sending(step):
+    macro, backend = _macro()
+    with pytest.raises(ValueError):
+        macro.run("a", step)
+    assert backend.events == [] and macro.history == []
+
+
+def test_create_input_macro_requires_quartz(monkeypatch):
+    monkeypatch.setattr(input_macro, "Quartz", None)
+    with pytest.raises(RuntimeError):
+        create_input_macro()
@@ -0,0 +1,22 @@
+# flake8: noqa
+
+from kakao_ax import FakeAXNode, fake_element, find_rows_titled
+
+
+def _row(name):
+    return fake_element("AXRow", fake_element("AXCell", fake_element("AXStaticText", AXValue=name)))
+
+
+def test_find_rows_titled_reads_only_list_rows():
+    results = fake_element("AXTable", _row("김민수"), _row("김민수 회사"), _row("이영희"))
+    window = FakeAXNode(fake_element("AXWindow",
+                                     fake_element("AXGroup", fake_element("AXStaticText", AXValue="김민수")), # 목록 밖 텍스트
+                                     fake_element("AXScrollArea", results)))
+    rows = find_rows_titled(window, " 김민수 ")
+    assert rows == [FakeAXNode(results["AXChildren"][0])]
+
+
+def test_find_rows_titled_prefers_ax_rows():
+    visible = _row("김민수")
+    table = fake_element("AXTable", _row("김민수"), AXRows=[visible])
+    assert find_rows_titled(FakeAXNode(fake_element("AXWindow", table)), "김민수") == [FakeAXNode(visible)]
@@ -0,0 +1,54 @@
+# flake8: noqa
+
+import pytest
+from ocr_matcher import OutcomeMatcher, normalize_text, to_jamo
+
+PATTERNS = {
+    "already_registered": ["이미 등록된 친구입니다"],
+    "not_allowed": ["친구로 추가할 수 없습니다"],
+    "short": ["완료"],
+}
+
+
+def _jamo_length(pattern):
+    return len(to_jamo(normalize_text(pattern)))
+
+
+def test_to_jamo_splits_syllables():
+    assert to_jamo("등록") == "ㄷㅡㅇㄹㅗㄱ"
+    assert to_jamo("a가1") == "aㄱㅏ1"
+
+
+def test_exact_match_has_full_confidence():
+    match = OutcomeMatcher(PATTERNS).best("알림: 이미 등록된 친구입니다.")
+    assert (match.label, match.confidence, match.distance) == ("already_registered", 1.0, 0)
+    assert match.pattern == "이미 등록된 친구입니다"
+
+
+def test_jamo_level_misread_lowers_confidence_by_one_jamo():
+    matcher = OutcomeMatcher(PATTERNS)
+    match = matcher.best("이미 등룩된 친구입니다") # ㅗ -> ㅜ 한 자모 오인식
+    assert (match.label, match.distance) == ("already_registered", 1)
+    assert match.confidence == pytest.approx(1 - 1 / _jamo_length("이미 등록된 친구입니다"))
+    assert matcher.classify("이미 등룩된 친구입니다") == ("already_registered", match.confidence)
+
+
+def test_short_patterns_require_exact_match():
+    matcher = OutcomeMatcher(PATTERNS)
+    assert _jamo_length("완료") == 5 # MIN_FUZZY_LENGTH 미만
+    assert matcher.best("전송 완료")[0] == "short"
+    assert matcher.best("전송 왼료") is None # 짧은 패턴은 한 자모 차이도 허용하지 않음
+
+
+def test_clean_non_match_returns_none():
+    matcher = OutcomeMatcher(PATTERNS)
+    assert matcher.scan("메시지 읽지 않음") == {}
+    assert matcher.best("메시지 읽지 않음") is None
+    assert matcher.classify("메시지 읽지 않음") == (None, 0.0)
+    assert matcher.best("") is None
+
+
+def test_low_confidence_match_is_not_classified():
+    matcher = OutcomeMatcher(PATTERNS, min_confidence=0.99)
+    label, confidence = matcher.classify("이미 등룩된 친구입니다")
+    assert label is None and 0.9 < confidence < 0.99
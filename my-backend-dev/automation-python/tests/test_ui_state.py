@@ -0,0 +1,29 @@
+# flake8: noqa
+
+import ui_state
+from kakao_ax import fake_element
+from ui_state import UIStateClassifier, FrameStateClassifier
+
+
+def _classify(app):
+    """가짜 앱의 포커스된 창으로 화면 상태를 판별합니다 (기준 프레임 없음)."""
+    classifier = UIStateClassifier(frames=FrameStateClassifier(path=None), app_provider=lambda: app)
+    return classifier.classify()
+
+
+def test_main_window_is_focused(fake_app):
+    main = fake_element("AXWindow", AXTitle="카카오톡")
+    chat = fake_element("AXWindow", AXTitle="홍길동")
+    assert _classify(fake_app(main, chat, focused=main)).state == ui_state.MAIN_WINDOW
+
+
+def test_chat_window_is_focused(fake_app):
+    main = fake_element("AXWindow", AXTitle="카카오톡")
+    chat = fake_element("AXWindow", AXTitle="홍길동")
+    assert _classify(fake_app(main, chat, focused=chat)).state == ui_state.CHAT_WINDOW
+
+
+def test_chat_titled_like_the_app_is_not_the_main_window(fake_app):
+    main = fake_element("AXWindow", AXTitle="KakaoTalk")
+    chat = fake_element("AXWindow", AXTitle="KakaoTalk")
+    assert _classify(fake_app(main, chat, focused=chat)).state == ui_state.CHAT_WINDOW
@@ -0,0 +1,126 @@
+# flake8: noqa
+
+import logging
+import unicodedata
+import kakao_ax
+
+# --- 상수 정의 ---
+TEXT_INPUT_AX_ENABLED = True # 포커스된 입력창 값을 Accessibility로 직접 설정 (False면 항상 붙여넣기)
+PASTE_VERIFY_TIMEOUT = 0.5 # 붙여넣기 후 입력창 값 반영 확인 대기 상한 (확인되어야 클립보드 복원)
+INPUT_CONFIRM_TIMEOUT = 0.5 # 입력 후 앱이 입력을 처리했는지(버튼 활성화 등) 확인 대기 상한
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 함수 정의 ---
+
+# 입력창 값이 기대한 텍스트인지 확인합니다.
+def _value_matches(field, text):
+    """입력창 값이 기대한 텍스트와 같은지 NFC 정규화 후 비교합니다."""
+    value = field.value
+    if not isinstance(value, str):
+        return False
+    return unicodedata.normalize("NFC", value).rstrip() == unicodedata.normalize("NFC", text).rstrip()
+
+# 입력창 값에 텍스트가 들어 있는지 확인합니다.
+def _value_contains(field, text):
+    """입력창 값에 텍스트가 들어 있는지 NFC 정규화 후 확인합니다 (커서 위치에 붙여넣은 경우)."""
+    value = field.value
+    if not isinstance(value, str):
+        return False
+    return unicodedata.normalize("NFC", text).strip() in unicodedata.normalize("NFC", value)
+
+# --- 클래스 정의 ---
+
+class TextInput:
+    """
+    포커스된 텍스트 입력창에 문자열을 넣는 백엔드입니다.
+    가능하면 입력창의 AXValue를 직접 설정하고 다시 읽어 확인합니다 (IME/클립보드를 거치지 않음).
+    직접 설정이 안 되거나 앱이 처리하지 않으면 클립보드에 올려 붙여넣고, 입력창 값이 바뀐 것을 확인한 뒤에만
+    원래 클립보드 텍스트를 되돌립니다 (확인 전에 되돌리면 앱이 이전 클립보드를 붙여넣을 수 있음).
+    """
+
+    def __init__(self, pasteboard, paste, select_all, app_provider=kakao_ax.kakao_app, ax_enabled=TEXT_INPUT_AX_ENABLED):
+        self._pasteboard = pasteboard
+        self._paste = paste # 붙여넣기 단축키(Cmd+V)를 보내는 함수
+        self._select_all = select_all # 입력창 전체 선택 단축키(Cmd+A)를 보내는 함수 (다시 입력할 때 덮어쓰기용)
+        self._app_provider = app_provider
+        self._app = None
+        self.ax_enabled = ax_enabled
+        self.counts = {"ax": 0, "paste": 0, "ax_unprocessed": 0, "unconfirmed": 0, "clipboard_kept": 0}
+
+    # KakaoTalk 앱 노드를 반환합니다 (재사용, 무효화되면 다시 얻음).
+    def _kakao_app(self):
+        if self._app is None or self._app.role is None:
+            self._app = self._app_provider()
+        return self._app
+
+    # 포커스된 입력창을 반환합니다.
+    def focused_field(self):
+        """포커스된 텍스트 입력창 노드를 반환합니다. Accessibility를 쓸 수 없거나 없으면 None."""
+        app = self._kakao_app()
+        return kakao_ax.focused_text_field(app) if app is not None else None
+
+    # 포커스된 입력창에 텍스트를 넣습니다.
+    def enter(self, text, method="auto", confirm=None, confirm_timeout=INPUT_CONFIRM_TIMEOUT):
+        """
+        포커스된 입력창에 텍스트를 넣고 사용한 방식("ax" 또는 "paste")을 반환합니다.
+        method="paste"면 직접 설정을 건너뛰고 붙여넣기만 사용합니다.
+        직접 설정은 입력창 내용을 통째로 바꾸고, 붙여넣기는 커서 위치에 넣습니다.
+        confirm()이 주어지면 앱이 입력을 처리했다는 신호(검색 결과 표시, 버튼 활성화 등)를 confirm_timeout까지 기다립니다.
+        값을 다시 읽는 것만으로는 앱이 처리했는지 알 수 없으므로, 직접 설정 후 신호가 없으면 전체 선택 후 붙여넣기로
+        다시 입력합니다. 붙여넣기 후에도 신호가 없으면 None을 반환합니다.
+        """
+        field = self.focused_field()
+        if field is not None and self.ax_enabled and method == "auto":
+            if field.set("AXValue", text) and _value_matches(field, text):
+                if confirm is None or kakao_ax.wait_for(confirm, confirm_timeout):
+                    self.counts["ax"] += 1
+                    log.debug(f"입력창 값 직접 설정 완료 ({len(text)}자)")
+                    return "ax"
+                self.counts["ax_unprocessed"] += 1
+                log.warning("입력창 값을 직접 설정했지만 앱이 처리하지 않아 붙여넣기로 다시 입력합니다.")
+                self._select_all() # 붙여넣기가 직접 설정한 값을 덮어쓰도록 선택
+            else:
+                log.debug("입력창 값 직접 설정/확인 실패, 붙여넣기로 대체합니다.")
+
+        self.counts["paste"] += 1
+        if not self._paste_text(text, field, confirm, confirm_timeout):
+            self.counts["unconfirmed"] += 1
+            log.warning("붙여넣기 후 앱이 입력을 처리했는지 확인하지 못했습니다.")
+            return None if confirm is not None else "paste"
+        return "paste"
+
+    # 클립보드로 붙여넣고 반영을 확인한 뒤 원래 클립보드를 되돌립니다.
+    def _paste_text(self, text, field, confirm, confirm_timeout):
+        """
+        텍스트를 붙여넣고 처리 여부(confirm이 있으면 그 신호, 없으면 입력창 값 변화)를 반환합니다.
+        입력창 값 변화나 confirm 신호로 붙여넣기가 처리된 것을 확인한 경우에만 사용자 클립보드 텍스트를 복원하고,
+        확인하지 못하면 붙여넣은 텍스트를 클립보드에 남겨 둡니다.
+        """
+        try:
+            previous = self._pasteboard.get_text()
+        except Exception:
+            previous = None
+        before = field.value if field is not None else None
+        self._pasteboard.set_text(text)
+        self._paste()
+
+        def changed():
+            if field is not None:
+                return field.value != before
+            current = self.focused_field() # 붙여넣기 전에는 입력창을 찾지 못한 경우 다시 찾아 확인
+            return current is not None and _value_contains(current, text)
+
+        pasted = bool(kakao_ax.wait_for(changed, PASTE_VERIFY_TIMEOUT))
+        confirmed = bool(kakao_ax.wait_for(confirm, confirm_timeout)) if confirm is not None else pasted
+        if previous is not None:
+            if pasted or confirmed:
+                try:
+                    self._pasteboard.set_text(previous)
+                except Exception as e:
+                    log.debug(f"클립보드 복원 실패: {e}")
+            else:
+                self.counts["clipboard_kept"] += 1
+                log.warning("붙여넣기 반영을 확인하지 못해 이전 클립보드를 복원하지 않습니다 (늦게 처리된 붙여넣기가 이전 내용을 넣지 않도록).")
+        return confirmed
@@ -0,0 +1,272 @@
+# flake8: noqa
+
+import time
+import logging
+import pathlib
+import threading
+from collections import deque, namedtuple
+import cv2
+import numpy as np
+import kakao_ax
+import ax_events
+import screen_capture
+
+# --- 상수 정의 ---
+BASE_DIR = pathlib.Path(__file__).parent.absolute()
+UI_STATE_REFERENCES_PATH = BASE_DIR / "ui-state-references.npz" # 상태별 기준 프레임 서명 저장 경로
+STATE_SIGNATURE_SIZE = (32, 32) # 프레임 서명 크기 (축소 흑백)
+STATE_MATCH_THRESHOLD = 0.06 # 기준 서명과의 평균 절대 차이 상한 (0~1, 넘으면 unknown)
+STATE_MAX_REFERENCES = 8 # 상태별 보관할 기준 서명 수
+UI_STATE_TIMEOUT = 2.0 # 기대 상태가 될 때까지 대기 상한
+UI_STATE_MAX_RECOVERIES = 2 # 기대 상태로 복구 시도 최대 횟수
+
+# 화면 상태
+FRIENDS_TAB = "friends_tab" # 메인 창 친구 탭
+CHAT_LIST = "chat_list" # 메인 창 채팅 탭
+SEARCH_RESULTS = "search_results" # 메인 창 검색 결과
+MAIN_WINDOW = "main_window" # 메인 창 (기준 프레임이 없어 탭은 구분 못 함)
+CHAT_WINDOW = "chat_window" # 채팅창
+ADD_FRIEND_DIALOG = "add_friend_dialog" # 친구 추가 대화 상자
+RESULT_POPUP = "result_popup" # 친구 추가 결과 팝업
+UNKNOWN = "unknown"
+MAIN_WINDOW_STATES = (FRIENDS_TAB, CHAT_LIST, SEARCH_RESULTS) # 메인 창 안에서 화면으로만 구분되는 상태
+ADD_FRIEND_DIALOG_TITLES = ("친구 추가", "친구등록") # 친구 추가 대화 상자 제목에 포함되는 문자열
+ADD_FRIEND_DIALOG_SUBROLES = ("AXDialog", "AXSystemDialog") # 친구 추가 대화 상자 창의 하위 역할 (생성 직후 제목이 비어 있어도 구분)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 상태 판별 결과 (상태, 근거("ax" | "frame" | "none"), 기준 서명과의 거리, 포커스된 창 제목, 판별 소요 시간)
+UIStateReading = namedtuple("UIStateReading", ["state", "source", "distance", "title", "seconds"])
+
+# --- 함수 정의 ---
+
+# 프레임을 상태 비교용 서명으로 축소합니다.
+def frame_signature(frame, size=STATE_SIGNATURE_SIZE):
+    """BGR 배열 또는 PIL 이미지를 축소 흑백 서명(0~1 float32 배열)으로 변환합니다."""
+    array = np.asarray(frame)
+    if array.ndim == 3:
+        array = cv2.cvtColor(array[:, :, :3], cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(array, size, interpolation=cv2.INTER_AREA)
+    return small.astype(np.float32) / 255.0
+
+# 판별 결과가 기대 상태를 만족하는지 확인합니다.
+def satisfies(reading, expected):
+    """
+    판별 결과가 기대 상태 중 하나면 True.
+    화면을 관찰할 수 없거나(none) 메인 창의 탭을 구분할 수 없는 경우는 확인 불가로 보고 통과시킵니다.
+    """
+    if reading.state in expected:
+        return True
+    if reading.state == UNKNOWN and reading.source == "none":
+        return True
+    return reading.state == MAIN_WINDOW and any(state in MAIN_WINDOW_STATES for state in expected)
+
+# --- 클래스 정의 ---
+
+class UIStateError(Exception):
+    """기대한 화면 상태가 아니고 복구할 수 없을 때 발생합니다."""
+
+    def __init__(self, expected, reading):
+        self.expected = expected
+        self.reading = reading
+        super().__init__(f"UI 상태 불일치: 기대={'/'.join(expected)}, 현재={reading.state} (창='{reading.title}')")
+
+
+class FrameStateClassifier:
+    """
+    축소한 창 프레임 하나를 상태별 기준 서명과 비교해 가장 가까운 상태를 고르는 분류기입니다.
+    기준 서명은 learn()으로 실제 화면에서 기록하고 디스크에 저장합니다 (테마/배율이 바뀌면 다시 기록).
+    """
+
+    def __init__(self, path=UI_STATE_REFERENCES_PATH, threshold=STATE_MATCH_THRESHOLD, max_references=STATE_MAX_REFERENCES):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.threshold = threshold
+        self.max_references = max_references
+        self._lock = threading.Lock()
+        self._references = {} # 상태 -> [서명, ...]
+        self._load()
+
+    @property
+    def ready(self):
+        return bool(self._references)
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                for key in sorted(data.files):
+                    state = key.rsplit("__", 1)[0]
+                    self._references.setdefault(state, []).append(data[key])
+            log.info(f"UI 상태 기준 서명 로드: {', '.join(f'{s}={len(v)}' for s, v in self._references.items())}")
+        except Exception as e:
+            log.warning(f"UI 상태 기준 서명 로드 실패: {e}")
+
+    def _save(self):
+        if self.path is None:
+            return
+        arrays = {f"{state}__{i:02d}": sig for state, sigs in self._references.items() for i, sig in enumerate(sigs)}
+        with open(self.path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    # 현재 프레임을 상태의 기준 서명으로 기록합니다.
+    def learn(self, state, frame):
+        """프레임을 상태의 기준 서명으로 추가하고 저장합니다 (상태별 최근 max_references개 유지)."""
+        with self._lock:
+            sigs = self._references.setdefault(state, [])
+            sigs.append(frame_signature(frame))
+            del sigs[:-self.max_references]
+            self._save()
+        log.info(f"UI 상태 기준 서명 기록: {state} ({len(sigs)}개)")
+
+    # 프레임의 상태를 판별합니다.
+    def classify(self, frame, states=None):
+        """
+        프레임과 가장 가까운 기준 서명의 (상태, 거리)를 반환합니다.
+        거리가 threshold를 넘거나 기준 서명이 없으면 (UNKNOWN, 거리 또는 None).
+        """
+        signature = frame_signature(frame)
+        best_state, best_distance = UNKNOWN, None
+        with self._lock:
+            for state, sigs in self._references.items():
+                if states is not None and state not in states:
+                    continue
+                for sig in sigs:
+                    distance = float(np.mean(np.abs(signature - sig)))
+                    if best_distance is None or distance < best_distance:
+                        best_state, best_distance = state, distance
+        if best_distance is None or best_distance > self.threshold:
+            return UNKNOWN, best_distance
+        return best_state, best_distance
+
+    def stats(self):
+        with self._lock:
+            return {state: len(sigs) for state, sigs in self._references.items()}
+
+
+class UIStateClassifier:
+    """
+    KakaoTalk 화면 상태를 한 번에 판별합니다.
+    포커스된 창의 종류(대화 상자/채팅창/메인 창)는 Accessibility로 바로 구분하고,
+    메인 창 안의 탭/검색 상태만 창 프레임 한 장을 축소해 기준 서명과 비교합니다.
+    probes: [(상태, probe(app) -> bool), ...] 창 종류보다 먼저 확인할 추가 판별기 (결과 팝업 문구 등)
+    """
+
+    def __init__(self, frames=None, app_provider=kakao_ax.kakao_app, capture=screen_capture.grab_region, probes=None):
+        self.frames = frames if frames is not None else FRAME_STATES
+        self._app_provider = app_provider
+        self._capture = capture
+        self.probes = list(probes or [])
+
+    def _reading(self, state, source, started, title="", distance=None):
+        return UIStateReading(state, source, distance, title, round(time.monotonic() - started, 4))
+
+    # 포커스된 메인 창의 프레임을 캡처합니다.
+    def _main_frame(self, window):
+        frame = window.frame()
+        return self._capture(frame) if frame is not None else None
+
+    # 현재 화면 상태를 판별합니다.
+    def classify(self):
+        """현재 화면 상태를 UIStateReading으로 반환합니다."""
+        started = time.monotonic()
+        app = self._app_provider()
+        if app is None:
+            return self._reading(UNKNOWN, "none", started)
+        window = kakao_ax.focused_window(app)
+        if window is None:
+            return self._reading(UNKNOWN, "ax", started)
+        title = kakao_ax.normalize_title(window.title)
+        for state, probe in self.probes:
+            if probe(app):
+                return self._reading(state, "ax", started, title)
+        if any(marker in title for marker in ADD_FRIEND_DIALOG_TITLES):
+            return self._reading(ADD_FRIEND_DIALOG, "ax", started, title)
+        if window != kakao_ax.main_window(app):
+            return self._reading(CHAT_WINDOW if title else UNKNOWN, "ax", started, title)
+        # 메인 창: 탭/검색 상태는 화면으로 구분
+        if not self.frames.ready:
+            return self._reading(MAIN_WINDOW, "ax", started, title)
+        frame = self._main_frame(window)
+        if frame is None:
+            return self._reading(MAIN_WINDOW, "ax", started, title)
+        state, distance = self.frames.classify(frame, MAIN_WINDOW_STATES)
+        return self._reading(MAIN_WINDOW if state == UNKNOWN else state, "frame", started, title, distance)
+
+    # 현재 메인 창 프레임을 상태의 기준으로 기록합니다.
+    def learn(self, state):
+        """포커스된 메인 창 프레임을 state의 기준 서명으로 기록합니다. 기록하면 True."""
+        if state not in MAIN_WINDOW_STATES:
+            raise ValueError(f"화면으로 구분하는 상태가 아닙니다: {state} (가능: {', '.join(MAIN_WINDOW_STATES)})")
+        app = self._app_provider()
+        window = kakao_ax.focused_window(app) if app is not None else None
+        frame = self._main_frame(window) if window is not None else None
+        if frame is None:
+            return False
+        self.frames.learn(state, frame)
+        return True
+
+
+class UIStateMachine:
+    """
+    화면 상태 판별 결과로 흐름을 진행하거나 복구하는 상태 기계입니다.
+    각 단계는 동작 후 기대 상태를 선언하고, 전이 중 상태(via)가 아닌 다른 상태가 보이면
+    시간 초과를 기다리지 않고 바로 그 상태의 복구 동작을 실행하거나 UIStateError를 발생시킵니다.
+    """
+
+    def __init__(self, classifier, recoveries=None, max_recoveries=UI_STATE_MAX_RECOVERIES, name="ui"):
+        self.classifier = classifier
+        self.recoveries = dict(recoveries or {}) # 상태 -> 복구 동작 (해당 상태에서 벗어나게 함)
+        self.max_recoveries = max_recoveries
+        self.name = name
+        self.history = deque(maxlen=50) # 최근 (기대 상태, 판별 결과)
+        self.drifts = 0 # 기대와 다른 상태를 감지한 횟수
+        self.recovered = 0 # 복구 동작 실행 횟수
+
+    # 동작을 실행하고 기대 상태를 확인합니다.
+    def step(self, action, expected, via=(), timeout=UI_STATE_TIMEOUT):
+        """action()을 실행한 뒤 expect(expected, via)로 상태를 확인하고 판별 결과를 반환합니다."""
+        action()
+        return self.expect(expected, via=via, timeout=timeout)
+
+    # 기대 상태가 될 때까지 기다리고, 벗어나면 복구합니다.
+    def expect(self, expected, via=(), timeout=UI_STATE_TIMEOUT):
+        """
+        화면이 expected 중 하나가 될 때까지 기다리고 판별 결과를 반환합니다.
+        via 상태나 판별 불가(unknown)는 전이 중으로 보고 계속 기다리며, 그 외 상태가 보이면 바로 복구를 시도합니다.
+        복구할 수 없거나 복구 후에도 맞지 않으면 UIStateError.
+        """
+        expected = (expected,) if isinstance(expected, str) else tuple(expected)
+        via = (via,) if isinstance(via, str) else tuple(via)
+        for attempt in range(self.max_recoveries + 1):
+            last = []
+            def settled():
+                reading = self.classifier.classify()
+                last[:] = [reading]
+                if satisfies(reading, expected) or reading.state not in via + (UNKNOWN, MAIN_WINDOW):
+                    return reading # 기대 상태 도달 또는 벗어남 (어느 쪽이든 대기 종료)
+                return None
+            ax_events.wait_until(settled, timeout)
+            reading = last[0] if last else self.classifier.classify()
+            self.history.append((expected, reading))
+            if satisfies(reading, expected):
+                return reading
+            self.drifts += 1
+            recover = self.recoveries.get(reading.state)
+            log.warning(f"[{self.name}] 화면 상태 불일치: 기대={'/'.join(expected)}, 현재={reading.state} "
+                        f"(창='{reading.title}', 근거={reading.source})")
+            if recover is None or attempt == self.max_recoveries:
+                raise UIStateError(expected, reading)
+            log.info(f"[{self.name}] '{reading.state}' 상태 복구 동작 실행 ({attempt + 1}/{self.max_recoveries})")
+            recover()
+            self.recovered += 1
+        raise UIStateError(expected, reading)
+
+    def stats(self):
+        return {"drifts": self.drifts, "recovered": self.recovered,
+                "recent": [(list(expected), reading.state) for expected, reading in list(self.history)[-5:]]}
+
+
+# 메인 창 탭/검색 상태 기준 서명 (전송/친구 추가가 함께 사용)
+FRAME_STATES = FrameStateClassifier()
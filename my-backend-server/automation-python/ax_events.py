@@ -0,0 +1,300 @@
+# flake8: noqa
+
+import time
+import logging
+import threading
+from collections import deque, namedtuple
+import kakao_ax
+try:
+    import ApplicationServices as AS
+    import CoreFoundation as CF
+except ImportError:
+    # macOS가 아닌 환경: 옵저버 없이 이벤트 버스만 사용 가능 (publish로 직접 발행)
+    AS = None
+    CF = None
+
+# --- 상수 정의 ---
+AX_EVENT_HISTORY = 256 # 이벤트 버스에 보관할 최근 이벤트 수
+AX_EVENT_RECHECK = 0.25 # 이벤트가 없어도 조건을 다시 확인하는 간격 (알림 누락 대비)
+AX_OBSERVER_START_TIMEOUT = 2.0 # 옵저버 스레드 시작 대기 상한
+AX_ERROR_ALREADY_REGISTERED = -25209 # kAXErrorNotificationAlreadyRegistered
+
+# 구독하는 알림 -> 이벤트 종류
+WINDOW_CREATED = "window_created"
+ELEMENT_DESTROYED = "element_destroyed"
+FOCUSED_WINDOW_CHANGED = "focused_window_changed"
+TITLE_CHANGED = "title_changed"
+APP_ACTIVATED = "app_activated"
+APP_DEACTIVATED = "app_deactivated"
+AX_NOTIFICATIONS = {
+    "AXWindowCreated": WINDOW_CREATED,
+    "AXUIElementDestroyed": ELEMENT_DESTROYED,
+    "AXFocusedWindowChanged": FOCUSED_WINDOW_CHANGED,
+    "AXTitleChanged": TITLE_CHANGED,
+    "AXApplicationActivated": APP_ACTIVATED,
+    "AXApplicationDeactivated": APP_DEACTIVATED,
+}
+APP_NOTIFICATIONS = ("AXWindowCreated", "AXFocusedWindowChanged", "AXTitleChanged",
+                     "AXApplicationActivated", "AXApplicationDeactivated") # 앱 요소에 등록
+WINDOW_NOTIFICATIONS = ("AXUIElementDestroyed", "AXTitleChanged") # 새로 생긴 창마다 등록
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 이벤트 버스로 전달되는 UI 이벤트 (순번, 종류, 요소 제목, 요소 노드, 발생 시각(monotonic))
+AXEvent = namedtuple("AXEvent", ["seq", "kind", "title", "node", "at"])
+
+# --- 클래스 정의 ---
+
+class EventBus:
+    """
+    프로세스 내 UI 이벤트 버스입니다. 최근 이벤트를 순번과 함께 보관하고,
+    대기 코드는 mark()로 기준 순번을 잡은 뒤 그 이후 이벤트를 timeout까지 기다립니다.
+    """
+
+    def __init__(self, history=AX_EVENT_HISTORY):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)
+        self._seq = 0
+
+    # 이벤트를 발행합니다.
+    def publish(self, kind, title=None, node=None):
+        """이벤트를 발행하고 대기 중인 스레드를 깨웁니다. 발행한 AXEvent를 반환합니다."""
+        with self._cond:
+            self._seq += 1
+            event = AXEvent(self._seq, kind, kakao_ax.normalize_title(title) if title else "", node, time.monotonic())
+            self._events.append(event)
+            self._cond.notify_all()
+        log.debug(f"UI 이벤트: {kind} '{event.title}' (#{event.seq})")
+        return event
+
+    # 현재 순번을 반환합니다.
+    def mark(self):
+        """현재까지 발행된 마지막 순번을 반환합니다 (이후 이벤트만 기다릴 때 기준)."""
+        with self._cond:
+            return self._seq
+
+    # 기준 순번 이후 조건에 맞는 이벤트를 기다립니다.
+    def wait_event(self, predicate, timeout, after=None):
+        """
+        after 순번 이후(None이면 지금 이후) 발행된 이벤트 중 predicate에 맞는 첫 이벤트를 반환합니다.
+        timeout 안에 없으면 None.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            seen = self._seq if after is None else after
+            while True:
+                for event in self._events:
+                    if event.seq > seen:
+                        seen = event.seq
+                        if predicate(event):
+                            return event
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    # 조건이 만족될 때까지 이벤트가 올 때마다 다시 확인합니다.
+    def wait_until(self, condition, timeout, recheck=AX_EVENT_RECHECK):
+        """
+        condition()이 참 값을 반환할 때까지 기다리고 그 값을 반환합니다 (시간 초과 시 None).
+        고정 간격 폴링 대신 새 이벤트가 발행될 때만 다시 확인하고, 알림 누락에 대비해 recheck 간격으로도 확인합니다.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            seen = self.mark()
+            try:
+                result = condition()
+            except Exception as e:
+                log.debug(f"UI 이벤트 대기 조건 확인 중 오류 (재시도): {e}")
+                result = None
+            if result:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            with self._cond:
+                if self._seq == seen:
+                    self._cond.wait(min(remaining, recheck))
+
+    # 기준 순번 이후 이벤트를 반환합니다.
+    def since(self, after):
+        """
+        after 순번 이후 발행된 이벤트를 오래된 순으로 반환합니다.
+        보관 한도를 넘어 그 사이 이벤트 일부가 버려졌으면 첫 이벤트의 순번이 after + 1보다 큽니다.
+        """
+        with self._cond:
+            return [event for event in self._events if event.seq > after]
+
+    # 최근 이벤트 목록을 반환합니다.
+    def recent(self, limit=20):
+        """최근 이벤트를 오래된 순으로 최대 limit개 반환합니다."""
+        with self._cond:
+            return list(self._events)[-limit:]
+
+
+class AXObserver:
+    """
+    KakaoTalk 프로세스의 창 생성/소멸, 포커스 창 변경, 제목 변경 알림을 구독해 이벤트 버스로 발행하는 옵저버입니다.
+    전용 스레드에서 CFRunLoop를 돌리며, 알림은 발생 즉시 전달되므로 창 상태를 폴링할 필요가 없습니다.
+    """
+
+    def __init__(self, pid, bus):
+        if AS is None or CF is None:
+            raise RuntimeError("Accessibility API를 사용할 수 없어 옵저버를 만들 수 없습니다.")
+        self.pid = pid
+        self.bus = bus
+        self._observer = None
+        self._run_loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._error = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # 알림 콜백 (옵저버 스레드에서 호출)
+    def _callback(self, observer, element, notification, refcon):
+        node = kakao_ax.AXNode(element)
+        kind = AX_NOTIFICATIONS.get(notification)
+        if kind is None:
+            return
+        if kind == WINDOW_CREATED:
+            self._register(element, WINDOW_NOTIFICATIONS) # 창별 알림(소멸/제목 변경) 등록
+        title = None if kind == ELEMENT_DESTROYED else node.title # 소멸된 요소는 속성을 읽을 수 없음
+        self.bus.publish(kind, title, node)
+
+    def _register(self, element, notifications):
+        for notification in notifications:
+            err = AS.AXObserverAddNotification(self._observer, element, notification, None)
+            if err not in (0, AX_ERROR_ALREADY_REGISTERED):
+                log.debug(f"AX 알림 등록 실패: {notification} (오류 {err})")
+
+    def _run(self):
+        try:
+            err, self._observer = AS.AXObserverCreate(self.pid, self._callback, None)
+            if err != 0:
+                raise RuntimeError(f"AXObserverCreate 실패 (오류 {err})")
+            app = AS.AXUIElementCreateApplication(self.pid)
+            self._register(app, APP_NOTIFICATIONS)
+            for window in kakao_ax.windows(kakao_ax.AXNode(app)): # 이미 열린 창
+                self._register(window.element, WINDOW_NOTIFICATIONS)
+            self._run_loop = CF.CFRunLoopGetCurrent()
+            CF.CFRunLoopAddSource(self._run_loop, AS.AXObserverGetRunLoopSource(self._observer), CF.kCFRunLoopDefaultMode)
+        except Exception as e:
+            self._error = e
+            self._started.set()
+            return
+        self._started.set()
+        CF.CFRunLoopRun()
+        log.info(f"KakaoTalk AX 옵저버 종료 (pid={self.pid}).")
+
+    # 옵저버를 시작합니다.
+    def start(self):
+        """옵저버 스레드를 시작하고 알림 등록이 끝날 때까지 기다립니다. 실패 시 예외 발생."""
+        self._thread = threading.Thread(target=self._run, name="kakao-ax-observer", daemon=True)
+        self._thread.start()
+        if not self._started.wait(AX_OBSERVER_START_TIMEOUT):
+            raise RuntimeError("AX 옵저버 시작 시간 초과")
+        if self._error is not None:
+            raise self._error
+        log.info(f"KakaoTalk AX 옵저버 시작 (pid={self.pid}).")
+
+    # 옵저버를 멈춥니다.
+    def stop(self):
+        """런루프를 멈추고 스레드 종료를 기다립니다."""
+        if self._run_loop is not None:
+            CF.CFRunLoopStop(self._run_loop)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+# 앱 전체가 함께 쓰는 UI 이벤트 버스와 옵저버
+AX_EVENTS = EventBus()
+_observer = None
+_observer_lock = threading.Lock()
+
+# --- 함수 정의 ---
+
+# KakaoTalk 옵저버가 실행 중이도록 보장합니다.
+def ensure_observer():
+    """
+    현재 KakaoTalk 프로세스를 구독하는 옵저버가 없거나 프로세스가 바뀌었으면 새로 시작합니다.
+    옵저버를 사용할 수 있으면 True, 아니면 False (대기 코드는 폴링으로 대체).
+    """
+    global _observer
+    if AS is None or not kakao_ax.is_available():
+        return False
+    pid = kakao_ax.find_kakaotalk_pid()
+    with _observer_lock:
+        if _observer is not None and _observer.running and _observer.pid == pid:
+            return True
+        if _observer is not None:
+            _observer.stop()
+            _observer = None
+        if pid is None:
+            return False
+        try:
+            observer = AXObserver(pid, AX_EVENTS)
+            observer.start()
+        except Exception as e:
+            log.warning(f"KakaoTalk AX 옵저버 시작 실패, 폴링으로 대기합니다: {e}")
+            return False
+        _observer = observer
+        return True
+
+# 옵저버를 멈춥니다.
+def stop_observer():
+    """실행 중인 옵저버를 멈춥니다."""
+    global _observer
+    with _observer_lock:
+        if _observer is not None:
+            _observer.stop()
+            _observer = None
+
+# 옵저버가 실행 중인지 반환합니다.
+def observing():
+    """KakaoTalk 알림을 구독 중이면 True."""
+    observer = _observer
+    return observer is not None and observer.running
+
+# 창 상태 조건을 기다립니다.
+def wait_until(condition, timeout):
+    """
+    창 상태에 대한 condition()이 참 값을 반환할 때까지 기다립니다 (시간 초과 시 None).
+    옵저버가 실행 중이면 창 알림이 올 때만 다시 확인하고, 아니면 짧은 간격으로 폴링합니다.
+    """
+    if observing():
+        return AX_EVENTS.wait_until(condition, timeout)
+    return kakao_ax.wait_for(condition, timeout)
+
+# 제목에 표시 문자열이 포함된 창이 나타나기를 기다립니다.
+def wait_for_window(markers, timeout, after=None, subroles=()):
+    """
+    after 순번(AX_EVENTS.mark()) 이후 생성되었거나 포커스된 창 중 하위 역할(AXSubrole)이 subroles 중 하나이거나
+    제목에 markers 중 하나가 포함된 창의 AXEvent를 반환합니다. 창이 생성될 때는 제목이 아직 비어 있을 수 있으므로
+    대화 상자처럼 하위 역할로 구분되는 창은 subroles로 기다립니다. 옵저버가 없거나 timeout 안에 나타나지 않으면 None.
+    """
+    if not observing():
+        return None
+    markers = (markers,) if isinstance(markers, str) else tuple(markers or ())
+    return AX_EVENTS.wait_event(lambda event: _window_matches(event, markers, subroles), timeout, after=after)
+
+# 이벤트가 기다리는 창의 것인지 확인합니다.
+def _window_matches(event, markers, subroles):
+    if event.kind not in (WINDOW_CREATED, FOCUSED_WINDOW_CHANGED, TITLE_CHANGED):
+        return False
+    if any(marker in event.title for marker in markers):
+        return True
+    node = event.node
+    return (bool(subroles) and event.kind != TITLE_CHANGED and node is not None
+            and node.role == "AXWindow" and node.get("AXSubrole") in subroles)
+
+# 이벤트 버스 상태를 반환합니다.
+def stats():
+    """옵저버 실행 여부와 최근 이벤트 요약을 반환합니다."""
+    observer = _observer
+    return {"observing": observing(), "pid": observer.pid if observer is not None else None,
+            "events": AX_EVENTS.mark(),
+            "recent": [(event.kind, event.title) for event in AX_EVENTS.recent(5)]}
@@ -0,0 +1,121 @@
+# flake8: noqa
+
+import logging
+import threading
+from collections import OrderedDict
+import kakao_ax
+import ax_events
+
+# --- 상수 정의 ---
+CHAT_WINDOW_CACHE_SIZE = 5 # 열어 둘 채팅창 최대 수 (0이면 캐시 사용 안 함)
+CHAT_RAISE_TIMEOUT = 1.0 # 캐시된 창을 앞으로 가져온 뒤 포커스 확인 대기 상한
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 함수 정의 ---
+
+# 창의 닫기 버튼으로 창을 닫습니다.
+def close_window(window):
+    """창의 닫기 버튼(AXCloseButton)을 눌러 닫고 성공 여부를 반환합니다."""
+    button = window.node("AXCloseButton")
+    return button is not None and button.perform("AXPress")
+
+# --- 클래스 정의 ---
+
+class ChatWindowCache:
+    """
+    사용자 이름을 키로 열린 채팅창(AXNode)을 보관하는 LRU 캐시입니다.
+    같은 사용자에게 다시 보낼 때 검색 없이 창을 바로 앞으로 가져오고,
+    한도를 넘으면 가장 오래 사용하지 않은 창을 닫습니다. 배치 사이에도 유지됩니다.
+    """
+
+    def __init__(self, max_windows=CHAT_WINDOW_CACHE_SIZE, close=close_window):
+        self.max_windows = max_windows
+        self._close = close
+        self._lock = threading.Lock()
+        self._windows = OrderedDict() # 정규화된 사용자 이름 -> 창 노드 (오래 사용하지 않은 순)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_windows > 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # 캐시된 사용자 채팅창을 앞으로 가져옵니다.
+    def activate(self, app, username):
+        """
+        캐시된 사용자 채팅창을 AX 참조로 바로 앞으로 가져오고 포커스를 확인해 반환합니다.
+        캐시에 없거나 창이 이미 닫혔거나 포커스 확인에 실패하면 None.
+        """
+        key = kakao_ax.normalize_title(username)
+        with self._lock:
+            window = self._windows.pop(key, None)
+            if window is None: # 캐시에 없음
+                self.misses += 1
+                return None
+        if window.role is None: # 사용자가 이미 닫은 창
+            self._count("misses")
+            return None
+        app.set("AXFrontmost", True)
+        window.perform("AXRaise")
+        window.set("AXMain", True)
+        focused = ax_events.wait_until(lambda: kakao_ax.focused_window_titled(app, username), CHAT_RAISE_TIMEOUT)
+        if focused is None:
+            log.warning(f"캐시된 '{username}' 채팅창 포커스 확인 실패, 창을 닫고 캐시에서 제거합니다.")
+            self._close_quietly(key, window)
+            self._count("misses")
+            return None
+        self._count("hits")
+        log.info(f"캐시된 '{username}' 채팅창 재사용 (검색 생략).")
+        return focused
+
+    # 사용을 마친 채팅창을 캐시에 넣습니다.
+    def put(self, username, window):
+        """사용을 마친 채팅창을 가장 최근 사용 항목으로 넣고, 한도를 넘으면 오래된 창을 닫습니다."""
+        if not self.enabled:
+            self._close_quietly(username, window)
+            return
+        key = kakao_ax.normalize_title(username)
+        with self._lock:
+            self._windows.pop(key, None)
+            self._windows[key] = window
+            evicted = []
+            while len(self._windows) > self.max_windows:
+                evicted.append(self._windows.popitem(last=False))
+        for evicted_key, evicted_window in evicted:
+            log.info(f"채팅창 캐시 한도 초과, 가장 오래 사용하지 않은 '{evicted_key}' 창을 닫습니다.")
+            self._close_quietly(evicted_key, evicted_window)
+
+    # 사용자 창을 캐시에서 제거합니다.
+    def discard(self, username):
+        """사용자 창을 캐시에서 제거하고 반환합니다 (창은 닫지 않음). 없으면 None."""
+        with self._lock:
+            return self._windows.pop(kakao_ax.normalize_title(username), None)
+
+    # 캐시된 모든 창을 닫습니다.
+    def close_all(self):
+        """캐시된 모든 창을 닫고 캐시를 비웁니다."""
+        with self._lock:
+            items = list(self._windows.items())
+            self._windows.clear()
+        for key, window in items:
+            self._close_quietly(key, window)
+
+    def _close_quietly(self, key, window):
+        try:
+            if window.role is not None and not self._close(window):
+                log.warning(f"'{key}' 채팅창 닫기 실패")
+        except Exception as e:
+            log.warning(f"'{key}' 채팅창 닫기 중 오류: {e}")
+
+    # 캐시 상태를 반환합니다.
+    def stats(self):
+        """열린 창 수, 한도, 적중/미스 수를 반환합니다."""
+        with self._lock:
+            return {"windows": len(self._windows), "max_windows": self.max_windows,
+                    "hits": self.hits, "misses": self.misses}
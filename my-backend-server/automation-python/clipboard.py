@@ -0,0 +1,170 @@
+# flake8: noqa
+
+import os
+import logging
+import threading
+from abc import ABC, abstractmethod
+try:
+    from AppKit import NSPasteboard, NSPasteboardTypeString, NSPasteboardTypeTIFF, NSPasteboardTypePNG, NSURL
+    from Foundation import NSData
+except ImportError:
+    # macOS가 아닌 환경 (테스트 등): 시스템 클립보드 사용 불가, 테스트는 FakePasteboard를 직접 주입
+    NSPasteboard = None
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 클래스 정의 ---
+
+class Pasteboard(ABC):
+    """
+    클립보드 인터페이스입니다. 텍스트, 이미지 데이터, 파일 URL 목록을 프로세스 안에서 바로 기록합니다.
+    osascript/Finder를 거치지 않으므로 기록 직후 대기가 필요 없습니다.
+    """
+
+    # 텍스트를 기록합니다.
+    @abstractmethod
+    def set_text(self, text):
+        """클립보드 내용을 텍스트로 바꿉니다."""
+
+    # 텍스트를 읽습니다.
+    @abstractmethod
+    def get_text(self):
+        """클립보드의 텍스트를 반환합니다. 없으면 None."""
+
+    # 이미지 데이터를 기록합니다.
+    @abstractmethod
+    def set_image(self, data, kind="tiff"):
+        """클립보드 내용을 이미지 데이터(bytes)로 바꿉니다. kind는 "tiff" 또는 "png"."""
+
+    # 파일 URL 목록을 기록합니다.
+    @abstractmethod
+    def set_file_urls(self, paths):
+        """클립보드 내용을 파일 URL 목록으로 바꿉니다 (Finder에서 파일을 복사한 것과 같은 형태)."""
+
+    # 변경 횟수를 반환합니다.
+    @abstractmethod
+    def change_count(self):
+        """클립보드 변경 횟수를 반환합니다. 다른 앱이 클립보드를 바꿨는지 확인할 때 사용합니다."""
+
+
+class MacPasteboard(Pasteboard):
+    """NSPasteboard에 직접 기록하는 macOS 클립보드입니다."""
+
+    def __init__(self):
+        if NSPasteboard is None:
+            raise RuntimeError("AppKit을 사용할 수 없어 macOS 클립보드를 만들 수 없습니다.")
+        self._pb = NSPasteboard.generalPasteboard()
+
+    def set_text(self, text):
+        self._pb.clearContents()
+        if not self._pb.setString_forType_(text, NSPasteboardTypeString):
+            raise RuntimeError("클립보드 텍스트 기록 실패")
+
+    def get_text(self):
+        value = self._pb.stringForType_(NSPasteboardTypeString)
+        return str(value) if value is not None else None
+
+    def set_image(self, data, kind="tiff"):
+        ns_type = NSPasteboardTypePNG if kind == "png" else NSPasteboardTypeTIFF
+        ns_data = NSData.dataWithBytes_length_(data, len(data))
+        self._pb.clearContents()
+        if not self._pb.setData_forType_(ns_data, ns_type):
+            raise RuntimeError(f"클립보드 이미지({kind}) 기록 실패")
+
+    def set_file_urls(self, paths):
+        urls = [NSURL.fileURLWithPath_(os.path.abspath(p)) for p in paths]
+        self._pb.clearContents()
+        if not self._pb.writeObjects_(urls):
+            raise RuntimeError("클립보드 파일 URL 기록 실패")
+
+    def change_count(self):
+        return int(self._pb.changeCount())
+
+
+class FakePasteboard(Pasteboard):
+    """메모리에만 기록하는 클립보드입니다 (Linux 테스트용). 기록 이력을 history에 남깁니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kind = None
+        self._value = None
+        self._count = 0
+        self.history = [] # [(종류, 값), ...]
+
+    def _write(self, kind, value):
+        with self._lock:
+            self._kind, self._value = kind, value
+            self._count += 1
+            self.history.append((kind, value))
+
+    def set_text(self, text):
+        self._write("text", text)
+
+    def get_text(self):
+        with self._lock:
+            return self._value if self._kind == "text" else None
+
+    def set_image(self, data, kind="tiff"):
+        self._write(kind, bytes(data))
+
+    def set_file_urls(self, paths):
+        self._write("files", [os.path.abspath(p) for p in paths])
+
+    def change_count(self):
+        with self._lock:
+            return self._count
+
+    # 현재 내용을 반환합니다.
+    def contents(self):
+        """현재 (종류, 값)을 반환합니다."""
+        with self._lock:
+            return self._kind, self._value
+
+
+class StagedClipboard:
+    """
+    마지막으로 기록한 페이로드를 기억하는 클립보드 래퍼입니다.
+    같은 페이로드를 다시 기록하려 할 때 그 사이 클립보드가 바뀌지 않았으면(change_count 동일) 기록을 생략합니다.
+    """
+
+    def __init__(self, pasteboard):
+        self.pasteboard = pasteboard
+        self._staged = None # 마지막으로 기록한 (종류, 값)
+        self._count = None # 기록 직후 change_count
+        self.writes = 0
+        self.reused = 0
+
+    # 페이로드를 클립보드에 올립니다 (이미 올라가 있으면 생략).
+    def stage(self, kind, value):
+        """페이로드 (종류, 값)를 클립보드에 기록합니다. 이미 같은 내용이 올라가 있으면 생략하고 False를 반환합니다."""
+        if (self._staged is not None and self._count == self.pasteboard.change_count()
+                and self._staged[0] == kind and (self._staged[1] is value or self._staged[1] == value)):
+            self.reused += 1
+            return False
+        if kind == "text":
+            self.pasteboard.set_text(value)
+        elif kind == "files":
+            self.pasteboard.set_file_urls(value)
+        else:
+            self.pasteboard.set_image(value, kind=kind)
+        self._staged = (kind, value)
+        self._count = self.pasteboard.change_count()
+        self.writes += 1
+        return True
+
+    # 기억한 페이로드를 잊습니다.
+    def invalidate(self):
+        """다음 stage()가 반드시 기록하도록 기억한 페이로드를 잊습니다."""
+        self._staged = None
+        self._count = None
+
+# --- 함수 정의 ---
+
+# 실행 환경에 맞는 클립보드를 생성합니다.
+def create_pasteboard():
+    """
+    시스템 클립보드(MacPasteboard)를 반환합니다. AppKit을 사용할 수 없으면 RuntimeError를 발생시킵니다
+    (복사가 조용히 무시되지 않도록, 테스트는 FakePasteboard를 직접 주입).
+    """
+    return MacPasteboard()
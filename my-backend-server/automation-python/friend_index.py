@@ -0,0 +1,172 @@
+# flake8: noqa
+
+import re
+import time
+import logging
+import threading
+from collections import namedtuple
+import kakao_ax
+
+# --- 상수 정의 ---
+FRIEND_INDEX_MAX_AGE = 600 # 친구 목록 스냅샷 유효 시간(초), 지나면 다음 전송 전에 다시 읽음
+FRIEND_SECTIONS = ("친구", "Friends") # 친구 전체를 보여 주는 구역 머리글
+REPEATED_SECTIONS = ("즐겨찾기", "Favorites") # 친구 구역에 있는 친구를 다시 보여 주는 구역 머리글 (색인에서 제외)
+SECTION_HEADER_PATTERN = re.compile(r"^(.+?) ?(\d[\d,]*)$") # 구역 머리글 행 ("즐겨찾기 3", "친구 1,120")
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 친구 목록 항목 (표시 이름, 행에 표시된 텍스트 전체, 목록 내 행 순서)
+FriendEntry = namedtuple("FriendEntry", ["name", "texts", "row"])
+# 읽은 친구 목록 (항목 목록, 친구 구역 머리글의 친구 수(없으면 None), 친구 구역에서 읽은 행 수)
+FriendList = namedtuple("FriendList", ["entries", "expected", "listed"])
+
+# 이름 조회 결과 상태
+FOUND = "found" # 정확히 한 명
+AMBIGUOUS = "ambiguous" # 같은 이름이 여러 명
+MISSING = "missing" # 친구 목록에 없음
+UNKNOWN = "unknown" # 색인이 없거나 일부만 읽혀 판단 불가 (기존 검색 방식으로 진행)
+
+# --- 함수 정의 ---
+
+# 친구 목록 행에서 표시 텍스트를 읽습니다.
+def _row_texts(row):
+    """행 안의 텍스트 요소 값을 화면 순서대로 반환합니다 (첫 번째가 이름, 이후 상태 메시지 등)."""
+    texts = [kakao_ax.normalize_title(node.text()) for node in row.find_all(lambda n: n.role in kakao_ax.TEXT_ROLES, 3)]
+    return tuple(text for text in texts if text)
+
+# 메인 창의 친구 목록을 읽습니다.
+def read_friend_list(app):
+    """
+    메인 창 친구 탭의 목록 행을 모두 읽어 FriendList를 반환합니다.
+    행은 요소 자체로 구분하므로 표시 텍스트가 같은 다른 친구도 따로 셉니다.
+    즐겨찾기처럼 친구를 다시 보여 주는 구역의 행과 여러 컨테이너에서 다시 나오는 같은 행은 건너뜁니다.
+    "친구 N" 머리글의 N과 그 구역에서 읽은 행 수를 함께 반환해 목록을 모두 읽었는지 판단할 수 있게 합니다.
+    """
+    main = kakao_ax.main_window(app) or kakao_ax.focused_window(app)
+    if main is None:
+        return FriendList([], None, 0)
+    entries, seen = [], set()
+    expected, listed = None, 0
+    for container in kakao_ax.find_lists(main):
+        section = None
+        for row in kakao_ax.list_rows(container):
+            texts = _row_texts(row)
+            if not texts or row in seen:
+                continue
+            seen.add(row)
+            header = SECTION_HEADER_PATTERN.match(texts[0]) if len(texts) == 1 else None
+            if header is not None and header.group(1) in FRIEND_SECTIONS + REPEATED_SECTIONS:
+                section = header.group(1)
+                if section in FRIEND_SECTIONS:
+                    expected = int(header.group(2).replace(",", ""))
+                continue
+            if section in REPEATED_SECTIONS:
+                continue
+            if section in FRIEND_SECTIONS:
+                listed += 1
+            entries.append(FriendEntry(texts[0], texts, len(entries)))
+    return FriendList(entries, expected, listed)
+
+# 메인 창의 친구 목록을 읽어 항목 목록을 만듭니다.
+def read_friend_rows(app):
+    """메인 창 친구 탭의 목록 행을 모두 읽어 FriendEntry 목록을 반환합니다 (read_friend_list 참고)."""
+    return read_friend_list(app).entries
+
+# --- 클래스 정의 ---
+
+class FriendIndex:
+    """
+    친구 목록 스냅샷으로 만든 이름 색인입니다 (정규화된 이름 -> FriendEntry 목록).
+    전송 전에 받는 사람을 검색 UI 없이 바로 확인해 동명이인을 즉시 걸러냅니다.
+    "친구 N" 머리글의 친구 수만큼 행을 모두 읽었을 때만(complete) 색인에 없는 이름을 MISSING으로 판정해 검색 없이
+    바로 실패시키고, 목록이 화면 밖에 있거나 아직 로딩 중이라 일부만 읽혔으면 UNKNOWN으로 돌려 기존 검색으로 확인합니다.
+    친구 추가 후에는 추가된 이름만 색인에 더합니다.
+    """
+
+    def __init__(self, max_age=FRIEND_INDEX_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._built_at = None
+        self._complete = False # 친구 구역 머리글의 친구 수만큼 모두 읽었는지
+
+    @property
+    def ready(self):
+        return self._built_at is not None
+
+    @property
+    def complete(self):
+        return self._built_at is not None and self._complete
+
+    # 스냅샷이 오래되었는지 확인합니다.
+    def is_stale(self):
+        """색인이 없거나 유효 시간이 지났으면 True."""
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age
+
+    # 친구 목록을 다시 읽어 색인을 만듭니다.
+    def refresh(self, app):
+        """
+        친구 목록을 Accessibility로 읽어 색인을 새로 만들고 친구 수를 반환합니다.
+        목록을 읽지 못하면 기존 색인을 지우고 0을 반환합니다 (이후 조회는 UNKNOWN).
+        """
+        started = time.monotonic()
+        friends = read_friend_list(app) if app is not None else FriendList([], None, 0)
+        entries = friends.entries
+        complete = friends.expected is not None and friends.listed >= friends.expected
+        by_name = {}
+        for entry in entries:
+            by_name.setdefault(kakao_ax.normalize_title(entry.name), []).append(entry)
+        with self._lock:
+            self._by_name = by_name
+            self._built_at = time.monotonic() if entries else None
+            self._complete = complete
+        if entries:
+            duplicates = sum(1 for found in by_name.values() if len(found) > 1)
+            log.info(f"친구 목록 색인 완료: {len(entries)}명, 동명이인 이름 {duplicates}개, "
+                     f"{'전체' if complete else f'일부 (친구 {friends.listed}/{friends.expected}명)'} "
+                     f"({time.monotonic() - started:.2f}초)")
+        else:
+            log.warning("친구 목록을 읽지 못해 색인을 사용하지 않습니다.")
+        return len(entries)
+
+    # 새로 추가된 친구를 색인에 더합니다.
+    def add(self, name):
+        """새로 추가된 친구 이름을 색인에 더합니다 (전체 목록을 다시 읽지 않음)."""
+        key = kakao_ax.normalize_title(name)
+        if not key:
+            return
+        with self._lock:
+            if self._built_at is None:
+                return # 색인이 없으면 다음 갱신 때 반영
+            found = self._by_name.setdefault(key, [])
+            if not any(entry.texts == (key,) for entry in found):
+                found.append(FriendEntry(key, (key,), None))
+        log.info(f"친구 목록 색인에 추가: {key}")
+
+    # 받는 사람 이름을 조회합니다.
+    def resolve(self, username):
+        """
+        받는 사람 이름을 조회해 (상태, 항목 목록)을 반환합니다.
+        상태: FOUND | AMBIGUOUS | MISSING(전체 목록에 없음) | UNKNOWN(색인 없음, 또는 일부만 읽은 목록에 없음)
+        """
+        with self._lock:
+            if self._built_at is None:
+                return UNKNOWN, []
+            found = list(self._by_name.get(kakao_ax.normalize_title(username), []))
+            complete = self._complete
+        if not found:
+            return (MISSING if complete else UNKNOWN), []
+        return (FOUND if len(found) == 1 else AMBIGUOUS), found
+
+    # 색인 상태를 반환합니다.
+    def stats(self):
+        """이름 수, 항목 수, 전체 목록 여부, 스냅샷 경과 시간(초)을 반환합니다."""
+        with self._lock:
+            age = None if self._built_at is None else round(time.monotonic() - self._built_at, 1)
+            return {"names": len(self._by_name), "entries": sum(map(len, self._by_name.values())),
+                    "complete": self.complete, "age_seconds": age}
+
+
+# 메시지 전송과 친구 추가가 함께 쓰는 친구 목록 색인
+FRIEND_INDEX = FriendIndex()
@@ -0,0 +1,208 @@
+# flake8: noqa
+
+import re
+import time
+import logging
+import threading
+from collections import namedtuple
+try:
+    import Quartz
+except ImportError:
+    # macOS가 아닌 환경 (테스트 등): 기록 전용 백엔드만 사용 가능
+    Quartz = None
+
+# --- 상수 정의 ---
+INPUT_MIN_GAP = 0.008 # 이벤트 사이 최소 간격(초), 앱이 이벤트를 놓치지 않을 만큼만
+INPUT_HISTORY_SIZE = 200 # 보관할 실행 기록 수 (재생/디버깅용)
+
+# macOS 가상 키 코드 (ANSI 배열)
+KEY_CODES = {
+    "a": 0, "s": 1, "d": 2, "f": 3, "h": 4, "g": 5, "z": 6, "x": 7, "c": 8, "v": 9,
+    "b": 11, "q": 12, "w": 13, "e": 14, "r": 15, "y": 16, "t": 17,
+    "1": 18, "2": 19, "3": 20, "4": 21, "6": 22, "5": 23, "=": 24, "9": 25, "7": 26,
+    "-": 27, "8": 28, "0": 29, "]": 30, "o": 31, "u": 32, "[": 33, "i": 34, "p": 35,
+    "l": 37, "j": 38, "'": 39, "k": 40, ";": 41, "\\": 42, ",": 43, "/": 44, "n": 45,
+    "m": 46, ".": 47,
+    "enter": 36, "return": 36, "tab": 48, "space": 49, "delete": 51, "backspace": 51,
+    "escape": 53, "esc": 53, "left": 123, "right": 124, "down": 125, "up": 126,
+    "home": 115, "end": 119, "pageup": 116, "pagedown": 121, "forwarddelete": 117,
+}
+# 수정키 (키 코드, 이벤트 플래그)
+MODIFIERS = {
+    "cmd": (55, 1 << 20), "command": (55, 1 << 20),
+    "shift": (56, 1 << 17),
+    "option": (58, 1 << 19), "alt": (58, 1 << 19),
+    "ctrl": (59, 1 << 18), "control": (59, 1 << 18),
+}
+# 자주 쓰는 조합 별칭
+ALIASES = {
+    "paste": "cmd+v",
+    "copy": "cmd+c",
+    "select_all": "cmd+a",
+    "close": "cmd+w",
+    "find": "cmd+f",
+}
+REPEAT_PATTERN = re.compile(r"^(.+?)\s*[*×]\s*(\d+)$") # "down×2", "tab*3"
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# 보낸 입력 이벤트 하나
+#   kind: "key_down" | "key_up" | "mouse_down" | "mouse_up" | "mouse_move" | "wait"
+#   code: 키 코드 (키 이벤트), flags: 수정키 플래그, point: (x, y) (마우스 이벤트), clicks: 클릭 횟수, seconds: 대기 시간
+InputEvent = namedtuple("InputEvent", ["kind", "code", "flags", "point", "clicks", "seconds"])
+
+# --- 함수 정의 ---
+
+def _key(kind, code, flags=0):
+    return InputEvent(kind, code, flags, None, 0, 0)
+
+def _mouse(kind, point, clicks=1):
+    return InputEvent(kind, None, 0, (int(point[0]), int(point[1])), clicks, 0)
+
+# 키 조합 문자열을 이벤트 목록으로 변환합니다.
+def _chord_events(chord):
+    """"cmd+shift+a" 같은 키 조합을 누르기/떼기 이벤트 목록으로 변환합니다."""
+    parts = [part.strip().lower() for part in chord.split("+")]
+    *modifier_names, key_name = parts
+    if key_name not in KEY_CODES:
+        raise ValueError(f"알 수 없는 키: '{key_name}' ({chord})")
+    flags, events = 0, []
+    for name in modifier_names:
+        if name not in MODIFIERS:
+            raise ValueError(f"알 수 없는 수정키: '{name}' ({chord})")
+        code, flag = MODIFIERS[name]
+        flags |= flag
+        events.append(_key("key_down", code, flags))
+    events.append(_key("key_down", KEY_CODES[key_name], flags))
+    events.append(_key("key_up", KEY_CODES[key_name], flags))
+    for name in reversed(modifier_names):
+        code, flag = MODIFIERS[name]
+        flags &= ~flag
+        events.append(_key("key_up", code, flags))
+    return events
+
+# 선언형 입력 단계를 이벤트 목록으로 변환합니다.
+def compile_steps(steps):
+    """
+    선언형 입력 단계 목록을 이벤트 목록으로 변환합니다.
+
+    단계 형식:
+        "enter", "cmd+f", "paste"(별칭), "down×2"/"tab*3"(반복)
+        ("click", x, y), ("double_click", x, y), ("move", x, y), ("wait", 초)
+    """
+    events = []
+    for step in steps:
+        if isinstance(step, str):
+            text = step.strip()
+            repeat = 1
+            match = REPEAT_PATTERN.match(text)
+            if match:
+                text, repeat = match.group(1).strip(), int(match.group(2))
+            chord = ALIASES.get(text.lower(), text)
+            events.extend(_chord_events(chord) * repeat)
+            continue
+        action, *args = step
+        if action in ("click", "double_click"):
+            point = (args[0], args[1])
+            clicks = 2 if action == "double_click" else 1
+            events.append(_mouse("mouse_move", point))
+            for click in range(1, clicks + 1):
+                events.append(_mouse("mouse_down", point, click))
+                events.append(_mouse("mouse_up", point, click))
+        elif action == "move":
+            events.append(_mouse("mouse_move", (args[0], args[1])))
+        elif action == "wait":
+            events.append(InputEvent("wait", None, 0, None, 0, float(args[0])))
+        else:
+            raise ValueError(f"알 수 없는 입력 단계: {step}")
+    return events
+
+# --- 클래스 정의 ---
+
+class QuartzBackend:
+    """Quartz CGEvent로 네이티브 입력 이벤트를 보내는 백엔드입니다 (macOS)."""
+
+    def __init__(self):
+        if Quartz is None:
+            raise RuntimeError("Quartz를 사용할 수 없어 네이티브 입력 백엔드를 만들 수 없습니다.")
+        self._source = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+
+    def post(self, event):
+        if event.kind in ("key_down", "key_up"):
+            cg_event = Quartz.CGEventCreateKeyboardEvent(self._source, event.code, event.kind == "key_down")
+            Quartz.CGEventSetFlags(cg_event, event.flags)
+        else:
+            kind = {"mouse_move": Quartz.kCGEventMouseMoved,
+                    "mouse_down": Quartz.kCGEventLeftMouseDown,
+                    "mouse_up": Quartz.kCGEventLeftMouseUp}[event.kind]
+            cg_event = Quartz.CGEventCreateMouseEvent(self._source, kind, event.point, Quartz.kCGMouseButtonLeft)
+            if event.kind != "mouse_move":
+                Quartz.CGEventSetIntegerValueField(cg_event, Quartz.kCGMouseEventClickState, event.clicks)
+        Quartz.CGEventPost(Quartz.kCGHIDEventTap, cg_event)
+
+
+class RecordingBackend:
+    """이벤트를 실제로 보내지 않고 기록만 하는 백엔드입니다 (Linux 테스트용)."""
+
+    def __init__(self):
+        self.events = []
+
+    def post(self, event):
+        self.events.append(event)
+
+
+class InputMacro:
+    """
+    선언형 키/마우스 입력 단계를 네이티브 이벤트 묶음으로 보내는 입력 계층입니다.
+    이벤트 사이에는 설정한 최소 간격만 두고 (pyautogui의 호출별 PAUSE/이동 애니메이션 없음),
+    보낸 이벤트를 그대로 기록해 재생할 수 있습니다.
+    """
+
+    def __init__(self, backend, min_gap=INPUT_MIN_GAP, history_size=INPUT_HISTORY_SIZE):
+        self.backend = backend
+        self.min_gap = min_gap
+        self.history_size = history_size
+        self.history = [] # [(단계 목록, 이벤트 목록), ...]
+        self._last = 0.0 # 마지막 이벤트를 보낸 시각 (호출 사이에도 최소 간격 유지)
+        self._lock = threading.Lock() # 여러 스레드의 입력이 섞이지 않도록
+
+    # 입력 단계를 실행합니다.
+    def run(self, *steps):
+        """입력 단계를 이벤트 묶음으로 변환해 보내고, 보낸 이벤트 목록을 반환합니다."""
+        events = compile_steps(steps)
+        self.send(events)
+        with self._lock:
+            self.history.append((steps, events))
+            del self.history[:-self.history_size]
+        return events
+
+    # 이벤트 목록을 그대로 보냅니다.
+    def send(self, events):
+        """이벤트 목록을 최소 간격을 지키며 보냅니다."""
+        with self._lock:
+            for event in events:
+                if event.kind == "wait":
+                    time.sleep(event.seconds)
+                    self._last = time.monotonic()
+                    continue
+                gap = self.min_gap - (time.monotonic() - self._last)
+                if gap > 0:
+                    time.sleep(gap)
+                self.backend.post(event)
+                self._last = time.monotonic()
+
+    # 기록된 실행을 다시 보냅니다.
+    def replay(self, recording):
+        """run()이 반환했거나 history에 남은 이벤트 목록을 다시 보냅니다."""
+        self.send(recording)
+
+# 실행 환경에 맞는 입력 계층을 생성합니다.
+def create_input_macro(min_gap=INPUT_MIN_GAP):
+    """
+    Quartz 백엔드를 사용하는 InputMacro를 반환합니다.
+    Quartz가 없으면 입력을 보낼 수 없으므로 RuntimeError (테스트는 RecordingBackend를 직접 주입).
+    """
+    if Quartz is None:
+        raise RuntimeError("Quartz를 사용할 수 없어 입력 이벤트를 보낼 수 없습니다 (macOS에서 pyobjc-framework-Quartz 필요).")
+    return InputMacro(QuartzBackend(), min_gap=min_gap)
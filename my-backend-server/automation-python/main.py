@@ -3,14 +3,61 @@
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List, Literal  # typing에서 List와 Literal 임포트
+from typing import List, Literal, Optional  # typing에서 List, Literal, Optional 임포트
 
 # 분리된 모듈에서 함수 임포트
-from friend_manager import add_friends_via_kakao
-from message_sender import send_messages_via_kakao
+from friend_manager import add_friends_via_kakao, calibrate_detection, LOCATOR, ADD_FLOW, CLICK_POLLER
+from message_sender import send_messages_via_kakao, plan_messages, CHAT_WINDOWS, SEND_FLOW, VERIFICATION_MODE
+import vision_workers
+import ax_events
+from friend_index import FRIEND_INDEX
+from phone_registry import PHONE_REGISTRY
+from ui_session import UI_SESSION
+from click_strategies import CLICK_STRATEGIES
+from detection_profiles import DETECTION_PROFILES
 
 app = FastAPI()
 
+
+@app.on_event("startup")
+def start_vision_workers():
+    """
+    OpenCV/Tesseract 작업용 워커 프로세스 풀 시작 (API/UI 스레드와 분리)
+    """
+    vision_workers.start_pool()
+
+
+@app.on_event("startup")
+def start_ax_observer():
+    """
+    KakaoTalk 창 알림 구독 시작 (KakaoTalk이 실행 중이 아니면 전송/추가 요청 때 다시 시도)
+    """
+    ax_events.ensure_observer()
+
+
+@app.on_event("startup")
+def select_detection_profile():
+    """
+    KakaoTalk 버전/화면 모드/배율을 감지해 템플릿/색상 범위 프로필 선택
+    """
+    DETECTION_PROFILES.select()
+
+
+@app.on_event("shutdown")
+def stop_vision_workers():
+    """
+    워커 프로세스 및 공유 메모리 정리
+    """
+    vision_workers.stop_pool()
+
+
+@app.on_event("shutdown")
+def stop_ax_observer():
+    """
+    KakaoTalk 창 알림 구독 종료
+    """
+    ax_events.stop_observer()
+
 # --- Pydantic 모델 정의 ---
 
 
@@ -21,6 +68,8 @@ class Friend(BaseModel):
 
 class AddFriendsRequest(BaseModel):
     friends: List[Friend]
+    batch_dialog: bool = False  # 친구 추가 대화 상자를 한 번만 열고 입력란만 다시 채움
+    use_registry: bool = True  # 이전에 처리한 번호는 저장된 결과로 바로 응답 (False면 모두 다시 시도)
 
 
 class MessageItem(BaseModel):
@@ -35,10 +84,38 @@ class SendMessageGroup(BaseModel):  # 클래스 이름 변경 (API 요청 구조
 
 class SendMessagesRequest(BaseModel):
     message_groups: List[SendMessageGroup]  # SendMessageGroup 사용
+    batch_optimize: bool = False  # 같은 메시지를 보내는 사용자끼리 묶어 처리 (결과는 요청 순서 유지)
+    verification_mode: Literal["first", "deferred"] = VERIFICATION_MODE  # first: 첫 메시지만 바로 확인, deferred: 모두 보낸 뒤 한 번에 확인
+
+
+class LearnUIStateRequest(BaseModel):
+    state: Literal["friends_tab", "chat_list", "search_results"]  # 지금 메인 창에 보이는 화면
+
+
+class CalibrateDetectionRequest(BaseModel):
+    target: Literal["add_icon", "confirm_button"]  # 보정할 대상 (아이콘은 친구 탭, 버튼은 친구 추가 대화 상자를 띄운 상태)
+    rect: Optional[List[int]] = None  # 대상의 화면 영역 [x, y, w, h] (없으면 Accessibility로 찾음)
+    samples: Optional[int] = None  # 캡처할 프레임 수 (색상 범위 맞춤용)
 
 # --- API 엔드포인트 ---
 
 
+@app.get("/health")
+def health():
+    """
+    헬스 체크 엔드포인트 (비전 워커 풀, 채팅창 캐시, 친구 목록 색인, 전화번호 레지스트리, AX 컨트롤 캐시, 창 알림 구독, 화면 상태 기계, UI 세션, 클릭 전략 통계, 감지 프로필, 템플릿 매칭 폴링 포함)
+    """
+    pool = vision_workers.get_pool()
+    return {"status": "ok", "vision_workers": pool.stats() if pool else None,
+            "chat_windows": CHAT_WINDOWS.stats(), "friend_index": FRIEND_INDEX.stats(),
+            "phone_registry": PHONE_REGISTRY.stats(), "ax_locator": LOCATOR.stats(),
+            "ax_events": ax_events.stats(),
+            "ui_state": {"send": SEND_FLOW.stats(), "add_friend": ADD_FLOW.stats(),
+                         "references": ADD_FLOW.classifier.frames.stats()},
+            "ui_session": UI_SESSION.stats(), "click_strategies": CLICK_STRATEGIES.stats(),
+            "detection_profiles": DETECTION_PROFILES.stats(), "click_polling": CLICK_POLLER.stats()}
+
+
 @app.post("/kakao/add-friends")
 def add_friends(request: AddFriendsRequest):
     """
@@ -49,7 +126,8 @@ def add_friends(request: AddFriendsRequest):
         friends_data = [friend.dict() for friend in request.friends]
         # DEBUG: 로그로 받은 친구 목록 출력
         print(f"DEBUG main.add_friends received friends_data: {friends_data}")
-        results = add_friends_via_kakao(friends_data)
+        results = add_friends_via_kakao(friends_data, batch_dialog=request.batch_dialog,
+                                        use_registry=request.use_registry)
         return {"results": results}
     except Exception as e:
         # 오류 발생 시 500 에러와 함께 상세 내용 반환
@@ -64,8 +142,56 @@ def send_messages(request: SendMessagesRequest):
     try:
         # Pydantic 모델을 사용하여 받은 데이터를 Python dict 리스트로 변환
         message_groups_data = [group.dict() for group in request.message_groups]
-        results = send_messages_via_kakao(message_groups_data)
+        results = send_messages_via_kakao(message_groups_data, batch_optimize=request.batch_optimize,
+                                          verification_mode=request.verification_mode)
         return {"results": results}
     except Exception as e:
         # 오류 발생 시 500 에러와 함께 상세 내용 반환
         raise HTTPException(status_code=500, detail=f"메시지 전송 중 오류 발생: {str(e)}")
+
+
+@app.post("/kakao/send-messages/plan")
+def plan_send_messages(request: SendMessagesRequest):
+    """
+    카카오톡 메시지 전송 드라이런 API 엔드포인트 (UI 조작 없이 사용자별 실행 계획과 예상 소요 시간 반환)
+    """
+    try:
+        message_groups_data = [group.dict() for group in request.message_groups]
+        return {"plans": plan_messages(message_groups_data, verification_mode=request.verification_mode,
+                                       batch_optimize=request.batch_optimize)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"실행 계획 생성 중 오류 발생: {str(e)}")
+
+
+@app.get("/kakao/ui-state")
+def get_ui_state():
+    """
+    현재 KakaoTalk 화면 상태 판별 결과 반환 (UI 조작 없음)
+    """
+    return {"reading": ADD_FLOW.classifier.classify()._asdict()}
+
+
+@app.post("/kakao/ui-state/learn")
+def learn_ui_state(request: LearnUIStateRequest):
+    """
+    지금 메인 창 화면을 지정한 상태의 기준 서명으로 기록 (탭/검색 상태 구분용)
+    """
+    if not ADD_FLOW.classifier.learn(request.state):
+        raise HTTPException(status_code=409, detail="KakaoTalk 메인 창 화면을 캡처할 수 없습니다.")
+    return {"references": ADD_FLOW.classifier.frames.stats()}
+
+
+@app.post("/kakao/detection-profiles/calibrate")
+def calibrate_detection_profile(request: CalibrateDetectionRequest):
+    """
+    지금 화면에서 대상 템플릿을 캡처하고 색상 범위/아이콘 면적을 맞춰 현재 환경(KakaoTalk 버전/화면 모드/배율)용 프로필에 저장
+    """
+    if request.rect is not None and len(request.rect) != 4:
+        raise HTTPException(status_code=400, detail="rect는 [x, y, w, h] 형식이어야 합니다.")
+    try:
+        fitted = calibrate_detection(request.target, request.rect, request.samples)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"calibrated": fitted, "profiles": DETECTION_PROFILES.stats()}
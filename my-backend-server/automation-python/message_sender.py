@@ -1,6 +1,5 @@
 # flake8: noqa
 
-import pyautogui
 import time
 import os
 import Quartz
@@ -11,23 +10,27 @@ import pathlib
 import cv2
 import numpy as np # numpy import 추가
 import shutil
-import pyperclip
-import pytesseract
 import subprocess
 import logging
-import tempfile  # tempfile 모듈 추가
-try:
-    from cairosvg import svg2png  # SVG를 PNG로 변환
-except ImportError:
-    # 라이브러리가 없는 경우 대체 로직 제공
-    def svg2png(bytestring=None, write_to=None, dpi=300):
-        log.error("cairosvg 라이브러리가 설치되지 않았습니다. SVG 파일을 그대로 사용합니다.")
-        if bytestring and write_to:
-            with open(write_to, 'wb') as f:
-                f.write(bytestring)
-        return False
-from pynput.keyboard import Controller, Key
-keyboard = Controller()
+from collections import namedtuple
+from ocr_matcher import OutcomeMatcher
+from ocr_pipeline import OcrPipeline
+import vision_workers
+import kakao_ax
+import ax_events
+from ui_state import (UIStateClassifier, UIStateMachine, UIStateError, FRIENDS_TAB, CHAT_LIST, SEARCH_RESULTS, CHAT_WINDOW,
+                      ADD_FRIEND_DIALOG, MAIN_WINDOW, MAIN_WINDOW_STATES)
+from ui_session import UI_SESSION, FRIENDS_TAB_TARGET, SEARCH_FIELD, MESSAGE_FIELD, WINDOW, FIELD, window_key
+from chat_windows import ChatWindowCache, CHAT_WINDOW_CACHE_SIZE, close_window
+from friend_index import FRIEND_INDEX, MISSING, AMBIGUOUS
+import chat_verifier
+from image_cache import ImageCache
+from clipboard import create_pasteboard, StagedClipboard
+from text_input import TextInput
+from payload_prefetcher import PayloadPrefetcher, PREFETCH_LOOKAHEAD, order_groups_by_payload, payload_signature, prepare_group
+from action_plan import compile_message_plan, estimate_plan, describe_plan
+from input_macro import create_input_macro
+from ax_locator import AXLocator
 
 # --- 상수 정의 ---
 BASE_DIR = pathlib.Path(__file__).parent.absolute()
@@ -39,6 +42,22 @@ MEDIUM_SLEEP = 0.5 # 중간 대기 시간 (약간 단축)
 LONG_SLEEP = 0.8 # 긴 대기 시간 (단축)
 EXTRA_LONG_SLEEP = 1.2 # 매우 긴 대기 시간 (크게 단축)
 
+# 검증 상수
+PIPELINE_VERIFICATION = True # 첫 메시지 OCR 확인을 백그라운드에서 수행 (다음 사용자 채팅 열기와 겹침)
+VERIFICATION_MODE = "first" # "first": 첫 메시지만 전송 직후 확인, "deferred": 모두 보낸 뒤 대화 하단을 한 번에 확인
+VERIFICATION_MODES = ("first", "deferred") # 사용할 수 있는 검증 방식
+BATCH_OPTIMIZE = False # True면 같은 페이로드를 보내는 사용자끼리 연속 처리 (결과는 원래 순서로 반환)
+DEFERRED_PLAN_TIMINGS = {"send_text": 0, "send_image": SHORT_SLEEP} # deferred 검증: 전송 후 대기 최소화 (모두 보낸 뒤 한 번에 확인)
+
+# 채팅창 열기 대기 상한 (AX 트리로 상태를 확인하며 조건이 맞는 즉시 진행)
+CHAT_SEARCH_FIELD_TIMEOUT = 1.0 # Cmd+F 후 검색창 포커스 대기
+CHAT_SEARCH_TIMEOUT = 3.0 # 검색 결과에 정확히 일치하는 이름이 나타날 때까지 대기
+CHAT_OPEN_TIMEOUT = 3.0 # 채팅창이 열리고 포커스될 때까지 대기
+FRIEND_LIST_TIMEOUT = 2.0 # 친구 탭 전환 후 친구 목록이 읽힐 때까지 대기
+
+# 실행 계획 실행 설정 (동작별 대기 시간은 action_plan.DEFAULT_TIMINGS 한 곳에서 관리)
+PLAN_STEP_ATTEMPTS = 2 # 실행 계획 단계 동작 실패 시 실패한 동작부터 이어서 시도하는 횟수 (첫 시도 포함)
+
 # UI 상호작용 상수
 SEARCH_USER_SHORTCUT = '1' # 사용자 검색 단축키 (Cmd+1, 친구 탭으로 가정) - 실제 동작 확인 필요
 PASTE_SHORTCUT = 'v' # 붙여넣기 단축키 (Cmd+V)
@@ -51,16 +70,47 @@ OCR_ERROR_PATTERNS = [ # OCR 에러 감지 문자열 목록
     "메시지 전송에 실패"
 ]
 OCR_SUCCESS_PATTERNS = ["읽음", "1", "전송됨"] # OCR 성공 감지 문자열 목록 (신뢰도 낮을 수 있음)
+OCR_ERROR_MATCHER = OutcomeMatcher({"error": OCR_ERROR_PATTERNS}) # 오인식 허용 에러 패턴 분류기
+
+# 전송용 이미지 준비 캐시 (SVG 래스터화/축소/재압축/TIFF, 파일 내용 해시 기준)
+IMAGE_CACHE = ImageCache()
+# 프로세스 내 클립보드 (Finder/osascript 없이 직접 기록)
+PASTEBOARD = create_pasteboard()
+# 사용을 마친 채팅창을 열어 두고 재사용하는 LRU 캐시 (배치 사이에도 유지)
+CHAT_WINDOWS = ChatWindowCache(CHAT_WINDOW_CACHE_SIZE)
+# 키/마우스 입력 계층 (네이티브 이벤트 묶음, 이벤트 사이 최소 간격만 둠)
+INPUT = create_input_macro()
+# 텍스트 입력 백엔드 (입력창 값 직접 설정 후 확인, 안 되면 붙여넣기)
+TEXT_INPUT = TextInput(PASTEBOARD, paste=lambda: INPUT.run("paste"), select_all=lambda: INPUT.run("select_all"))
+# Accessibility 컨트롤 찾기 엔진 (전송 버튼 활성화로 메시지 입력 반영 확인)
+LOCATOR = AXLocator()
+# 마지막으로 올린 페이로드를 기억해 같은 내용은 다시 기록하지 않는 클립보드
+STAGED_CLIPBOARD = StagedClipboard(PASTEBOARD)
+UI_SESSION.clipboard = STAGED_CLIPBOARD # 세션 상태에 클립보드 기록/재사용 포함
+# 전송 흐름 화면 상태 기계 (기대와 다른 창이 앞에 있으면 시간 초과를 기다리지 않고 바로 복구)
+SEND_FLOW = UIStateMachine(UIStateClassifier(), recoveries={
+    ADD_FRIEND_DIALOG: lambda: INPUT.run("close"), # 남아 있는 친구 추가 대화 상자 닫기
+    CHAT_WINDOW: lambda: _raise_main_window(), # 캐시된 채팅창이 앞에 있으면 메인 창을 다시 올림
+    CHAT_LIST: lambda: _press_cmd('1'), # 채팅 탭이면 친구 탭으로
+}, name="send")
 
 # --- 로깅 설정 ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 log = logging.getLogger(__name__)
 
+# 첫 메시지 판정을 기다리며 보류한 전송 단계 (남은 계획 단계, 준비된 메시지 목록, 요청의 원래 메시지 목록)
+HeldSteps = namedtuple("HeldSteps", ["steps", "staged", "originals"])
+
 # --- 함수 정의 ---
 
-# KakaoTalk 앱을 활성화합니다.
+# KakaoTalk 앱을 활성화합니다 (이미 앞에 있는 것으로 알려져 있으면 생략).
 def focus_kakaotalk():
-    """KakaoTalk 애플리케이션을 활성화합니다."""
+    """KakaoTalk 애플리케이션을 활성화합니다. 세션이 이미 앞에 있다고 알고 있으면 osascript와 대기를 생략합니다."""
+    return UI_SESSION.ensure("focus", _activate_kakaotalk, frontmost=True)
+
+# osascript로 KakaoTalk 앱을 활성화합니다.
+def _activate_kakaotalk():
+    """osascript로 KakaoTalk 애플리케이션을 활성화합니다."""
     try:
         script = 'tell application "KakaoTalk" to activate'
         subprocess.run(['osascript', '-e', script], check=True, capture_output=True)
@@ -86,8 +136,8 @@ def clear_debug_dir():
         log.error(f"디버그 디렉토리 초기화 실패: {e}")
 
 # 텍스트 메시지를 보내는 내부 헬퍼 함수입니다.
-def _send_text(content: str):
-    """텍스트 메시지를 보내는 내부 헬퍼 함수입니다."""
+def _send_text(content: str, settle=True):
+    """텍스트 메시지를 보내는 내부 헬퍼 함수입니다. settle=False면 전송 후 대기를 최소화합니다."""
     try:
         log.info(f"텍스트 전송 시도: {content[:30]}...")
         # 영역 가져오기 전 활성화 확인
@@ -99,24 +149,19 @@ def _send_text(content: str):
         # Removed mouse click code for focusing input field.
 
         # 기존 내용 지우기 (선택 사항, 필드가 활성화되지 않으면 문제 발생 가능)
-        keyboard.press(Key.cmd)
-        keyboard.press(SELECT_ALL_SHORTCUT)
-        keyboard.release(SELECT_ALL_SHORTCUT)
-        keyboard.release(Key.cmd)
+        INPUT.run("select_all")
         time.sleep(SHORT_SLEEP)
-        pyautogui.press('delete')
+        INPUT.run("delete")
         time.sleep(SHORT_SLEEP)
 
-        # 내용 복사 및 붙여넣기, 전송
-        pyperclip.copy(content)
-        time.sleep(SHORT_SLEEP) # 클립보드 업데이트 시간 확보
-        keyboard.press(Key.cmd)
-        keyboard.press(PASTE_SHORTCUT)
-        keyboard.release(PASTE_SHORTCUT)
-        keyboard.release(Key.cmd)
-        time.sleep(MEDIUM_SLEEP) # 붙여넣기 대기
-        pyautogui.press('enter')
-        time.sleep(LONG_SLEEP) # 메시지 전송 대기
+        # 입력창 값 직접 설정 (앱 반영 확인 후 진행, 불가 시 붙여넣기) 및 전송
+        method = TEXT_INPUT.enter(content, confirm=_message_input_processed)
+        if method is None:
+            log.error("메시지 입력이 입력창에 반영되지 않아 전송하지 않습니다.")
+            return False
+        log.debug(f"텍스트 입력 방식: {method}")
+        INPUT.run("enter")
+        time.sleep(LONG_SLEEP if settle else SHORT_SLEEP) # 메시지 전송 대기
         log.info("텍스트 전송 성공.")
         return True
     except Exception as e:
@@ -124,8 +169,11 @@ def _send_text(content: str):
         return False
 
 # 이미지 메시지를 보내는 내부 헬퍼 함수입니다.
-def _send_image(abs_path: str, filename: str): # 이제 abs_path는 이미 절대 경로라고 가정
-    """이미지 메시지를 보내는 내부 헬퍼 함수입니다."""
+def _send_image(abs_path: str, filename: str, settle=True, staged=None): # 이제 abs_path는 이미 절대 경로라고 가정
+    """
+    이미지 메시지를 보내는 내부 헬퍼 함수입니다. settle=False면 전송 후 대기를 최소화합니다.
+    staged(PreparedMessage)가 주어지면 미리 검증/준비된 이미지와 클립보드 페이로드를 그대로 사용합니다.
+    """
     # 경로 유효성 검사 강화
     if not abs_path or not isinstance(abs_path, str):
         log.error(f"잘못된 이미지 경로 수신: {abs_path}")
@@ -141,128 +189,81 @@ def _send_image(abs_path: str, filename: str): # 이제 abs_path는 이미 절
             log.error("유효한 이미지 파일이 없습니다.")
             return False
         
-        folder = os.path.dirname(paths[0])
-        filenames = [os.path.basename(p) for p in paths]
-        log.info(f"여러 이미지 전송 시도 - 폴더: {folder}, 파일: {filenames}")
-        
         try:
-            # 1. Finder 열기
-            subprocess.run(['open', folder], check=True)
-            time.sleep(MEDIUM_SLEEP)
-            
-            # 2. AppleScript로 특정 파일들만 선택
-            names_list = ', '.join([f'"{name}"' for name in filenames])
-            select_script = f'''
-            tell application "Finder"
-                set targetFolder to POSIX file "{folder}" as alias
-                set theWindow to window of targetFolder
-                set current view of theWindow to icon view
-                activate
-                select every item of folder targetFolder whose name is in {{{names_list}}}
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', select_script], check=True)
-            time.sleep(SHORT_SLEEP)
-            
-            # 3. 파일 복사 (Command+C) - pynput 사용
-            keyboard.press(Key.cmd)
-            keyboard.press('c')
-            keyboard.release('c')
-            keyboard.release(Key.cmd)
-            time.sleep(MEDIUM_SLEEP)
-            
-            # 4. Finder 창 닫기
-            close_script = '''
-            tell application "Finder"
-                close every window
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', close_script], check=True)
-            time.sleep(SHORT_SLEEP)
-            
-            # 5. 카카오톡에 붙여넣기
+            # 1. 전송용 이미지 준비 후 파일 URL 목록을 클립보드에 직접 기록 (Finder/파일 복사 없음)
+            if staged is not None:
+                prepared_paths = [image.path for image in staged.images]
+            else:
+                prepared_paths = [IMAGE_CACHE.prepare(p).path for p in paths]
+            filenames = [os.path.basename(p) for p in prepared_paths]
+            log.info(f"여러 이미지 전송 시도 - 파일: {filenames}")
+            PASTEBOARD.set_file_urls(prepared_paths)
+
+            # 2. 카카오톡에 붙여넣기
             if not focus_kakaotalk():
                 log.error("이미지 전송 불가, KakaoTalk 활성화 실패.")
                 return False
-            time.sleep(SHORT_SLEEP)
-            
-            # 6. 붙여넣기 (Command+V) - pynput 사용
-            keyboard.press(Key.cmd)
-            keyboard.press('v')
-            keyboard.release('v')
-            keyboard.release(Key.cmd)
+
+            # 3. 붙여넣기 (Command+V) - pynput 사용
+            INPUT.run("paste")
             time.sleep(LONG_SLEEP)
-            
-            # 7. 전송 (Enter) - pynput 사용
-            keyboard.press(Key.enter)
-            keyboard.release(Key.enter)
-            time.sleep(EXTRA_LONG_SLEEP)
-            
+
+            # 4. 전송 (Enter) - pynput 사용
+            INPUT.run("enter")
+            time.sleep(EXTRA_LONG_SLEEP if settle else SHORT_SLEEP)
+
             log.info(f"여러 이미지 전송 완료: {filenames}")
             return True
-            
+
         except Exception as e:
             log.error(f"여러 이미지 복사/전송 실패: {e}", exc_info=True)
-            # 창이 열려있으면 닫기 시도
-            try:
-                subprocess.run(['osascript', '-e', 'tell application "Finder" to close every window'], check=False)
-            except:
-                pass
-            
+
             # 실패 시 단일 이미지로 하나씩 전송 시도
             log.warning("다중 이미지 전송 실패. 단일 이미지로 하나씩 전송을 시도합니다.")
             success = True
             for p in paths:
-                single_success = _send_single_image(p, os.path.basename(p))
+                single_success = _send_single_image(p, os.path.basename(p), settle=settle)
                 if not single_success:
                     success = False
                 time.sleep(MEDIUM_SLEEP)
             return success
     
     # 단일 이미지는 _send_single_image 헬퍼 함수로 처리
-    return _send_single_image(abs_path, filename)
+    return _send_single_image(abs_path, filename, settle=settle, staged=staged)
 
 # 단일 이미지 전송 헬퍼 함수 (기존 _send_image 로직을 분리)
-def _send_single_image(abs_path: str, filename: str):
-    """단일 이미지 파일을 전송하는 헬퍼 함수입니다."""
-    if not os.path.exists(abs_path):
-        log.error(f"이미지 파일 없음 (절대 경로 확인됨): {abs_path}")
-        return False
-    if not os.path.isfile(abs_path):
-        log.error(f"이미지 경로가 파일이 아님: {abs_path}")
-        return False
-    
-    # SVG 파일인 경우 PNG로 변환 (기존 로직)
-    temp_png_path = None
-    file_ext = os.path.splitext(abs_path)[1].lower()
-    if file_ext == '.svg':
-        try:
-            log.info(f"SVG 파일 감지: {filename} - PNG로 변환 시도")
-            # 임시 파일 생성
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            temp_png_path = temp_file.name
-            temp_file.close()
-            
-            # SVG를 PNG로 변환
-            with open(abs_path, 'rb') as svg_file:
-                svg_data = svg_file.read()
-                svg2png(bytestring=svg_data, write_to=temp_png_path, dpi=300)
-            
-            log.info(f"SVG 파일을 PNG로 성공적으로 변환: {temp_png_path}")
-            # 변환된 PNG 경로를 사용
-            abs_path = temp_png_path
-            filename = os.path.basename(temp_png_path)
-        except Exception as e:
-            log.error(f"SVG를 PNG로 변환 중 오류 발생: {e}", exc_info=True)
-            # 변환 실패 시 원본 파일로 계속 진행
-            log.warning("SVG 변환 실패, 원본 SVG 파일로 시도합니다.")
+def _send_single_image(abs_path: str, filename: str, settle=True, staged=None):
+    """
+    단일 이미지 파일을 전송하는 헬퍼 함수입니다. settle=False면 전송 후 대기를 최소화합니다.
+    staged(PreparedMessage)가 주어지면 검증/준비를 건너뛰고 미리 읽어 둔 TIFF 바이트를 붙여넣습니다.
+    """
+    if staged is not None:
+        # 선행 단계에서 경로 검증, 이미지 준비, TIFF 읽기까지 완료됨
+        prepared = staged.images[0]
+        payload_kind, payload_value = staged.payload
+        tiff_bytes = payload_value if payload_kind == "tiff" else None
+    else:
+        if not os.path.exists(abs_path):
+            log.error(f"이미지 파일 없음 (절대 경로 확인됨): {abs_path}")
+            return False
+        if not os.path.isfile(abs_path):
+            log.error(f"이미지 경로가 파일이 아님: {abs_path}")
+            return False
 
-    # 방법 1: AppleScript를 통한 직접 클립보드 복사 (보통 가장 신뢰성 높음)
+        # 전송용 이미지 준비 (SVG 래스터화, 축소, 재압축, TIFF 인코딩 - 같은 파일은 캐시 재사용)
+        prepared = IMAGE_CACHE.prepare(abs_path)
+        tiff_bytes = None
+    clipboard_path = prepared.tiff_path or prepared.path
+
+    # 방법 1: 미리 인코딩된 TIFF를 클립보드에 직접 기록 (변환 불가 형식은 파일 URL로 기록)
     try:
-        log.info(f"직접 복사를 통한 이미지 전송 시도: {filename} (경로: {abs_path})")
-        script = f'set the clipboard to (read (POSIX file "{abs_path}") as TIFF picture)'
-        subprocess.run(['osascript', '-e', script], check=True, capture_output=True, timeout=10)
-        time.sleep(MEDIUM_SLEEP)
+        log.info(f"직접 복사를 통한 이미지 전송 시도: {filename} (경로: {clipboard_path})")
+        if tiff_bytes is None:
+            tiff_bytes = IMAGE_CACHE.tiff_bytes(prepared)
+        if tiff_bytes is not None:
+            PASTEBOARD.set_image(tiff_bytes, kind="tiff")
+        else:
+            PASTEBOARD.set_file_urls([prepared.path])
 
         # 영역 가져오기 전 활성화 확인
         if not focus_kakaotalk():
@@ -271,122 +272,286 @@ def _send_single_image(abs_path: str, filename: str):
         time.sleep(SHORT_SLEEP)
 
         # 붙여넣기 및 전송
-        keyboard.press(Key.cmd)
-        keyboard.press(PASTE_SHORTCUT)
-        keyboard.release(PASTE_SHORTCUT)
-        keyboard.release(Key.cmd)
+        INPUT.run("paste")
         time.sleep(LONG_SLEEP) # 이미지 붙여넣기 미리보기 대기 시간 증가
-        pyautogui.press('enter')
-        time.sleep(EXTRA_LONG_SLEEP) # 이미지 업로드/전송 대기 시간 증가
+        INPUT.run("enter")
+        time.sleep(EXTRA_LONG_SLEEP if settle else SHORT_SLEEP) # 이미지 업로드/전송 대기 시간 증가
         log.info(f"직접 복사/전송으로 이미지 전송 성공: {filename}")
-        
-        # 임시 파일 정리
-        if temp_png_path and os.path.exists(temp_png_path):
-            try:
-                os.remove(temp_png_path)
-                log.debug(f"임시 PNG 파일 삭제: {temp_png_path}")
-            except Exception as e:
-                log.warning(f"임시 PNG 파일 삭제 실패: {e}")
-        
         return True
 
     # ... _send_image 함수의 나머지 부분 (오류 처리 및 대체 방법 포함) ...
-    except subprocess.TimeoutExpired:
-        log.error("AppleScript를 통해 클립보드로 이미지 복사 중 시간 초과.")
-    except subprocess.CalledProcessError as e:
-        log.error(f"AppleScript를 통한 클립보드 이미지 복사 실패: {e.stderr.decode()}")
     except Exception as e:
         log.error(f"직접 복사를 통한 이미지 전송 중 오류 발생: {e}", exc_info=True)
 
-    # 방법 2: Finder 사용 대체 (신뢰성 낮고 방해적임)
+    # 방법 2: 파일 URL로 클립보드 기록 후 붙여넣기 (이미지 데이터 기록/붙여넣기 실패 대비, Finder 사용 안 함)
     try:
-        log.warning(f"직접 이미지 복사 실패. Finder 대체 방법 시도: {filename}")
-        # Finder 상호작용 전 KakaoTalk 활성화 확인
+        log.warning(f"직접 이미지 복사 실패. 파일 URL 대체 방법 시도: {filename}")
+        PASTEBOARD.set_file_urls([prepared.path])
         if not focus_kakaotalk(): return False # KakaoTalk 활성화할 수 없으면 중단
 
-        # 단순화된 Finder 상호작용 - 파일 경로 복사 후 '폴더로 이동' 사용
-        pyperclip.copy(abs_path)
-        time.sleep(SHORT_SLEEP)
-
-        # Finder 활성화 및 '폴더로 이동' 열기
-        subprocess.run(['osascript', '-e', 'tell application "Finder" to activate'], check=True)
-        time.sleep(MEDIUM_SLEEP)
-        pyautogui.keyDown('command')
-        pyautogui.keyDown('shift')
-        pyautogui.press('g') # 폴더로 이동 단축키
-        pyautogui.keyUp('shift')
-        pyautogui.keyUp('command')
-        time.sleep(MEDIUM_SLEEP)
-
-        # 경로 붙여넣고 이동
-        keyboard.press(Key.cmd)
-        keyboard.press(PASTE_SHORTCUT)
-        keyboard.release(PASTE_SHORTCUT)
-        keyboard.release(Key.cmd)
-        time.sleep(SHORT_SLEEP)
-        pyautogui.press('enter')
-        time.sleep(LONG_SLEEP) # Finder 이동 대기
-
-        # 파일 선택 (선택/표시된 유일한 파일이라고 가정)
-        pyautogui.keyDown('command')
-        pyautogui.press('c') # 파일 자체 복사
-        pyautogui.keyUp('command')
-        time.sleep(MEDIUM_SLEEP)
-
-        # KakaoTalk으로 다시 전환하고 붙여넣기
-        if not focus_kakaotalk(): return False
-        time.sleep(MEDIUM_SLEEP)
-
-        # Removed mouse click code for focusing input field.
-
         # 붙여넣기 및 전송
-        pyautogui.keyDown('command')
-        pyautogui.press(PASTE_SHORTCUT)
-        pyautogui.keyUp('command')
+        INPUT.run("paste")
         time.sleep(LONG_SLEEP)
-        pyautogui.press('enter')
-        time.sleep(EXTRA_LONG_SLEEP)
-        log.info(f"Finder 대체 방식으로 이미지 전송 성공: {filename}")
+        INPUT.run("enter")
+        time.sleep(EXTRA_LONG_SLEEP if settle else SHORT_SLEEP)
+        log.info(f"파일 URL 대체 방식으로 이미지 전송 성공: {filename}")
         return True
 
     except Exception as e:
-        log.error(f"이미지 전송 Finder 대체 방식 실패: {e}", exc_info=True)
+        log.error(f"이미지 전송 파일 URL 대체 방식 실패: {e}", exc_info=True)
         # 최종 대체: 경로를 텍스트로 전송
         log.warning("모든 이미지 전송 방법 실패. 경로를 텍스트로 전송합니다.")
         return _send_text(f"이미지 전송 실패. 경로: {abs_path}")
 
-# 여러 이미지를 Finder에서 선택하여 클립보드에 복사하는 함수
-def _copy_multiple_images_to_clipboard(image_paths):
-    """여러 이미지 파일을 Finder에서 선택하고 클립보드에 복사합니다."""
-    if not image_paths:
-        log.error("복사할 이미지 경로가 없습니다.")
+# 메시지 입력이 앱에 반영되었는지 확인합니다.
+def _message_input_processed():
+    """전송 버튼이 활성화되면 True (앱이 입력창 내용을 받았다는 신호). 버튼을 찾을 수 없으면 확인하지 않고 True."""
+    node = LOCATOR.locate("send_button")
+    return node is None or node.get("AXEnabled") is not False
+
+# 단축키 하나를 누릅니다.
+def _press_cmd(key):
+    """Cmd+key 단축키를 누릅니다."""
+    INPUT.run(f"cmd+{key}")
+
+# 검색창에 사용자 이름을 입력합니다.
+def _type_search_text(username, confirm=None, timeout=CHAT_SEARCH_TIMEOUT):
+    """
+    검색창에 사용자 이름을 입력하고 사용한 방식("ax"/"paste")을 반환합니다.
+    confirm(검색 결과 확인)이 주어지면 결과가 나타나지 않을 때 붙여넣기로 다시 검색하고, 그래도 없으면 None.
+    """
+    return TEXT_INPUT.enter(username, confirm=confirm, confirm_timeout=timeout)
+
+# 검색 후 결과를 확인하지 않고 채팅창을 엽니다 (AX 사용 불가 시 대체 방식).
+def _open_chat_blind(username):
+    """검색 결과를 확인하지 않고 아래 방향키 두 번과 Enter로 첫 결과를 엽니다 (Accessibility 사용 불가 시)."""
+    _press_cmd('1')
+    time.sleep(MEDIUM_SLEEP)
+    _press_cmd('f')
+    time.sleep(MEDIUM_SLEEP)
+    _type_search_text(username)
+    time.sleep(LONG_SLEEP) # 검색 결과 대기
+    INPUT.run("down×2") # 결과로 아래로 이동
+    time.sleep(SHORT_SLEEP)
+    INPUT.run("enter") # 선택
+    time.sleep(LONG_SLEEP) # 채팅 창 열기/활성화 대기
+    return True, None, None
+
+# 검색창을 열고 포커스를 기다립니다.
+def _open_search_field(app):
+    """Cmd+F로 검색창을 열고 검색창에 포커스가 갈 때까지 기다립니다 (확인하지 못해도 진행)."""
+    _press_cmd('f')
+    field = kakao_ax.wait_for(lambda: kakao_ax.focused_text_field(app), CHAT_SEARCH_FIELD_TIMEOUT)
+    if field is None:
+        log.warning("검색창 포커스를 확인하지 못했습니다. 계속 진행합니다.")
+
+# 메인 창을 앞으로 가져옵니다.
+def _raise_main_window(app=None):
+    """메인 창(친구/채팅 목록)을 앞으로 가져오고 주 창으로 지정합니다. 메인 창을 찾으면 True."""
+    app = app or kakao_ax.kakao_app()
+    main = kakao_ax.main_window(app) if app is not None else None
+    if main is None:
         return False
-    
-    temp_dir = None
+    main.perform("AXRaise")
+    main.set("AXMain", True)
+    UI_SESSION.note(window=MAIN_WINDOW, field=None) # 메인 창 안 포커스 위치는 알 수 없음
+    return True
+
+# 친구 목록 색인이 오래되었으면 다시 읽습니다.
+def refresh_friend_index(force=False):
+    """친구 목록 색인이 없거나 오래되었으면 친구 탭을 열어 Accessibility로 다시 읽습니다."""
+    if not force and not FRIEND_INDEX.is_stale():
+        return
+    app = kakao_ax.kakao_app()
+    if app is None:
+        log.warning("Accessibility를 사용할 수 없어 친구 목록 색인 없이 진행합니다.")
+        return
+    _raise_main_window(app)
+    UI_SESSION.ensure("friends_tab", lambda: _press_cmd('1'), **FRIENDS_TAB_TARGET) # 친구 탭
+    # 목록이 로딩 중이면 친구 구역 머리글의 친구 수만큼 읽힐 때까지 다시 읽음 (시간 초과 시 일부만 읽은 색인 사용)
+    kakao_ax.wait_for(lambda: FRIEND_INDEX.refresh(app) and FRIEND_INDEX.complete, FRIEND_LIST_TIMEOUT, interval=SHORT_SLEEP)
+
+# AX 트리로 검색 결과와 열린 창을 확인하며 사용자 채팅창을 엽니다.
+def open_chat_window(username):
+    """
+    사용자 이름으로 검색해 채팅창을 엽니다. 검색 결과 목록에 이름이 정확히 일치하는 행이 나타날 때까지 기다려
+    그 행을 선택하고, 새로 포커스된 창의 제목이 사용자 이름과 일치하는지 확인합니다. 일치하는 행이 여러 개(동명이인)면 열지 않고 실패합니다.
+    Accessibility를 사용할 수 없으면 기존 방식(방향키+Enter)으로 엽니다.
+
+    Returns:
+        tuple: (성공 여부, 채팅창 AXNode 또는 None, 오류 메시지)
+    """
+    app = kakao_ax.kakao_app()
+    if app is None:
+        log.warning("Accessibility를 사용할 수 없어 검색 결과 확인 없이 채팅창을 엽니다.")
+        return _open_chat_blind(username)
+
+    # 1. 친구 탭으로 이동 후 검색창 열기 (검색창에 포커스가 갈 때까지 대기)
     try:
-        # 임시 디렉토리 생성 및 파일 복사
-        temp_dir = tempfile.mkdtemp(prefix="kakao_images_")
-        copied_paths = []
-        for p in image_paths:
-            dest = os.path.join(temp_dir, os.path.basename(p))
-            shutil.copy2(p, dest)
-            copied_paths.append(dest)
-        
-        # AppleScript로 multiple file aliases를 클립보드에 설정
-        alias_list = ', '.join([f'(POSIX file "{fp}" as alias)' for fp in copied_paths])
-        script = f'''
-        tell application "Finder"
-            set the clipboard to {{{alias_list}}}
-        end tell
-        '''
-        subprocess.run(['osascript', '-e', script], check=True)
-        time.sleep(SHORT_SLEEP)
-        return (True, temp_dir)
-    except Exception as e:
-        log.error(f"다중 이미지 클립보드 설정 실패: {e}", exc_info=True)
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+        # 캐시된 채팅창이 앞에 있을 수 있으므로 메인 창을 먼저 올리고 화면 상태 확인
+        _raise_main_window(app)
+        SEND_FLOW.expect(MAIN_WINDOW_STATES, via=CHAT_WINDOW)
+        UI_SESSION.ensure("friends_tab", lambda: SEND_FLOW.step(lambda: _press_cmd('1'), FRIENDS_TAB, via=MAIN_WINDOW_STATES),
+                          **FRIENDS_TAB_TARGET)
+    except UIStateError as e:
+        return False, None, str(e)
+    UI_SESSION.ensure("search_field", lambda: _open_search_field(app), **FRIENDS_TAB_TARGET, field=SEARCH_FIELD)
+
+    # 2. 사용자 이름 입력 후 정확히 일치하는 결과 행이 나타날 때까지 대기
+    find_rows = lambda: kakao_ax.find_rows_titled(kakao_ax.focused_window(app), username)
+    method = _type_search_text(username, confirm=find_rows) # 결과가 없으면 붙여넣기로 다시 검색
+    UI_SESSION.note(tab=SEARCH_RESULTS) # 다음 사용자는 친구 탭부터 다시 이동
+    rows = find_rows() if method is not None else []
+    if not rows:
+        INPUT.run("escape") # 검색 닫기
+        UI_SESSION.note(field=None)
+        return False, None, f"검색 결과에서 '{username}'과(와) 정확히 일치하는 항목을 찾지 못함"
+    if len(rows) > 1:
+        # 창 제목으로는 동명이인을 구분할 수 없으므로 아무 행이나 열지 않음 (색인의 AMBIGUOUS와 같은 처리)
+        INPUT.run("escape") # 검색 닫기
+        UI_SESSION.note(field=None)
+        log.error(f"'{username}'과(와) 일치하는 검색 결과가 {len(rows)}개라 받는 사람을 특정할 수 없습니다.")
+        return False, None, f"같은 이름의 친구가 {len(rows)}명 있어 받는 사람을 특정할 수 없음"
+    row = rows[0]
+
+    # 3. 행 선택 후 결과 목록으로 포커스를 옮겨 Enter로 열기 (검색창 포커스에서 누르면 선택 행이 아닌 첫 결과가 열릴 수 있음)
+    #    목록에 포커스를 줄 수 없거나 열리지 않으면 행 더블클릭
+    before = kakao_ax.windows(app) # 잘못 열린 창을 구분하기 위한 열기 전 창 목록
+    row.set("AXSelected", True)
+    window = None
+    results_list = row.node("AXParent")
+    if results_list is not None and results_list.set("AXFocused", True):
+        INPUT.run("enter")
+        window = ax_events.wait_until(lambda: kakao_ax.focused_window_titled(app, username), CHAT_OPEN_TIMEOUT / 2)
+    if window is None:
+        _close_unexpected_windows(app, before, username) # 잘못 열린 창이 행을 가리지 않도록 먼저 닫기
+        frame = row.frame()
+        if frame is not None:
+            log.warning(f"Enter로 채팅창이 열리지 않아 검색 결과 행을 더블클릭합니다: {frame}")
+            x, y, w, h = frame
+            INPUT.run(("double_click", x + w // 2, y + h // 2))
+            window = ax_events.wait_until(lambda: kakao_ax.focused_window_titled(app, username), CHAT_OPEN_TIMEOUT / 2)
+
+    # 4. 열린 창 제목 확인 (열렸지만 포커스가 없으면 앞으로 가져오기)
+    if window is None:
+        opened = kakao_ax.find_window(app, username)
+        if opened is not None:
+            opened.perform("AXRaise")
+            window = ax_events.wait_until(lambda: kakao_ax.focused_window_titled(app, username), SHORT_SLEEP * 5)
+        if window is None:
+            focused = kakao_ax.focused_window(app)
+            _close_unexpected_windows(app, before, username)
+            if opened is None:
+                return False, None, f"'{username}' 채팅창이 열리지 않음"
+            return False, None, f"채팅창 제목 불일치 (포커스된 창: '{focused.title if focused else None}')"
+    log.info(f"AX 확인으로 '{username}' 채팅창 열기 성공.")
+    UI_SESSION.note(window=window_key(window.title), field=MESSAGE_FIELD)
+    return True, window, None
+
+# 검색 결과를 여는 동안 잘못 열린 창을 닫습니다.
+def _close_unexpected_windows(app, before, username):
+    """열기 전에 없던 창 중 제목이 받는 사람과 다른 창(잘못 열린 채팅창)을 닫고 닫은 수를 반환합니다."""
+    wanted = kakao_ax.normalize_title(username)
+    closed = 0
+    for window in kakao_ax.windows(app):
+        if window in before or kakao_ax.normalize_title(window.title) == wanted:
+            continue
+        log.warning(f"'{username}' 대신 열린 창 '{window.title}'을(를) 닫습니다.")
+        if close_window(window):
+            closed += 1
+    if closed:
+        UI_SESSION.forget(WINDOW, FIELD) # 포커스가 옮겨감
+    return closed
+
+# 실행 계획 동작 하나를 수행합니다.
+def _run_plan_action(action):
+    """실행 계획 동작 하나(focus/clear/input/stage/paste/send)를 수행하고 지정된 시간만큼 대기합니다."""
+    if action.op == "focus":
+        if not focus_kakaotalk():
+            raise RuntimeError("KakaoTalk 활성화 실패")
+    elif action.op == "clear":
+        INPUT.run("select_all")
+        INPUT.run("delete")
+    elif action.op == "input":
+        if TEXT_INPUT.enter(action.value, confirm=_message_input_processed) is None:
+            raise RuntimeError("메시지 입력이 입력창에 반영되지 않음")
+    elif action.op == "stage":
+        kind, value = action.value
+        if not STAGED_CLIPBOARD.stage(kind, value):
+            log.debug(f"클립보드에 같은 페이로드({kind})가 이미 있어 기록 생략.")
+    elif action.op == "paste":
+        INPUT.run("paste")
+    elif action.op == "send":
+        INPUT.run("enter")
+    else:
+        raise ValueError(f"알 수 없는 계획 동작: {action.op}")
+    if action.wait:
+        time.sleep(action.wait)
+
+# 실행 계획 단계 하나를 수행합니다.
+def _execute_plan_step(step, staged_messages, settle=True):
+    """
+    실행 계획 단계 하나를 수행하고 성공 여부를 반환합니다.
+    동작이 실패하면 끝난 동작은 다시 하지 않고 실패한 동작부터 이어서 다시 수행합니다.
+    그래도 실패하면, 전송 동작 전에 멈춘 경우에만 해당 단계의 메시지를 기존 방식(메시지별 활성화/비우기/대체 전송 포함)으로
+    보냅니다. 전송 동작에서 실패한 경우 메시지가 이미 나갔을 수 있으므로 다시 보내지 않고 실패로 반환합니다.
+    """
+    done = 0 # 끝난 동작 수 (다시 시도할 때 이어서 시작할 위치)
+    for attempt in range(PLAN_STEP_ATTEMPTS):
+        try:
+            while done < len(step.actions):
+                _run_plan_action(step.actions[done])
+                done += 1
+            log.info(f"계획 단계 실행 완료: 메시지 {[i + 1 for i in step.indices]} ({step.type})")
+            return True
+        except Exception as e:
+            log.error(f"계획 단계 동작 '{step.actions[done].op}' 실패 ({done}/{len(step.actions)}개 완료, "
+                      f"시도 {attempt + 1}/{PLAN_STEP_ATTEMPTS}): {e}", exc_info=True)
+
+    if step.actions[done].op == "send":
+        log.error(f"메시지 {[i + 1 for i in step.indices]} 전송 동작에서 실패해 중복 전송을 피하려고 다시 보내지 않습니다.")
         return False
+    log.warning(f"메시지 {[i + 1 for i in step.indices]}을(를) 메시지별 전송으로 대체합니다.")
+    success = True
+    for idx in step.indices:
+        staged = staged_messages[idx]
+        if staged.type == "text":
+            sent = _send_text(staged.content, settle=settle)
+        else:
+            sent = _send_image(staged.content, os.path.basename(staged.content), settle=settle, staged=staged)
+        success = success and sent
+    return success
+
+# 검증 방식에 맞는 실행 계획 대기 시간을 반환합니다.
+def plan_timings(verification_mode):
+    """deferred면 전송 후 대기를 줄인 대기 시간, 그 외에는 None(기본 대기 시간)을 반환합니다."""
+    return DEFERRED_PLAN_TIMINGS if verification_mode == "deferred" else None
+
+# 메시지 그룹별 실행 계획과 예상 비용을 반환합니다 (드라이런, UI 조작 없음).
+def plan_messages(message_groups, verification_mode=VERIFICATION_MODE, batch_optimize=BATCH_OPTIMIZE):
+    """
+    메시지 그룹별 실행 계획과 예상 소요 시간을 반환합니다. 입력 검증만 수행하고 UI, 클립보드, 이미지 캐시는 건드리지 않습니다
+    (이미지는 준비하지 않고 원본 파일 목록으로 계획합니다).
+    verification_mode와 batch_optimize는 send_messages_via_kakao와 같은 의미로, 대기 시간과 처리 순서(order)에 반영합니다.
+    결과는 요청 순서대로 반환합니다. 알 수 없는 검증 방식이면 ValueError.
+    """
+    if verification_mode not in VERIFICATION_MODES:
+        raise ValueError(f"알 수 없는 검증 방식입니다: {verification_mode} (가능: {', '.join(VERIFICATION_MODES)})")
+    order = order_groups_by_payload(message_groups) if batch_optimize else list(range(len(message_groups)))
+    position = {index: rank + 1 for rank, index in enumerate(order)} # 요청 인덱스 -> 처리 순서
+    timings = plan_timings(verification_mode)
+    plans = []
+    for index, group in enumerate(message_groups):
+        prepared_group = prepare_group(group, None)
+        recipient = FRIEND_INDEX.resolve(group["username"])[0] # 색인 기준 받는 사람 확인 결과
+        if prepared_group.error:
+            plans.append({"username": group["username"], "order": position[index], "recipient": recipient,
+                          "error": prepared_group.error, "plan": [], "estimate": None})
+            continue
+        plan = compile_message_plan(prepared_group.messages, timings)
+        plans.append({"username": group["username"], "order": position[index], "recipient": recipient, "error": None,
+                      "plan": describe_plan(plan), "estimate": estimate_plan(plan)})
+    return plans
 
 # screencapture를 사용하여 KakaoTalk 창 내용을 캡처합니다.
 def capture_kakao_window(output_path):
@@ -459,39 +624,56 @@ def capture_kakao_window(output_path):
         log.error(f"KakaoTalk 창 캡처 실패: {e}", exc_info=True)
         return False
 
-# OCR을 사용하여 마지막으로 보낸 메시지의 상태를 확인합니다.
-def check_message_status(username, timestamp):
-    """OCR을 사용하여 마지막으로 보낸 메시지의 상태를 확인합니다."""
+# 마지막으로 보낸 메시지 확인용으로 포커스된 창을 캡처합니다 (UI 스레드).
+def capture_message_status_frame(username, timestamp):
+    """
+    마지막으로 보낸 메시지 확인용으로 포커스된 창을 캡처합니다 (UI 스레드).
+    성공 시 (capture_path, ""), 실패 시 (None, 오류 메시지)를 반환합니다.
+    """
     capture_filename = f"capture_{username}_{timestamp}.png"
     capture_path = DEBUG_DIR / capture_filename
 
     try:
         # 현재 포커스된 창의 위치 가져오기
-        try:
-            focused_window_list = Quartz.CGWindowListCopyWindowInfo(
-                Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListOptionOnScreenAboveWindow,
-                Quartz.kCGNullWindowID
-            )
-            for window in focused_window_list:
-                if window.get('kCGWindowLayer') == 0:
-                    bounds = window.get('kCGWindowBounds', {})
-                    x = int(bounds.get('X', 0))
-                    y = int(bounds.get('Y', 0))
-                    w = int(bounds.get('Width', 0))
-                    h = int(bounds.get('Height', 0))
-                    region = f"{x},{y},{w},{h}"
-                    subprocess.run(['screencapture', '-x', '-R', region, str(capture_path)], check=True, timeout=10)
-                    log.info(f"포커스된 창 캡처 완료: {capture_path}")
-                    break
-        except Exception as e:
-            log.error(f"포커스된 창 캡처 중 오류 발생: {e}", exc_info=True)
-            return False, f"포커스된 창 캡처 실패: {e}"
-
-        # 캡처된 이미지 확인
-        if not os.path.exists(capture_path) or os.path.getsize(capture_path) == 0:
-            log.error(f"캡처된 파일이 없거나 비어 있음: {capture_path}")
-            return False, "캡처된 파일이 없거나 비어 있음"
-
+        focused_window_list = Quartz.CGWindowListCopyWindowInfo(
+            Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListOptionOnScreenAboveWindow,
+            Quartz.kCGNullWindowID
+        )
+        for window in focused_window_list:
+            if window.get('kCGWindowLayer') == 0:
+                bounds = window.get('kCGWindowBounds', {})
+                x = int(bounds.get('X', 0))
+                y = int(bounds.get('Y', 0))
+                w = int(bounds.get('Width', 0))
+                h = int(bounds.get('Height', 0))
+                region = f"{x},{y},{w},{h}"
+                subprocess.run(['screencapture', '-x', '-R', region, str(capture_path)], check=True, timeout=10)
+                log.info(f"포커스된 창 캡처 완료: {capture_path}")
+                break
+    except subprocess.TimeoutExpired:
+        log.error("screencapture 중 시간 초과 발생.")
+        return None, "screencapture 중 시간 초과 발생"
+    except subprocess.CalledProcessError as e:
+        log.error(f"screencapture 명령어 실패: {e.stderr}")
+        return None, "screencapture 명령어 실패"
+    except Exception as e:
+        log.error(f"포커스된 창 캡처 중 오류 발생: {e}", exc_info=True)
+        return None, f"포커스된 창 캡처 실패: {e}"
+
+    # 캡처된 이미지 확인
+    if not os.path.exists(capture_path) or os.path.getsize(capture_path) == 0:
+        log.error(f"캡처된 파일이 없거나 비어 있음: {capture_path}")
+        return None, "캡처된 파일이 없거나 비어 있음"
+    return capture_path, ""
+
+# 캡처된 창 이미지에서 OCR로 메시지 전송 오류를 찾습니다 (워커 스레드에서 실행 가능).
+def analyze_message_status_frame(capture_path):
+    """
+    캡처된 창 이미지에서 OCR로 메시지 전송 오류를 찾습니다.
+    UI를 건드리지 않으므로 워커 스레드에서 실행할 수 있습니다.
+    (성공 여부, 오류 메시지)를 반환합니다.
+    """
+    try:
         img = cv2.imread(str(capture_path))
         if img is None:
             log.error(f"캡처된 이미지 로드 실패: {capture_path}")
@@ -507,39 +689,216 @@ def check_message_status(username, timestamp):
         preprocessed_img = gray_img
 
         # 디버깅을 위해 전처리된 이미지 저장
-        preprocessed_path = DEBUG_DIR / f"preprocessed_{capture_filename}"
+        preprocessed_path = DEBUG_DIR / f"preprocessed_{os.path.basename(str(capture_path))}"
         cv2.imwrite(str(preprocessed_path), preprocessed_img)
         log.debug(f"OCR용 전처리 이미지 저장됨: {preprocessed_path}")
 
         # OCR 수행
         custom_config = r'--oem 3 --psm 6 -l kor+eng'
-        ocr_text = pytesseract.image_to_string(preprocessed_img, config=custom_config)
+        ocr_text = vision_workers.image_to_string(preprocessed_img, config=custom_config) # 비전 워커 프로세스에서 실행
         log.debug(f"OCR 결과 (하단 영역): '{ocr_text.strip()}'")
 
-        # 오류 패턴 확인
-        for pattern in OCR_ERROR_PATTERNS:
-            if pattern in ocr_text:
-                error_msg = f"잠재적 메시지 전송 오류 감지: OCR 텍스트에서 '{pattern}' 발견."
-                log.error(error_msg)
-                return False, error_msg
+        # 오류 패턴 확인 (모든 패턴을 한 번에, 오인식 문자 허용)
+        match = OCR_ERROR_MATCHER.best(ocr_text)
+        if match is not None and match.confidence >= OCR_ERROR_MATCHER.min_confidence:
+            error_msg = f"잠재적 메시지 전송 오류 감지: OCR 텍스트에서 '{match.pattern}' 발견 (신뢰도={match.confidence:.2f})."
+            log.error(error_msg)
+            return False, error_msg
 
         # 오류 패턴이 없으면 성공으로 간주
         log.info("OCR 텍스트에서 명시적인 오류 패턴을 찾지 못했습니다. 성공으로 간주합니다.")
         return True, ""
 
-    except subprocess.TimeoutExpired:
-        log.error("screencapture 중 시간 초과 발생.")
-        return False, "screencapture 중 시간 초과 발생"
-    except subprocess.CalledProcessError as e:
-        log.error(f"screencapture 명령어 실패: {e.stderr}")
-        return False, "screencapture 명령어 실패"
     except Exception as e:
         log.error(f"메시지 상태 확인 중 오류 발생 (OCR): {e}", exc_info=True)
         return False, f"OCR 처리 오류: {e}"
 
+# 대화 하단 캡처 한 장으로 보낸 메시지 전체의 전송 상태를 확인합니다 (워커 스레드에서 실행 가능).
+def analyze_conversation_tail(capture_path, sent_messages):
+    """
+    대화 하단 캡처 한 장으로 보낸 메시지 전체의 전송 상태를 한 번에 확인합니다.
+    말풍선 수/종류, 실패 표시를 감지하고 OCR로 오류 문구를 찾습니다.
+    여러 이미지를 한 번에 붙여넣은 전송 단위는 말풍선 하나로 간주하고, 판정 결과를 묶인 메시지 모두에 적용합니다.
+
+    Args:
+        capture_path: 캡처 이미지 경로
+        sent_messages (list): 보낸 순서대로의 (메시지 인덱스 목록, 메시지 타입, 전송 성공 여부) 전송 단위 목록
+
+    Returns:
+        tuple: (성공 여부, 오류 메시지, 메시지별 상태 목록)
+    """
+    try:
+        img = cv2.imread(str(capture_path))
+        if img is None:
+            log.error(f"캡처된 이미지 로드 실패: {capture_path}")
+            return False, "캡처된 이미지 로드 실패", []
+
+        area = chat_verifier.crop_conversation_area(img)
+        bubbles = chat_verifier.detect_bubbles(area)
+        delivered = [(indices, msg_type) for indices, msg_type, sent_ok in sent_messages if sent_ok]
+        matched = chat_verifier.match_message_sequence(bubbles, [msg_type for _, msg_type in delivered])
+        # 원래 메시지 인덱스로 변환 (묶어 보낸 메시지는 같은 판정)
+        statuses = [dict(status, index=msg_index)
+                    for status, (indices, _) in zip(matched, delivered) for msg_index in indices]
+        # 전송 단계에서 이미 실패한 메시지 포함
+        statuses += [{"index": msg_index, "type": msg_type, "status": "failed", "reason": "전송 함수 실패"}
+                     for indices, msg_type, sent_ok in sent_messages if not sent_ok for msg_index in indices]
+        statuses.sort(key=lambda status: status["index"])
+
+        # 오류 문구 확인 (대화 영역 전체를 한 번만 OCR)
+        gray_img = cv2.cvtColor(area, cv2.COLOR_BGR2GRAY)
+        custom_config = r'--oem 3 --psm 6 -l kor+eng'
+        ocr_text = vision_workers.image_to_string(gray_img, config=custom_config)
+        match = OCR_ERROR_MATCHER.best(ocr_text)
+        if match is not None and match.confidence >= OCR_ERROR_MATCHER.min_confidence:
+            error_msg = f"대화 하단에서 오류 문구 '{match.pattern}' 감지 (신뢰도={match.confidence:.2f})."
+            log.error(error_msg)
+            return False, error_msg, statuses
+
+        failed = [s for s in statuses if s["status"] != "delivered"]
+        if failed:
+            error_msg = ", ".join(f"메시지 #{s['index'] + 1} {s['status']}" for s in failed)
+            log.error(f"대화 검증 실패: {error_msg}")
+            return False, error_msg, statuses
+
+        log.info(f"대화 검증 성공: 메시지 {len(statuses)}건 모두 전송 확인.")
+        return True, "", statuses
+
+    except Exception as e:
+        log.error(f"대화 검증 중 오류 발생: {e}", exc_info=True)
+        return False, f"대화 검증 처리 오류: {e}", []
+
+# OCR을 사용하여 마지막으로 보낸 메시지의 상태를 확인합니다.
+def check_message_status(username, timestamp):
+    """OCR을 사용하여 마지막으로 보낸 메시지의 상태를 확인합니다 (캡처 + 인식을 동기 실행)."""
+    capture_path, capture_error = capture_message_status_frame(username, timestamp)
+    if capture_path is None:
+        return False, capture_error
+    return analyze_message_status_frame(capture_path)
+
+# 검증 결과를 사용자 결과에 반영합니다.
+def _apply_verification(entry, outcome, messages):
+    """
+    검증 결과를 사용자 결과에 반영합니다.
+    outcome이 (성공 여부, 오류) 2-튜플이면 첫 메시지 검증, 3-튜플이면 대화 끝 일괄 검증 결과입니다.
+    첫 메시지 검증의 messages는 판정이 나올 때까지 보내지 않고 보류한 나머지 메시지이며, 실패하면 보내지 않은 채
+    retry_messages로 기록합니다 (다시 보내도 중복되지 않음).
+    일괄 검증은 모두 보낸 뒤이므로, 메시지별 판정을 얻지 못하면 전달 여부를 모르는 메시지를 unverified_messages로 기록합니다
+    (이미 전달되었을 수 있어 재전송 대상이 아님). 메시지별 판정이 있으면 message_results로 충분하므로 따로 기록하지 않습니다.
+    """
+    status_ok, check_error = outcome[0], outcome[1]
+    if status_ok:
+        if len(outcome) > 2:
+            entry["message_results"] = outcome[2]
+        log.info(f"{entry['username']}: {'대화 검증' if len(outcome) > 2 else '첫 메시지 상태 확인'} 성공.")
+        return
+    entry["status"] = "fail"
+    if len(outcome) > 2: # 대화 끝 일괄 검증
+        entry["message_results"] = outcome[2]
+        unverified = [] if outcome[2] else [m for m in messages if m.get("content")] # 메시지별 판정 불가 시 전체 미확인
+        entry["reason"] = f"대화 검증 실패: {check_error}"
+        if unverified:
+            entry["unverified_messages"] = unverified
+        log.error(f"{entry['username']}: 대화 검증 실패로 실패 처리. 전달 미확인 메시지 {len(unverified)}건. 사유: {check_error}")
+    else: # 첫 메시지 검증: 보류한 나머지 메시지는 보내지 않고 재전송 대기열로
+        entry["reason"] = f"첫 메시지 상태 확인 실패: {check_error}"
+        if messages:
+            entry["retry_messages"] = list(messages)
+        log.error(f"{entry['username']}: 첫 메시지 상태 확인 실패로 실패 처리. 보내지 않은 메시지 {len(messages)}건. "
+                  f"사유: {check_error}")
+
+# 백그라운드 OCR 확인 결과를 사용자별 결과에 반영합니다.
+def _apply_verification_results(verified, results, group_messages, deferred=False, held=None):
+    """
+    백그라운드 OCR 확인 결과를 제출 순서대로 사용자별 결과에 반영합니다.
+    첫 메시지가 확인된 사용자는 보류해 둔 나머지 전송 단계(held)를 이어서 보냅니다.
+    """
+    for result_index, outcome, error in verified:
+        if error is not None:
+            outcome = (False, f"OCR 처리 오류: {error}") + (([],) if deferred else ())
+        _apply_verification(results[result_index], outcome, group_messages.get(result_index, []))
+        pending = held.pop(result_index, None) if held is not None else None
+        if pending is not None and results[result_index]["status"] == "success":
+            _resume_held_steps(results[result_index], pending)
+
+# 전송 단계들에 포함된 원래 메시지 목록을 반환합니다.
+def _step_messages(messages, steps):
+    """전송 단계들이 보내는 메시지(요청의 원래 메시지 딕셔너리)를 순서대로 반환합니다."""
+    return [messages[idx] for step in steps for idx in step.indices]
+
+# 사용자 채팅창을 다음 사용자 처리 전에 정리합니다.
+def _release_chat_window(username, chat_window):
+    """AX 참조가 있으면 채팅창 캐시에 넣어 열어 두고 (한도 초과 시 가장 오래된 창을 닫음), 없으면 바로 닫습니다."""
+    if chat_window is not None and CHAT_WINDOWS.enabled:
+        CHAT_WINDOWS.put(username, chat_window)
+        return
+    try:
+        log.info(f"{username}: 채팅창 닫기 시도.")
+        focus_kakaotalk()
+        INPUT.run("close")
+        time.sleep(MEDIUM_SLEEP)
+    except Exception as close_e:
+        log.warning(f"창 닫기 실패: {close_e}")
+
+# 첫 메시지 확인을 기다리며 보류한 나머지 전송 단계를 보냅니다.
+def _resume_held_steps(entry, held):
+    """
+    첫 메시지가 확인된 사용자의 채팅창을 다시 열어 보류한 전송 단계를 보냅니다.
+    채팅창을 열지 못하거나 오류로 멈추면 실패 처리하고, 보내지 못한 단계의 메시지는 retry_messages로 기록합니다.
+    전송 동작이 실패한 단계도 (이전과 같이 사용자 상태는 바꾸지 않고) retry_messages에 기록합니다.
+    """
+    username = entry["username"]
+    log.info(f"{username}: 첫 메시지 확인됨, 보류한 전송 단계 {len(held.steps)}개 이어서 전송.")
+    failed, position = [], 0 # 전송에 실패한 단계, 다음에 보낼 단계 위치
+    try:
+        app = kakao_ax.kakao_app() if CHAT_WINDOWS.enabled else None
+        chat_window = CHAT_WINDOWS.activate(app, username) if app is not None else None
+        if chat_window is not None:
+            UI_SESSION.note(frontmost=True, window=window_key(chat_window.title), field=MESSAGE_FIELD)
+            opened, open_error = True, None
+        else:
+            opened, chat_window, open_error = open_chat_window(username)
+        if not opened:
+            entry["status"] = "fail"
+            entry["reason"] = f"나머지 메시지 전송을 위한 채팅창 열기 실패: {open_error}"
+            log.error(f"{username}: {entry['reason']}")
+        else:
+            for position, step in enumerate(held.steps):
+                if not _execute_plan_step(step, held.staged):
+                    log.warning(f"{username}에게 메시지 {[i + 1 for i in step.indices]} ({step.type}) 전송 실패.")
+                    failed.append(step)
+            position = len(held.steps)
+            _release_chat_window(username, chat_window)
+    except Exception as e:
+        log.error(f"{username}: 보류한 전송 단계 처리 중 오류: {e}", exc_info=True)
+        entry["status"] = "fail"
+        entry["reason"] = f"나머지 메시지 전송 중 오류: {e}"
+    retry = _step_messages(held.originals, failed + list(held.steps[position:]))
+    if retry:
+        entry["retry_messages"] = retry
+
 # 지정된 사용자에게 KakaoTalk을 통해 메시지를 보냅니다.
-def send_messages_via_kakao(message_groups):
-    """지정된 사용자에게 KakaoTalk을 통해 메시지를 보냅니다."""
+def send_messages_via_kakao(message_groups, pipeline_verification=PIPELINE_VERIFICATION,
+                            verification_mode=VERIFICATION_MODE, batch_optimize=BATCH_OPTIMIZE):
+    """
+    지정된 사용자에게 KakaoTalk을 통해 메시지를 보냅니다.
+
+    Args:
+        message_groups (list): [{"username": 이름, "messages": [{"type", "content"}, ...]}, ...]
+        pipeline_verification (bool): True면 첫 메시지 캡처 후 OCR을 워커에 넘기고 나머지 메시지는 보류한 채 바로 다음
+            사용자로 진행합니다. 판정이 나오면 확인된 사용자에게만 보류한 메시지를 이어서 보내고, 실패한 사용자의
+            보류 메시지는 보내지 않고 retry_messages로 기록합니다.
+        verification_mode (str): "first"면 첫 메시지만 전송 직후 확인합니다.
+            "deferred"면 중간 대기 없이 모두 보낸 뒤 대화 하단 캡처 한 장으로 메시지별 상태를 확인해
+            결과에 message_results로 기록합니다. 그 외 값이면 아무것도 보내지 않고 ValueError를 발생시킵니다.
+        batch_optimize (bool): True면 같은 메시지 묶음을 보내는 사용자끼리 연속으로 처리해
+            준비된 페이로드와 클립보드 내용을 재사용합니다. 결과는 요청 순서대로 반환합니다.
+
+    Returns:
+        list: 사용자별 결과 딕셔너리 리스트
+    """
+    if verification_mode not in VERIFICATION_MODES:
+        raise ValueError(f"알 수 없는 검증 방식입니다: {verification_mode} (가능: {', '.join(VERIFICATION_MODES)})")
     clear_debug_dir() # 디버그 디렉토리 초기화
     results = [] # 결과 저장 리스트
     # 초기 KakaoTalk 활성화 확인
@@ -551,180 +910,251 @@ def send_messages_via_kakao(message_groups):
         return results
     time.sleep(MEDIUM_SLEEP)
 
-    for group in message_groups:
-        username = group["username"]
-        messages = group["messages"]
-        group_status = "pending" # 그룹 상태: pending, success, fail, skip
-        error_reason = None # 오류 사유
-        first_message_success = False # 첫 메시지 전송 및 확인 성공 여부 추적
+    # 받는 사람을 검색 없이 확인하기 위한 친구 목록 색인 준비
+    ax_events.ensure_observer() # 창 알림 구독 (대기 코드가 폴링 대신 알림으로 진행)
+    UI_SESSION.verify() # 세션이 알고 있는 UI 상태를 실제 상태로 맞춘 뒤 시작
+    refresh_friend_index()
+
+    # 같은 페이로드를 보내는 사용자끼리 연속되도록 처리 순서 조정
+    order = list(range(len(message_groups)))
+    if batch_optimize:
+        order = order_groups_by_payload(message_groups)
+        message_groups = [message_groups[index] for index in order]
+        log.info(f"페이로드 재사용을 위해 처리 순서 조정: 사용자 {len(order)}명, "
+                 f"서로 다른 페이로드 {len({payload_signature(group) for group in message_groups})}종")
+
+    # 비동기 검증 단계 (UI 스레드는 캡처만, OCR은 워커에서)
+    deferred = verification_mode == "deferred"
+    analyze = analyze_conversation_tail if deferred else analyze_message_status_frame
+    pipeline = OcrPipeline(analyze, name="verify") if pipeline_verification else None
+    group_messages = {} # 결과 인덱스 -> 검증 대기 중인 사용자의 메시지 목록 (첫 메시지 검증은 보류한 나머지 메시지)
+    held = {} # 결과 인덱스 -> 첫 메시지 판정이 나올 때까지 보류한 나머지 전송 단계 (HeldSteps)
+    # 다음 사용자들의 입력 검증/이미지 준비/클립보드 페이로드를 워커에서 미리 수행
+    prefetcher = PayloadPrefetcher(message_groups, IMAGE_CACHE, lookahead=PREFETCH_LOOKAHEAD)
 
-        log.info(f"--- 사용자 처리 시작: {username} ---")
-
-        try:
-            # 1. 채팅 탭으로 이동 및 사용자 검색
-            # 채팅 탭 활성화 확인 (Cmd+2가 종종 작동하지만, 먼저 친구 탭 Cmd+1이 필요할 수 있음)
-            keyboard.press(Key.cmd)
-            keyboard.press('1')
-            keyboard.release('1')
-            keyboard.release(Key.cmd)
-            time.sleep(MEDIUM_SLEEP)
-            # 검색이 전역이 아니라면 Cmd+F 또는 검색 아이콘 클릭 필요할 수 있음
-            keyboard.press(Key.cmd)
-            keyboard.press('f')
-            keyboard.release('f')
-            keyboard.release(Key.cmd)
-            time.sleep(MEDIUM_SLEEP)
-
-            # 사용자 이름 복사 및 붙여넣기
-            pyperclip.copy(username)
-            time.sleep(SHORT_SLEEP)
-            pyautogui.keyDown('command')
-            pyautogui.press(PASTE_SHORTCUT)
-            pyautogui.keyUp('command')
-            time.sleep(LONG_SLEEP) # 검색 결과 대기
-            
-
-            # 첫 번째 결과 선택 (올바른 사용자/채팅이라고 가정)
-            # 이 부분은 불안정하며 안정성을 위해 이미지 인식 필요할 수 있음
-            pyautogui.press('down', presses=2, interval=SHORT_SLEEP) # 결과로 아래로 이동
-            time.sleep(SHORT_SLEEP)
-            pyautogui.press('enter') # 선택
-            time.sleep(LONG_SLEEP) # 채팅 창 열기/활성화 대기
-
-            log.info(f"사용자 {username} 채팅창 열기 성공.") # 채팅창 열기 성공 로그 추가
-
-            timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S') # 타임스탬프 생성
-
-            # 보낼 메시지가 없는 경우
+    try:
+        for group, prepared_group in prefetcher:
+            username = group["username"]
+            messages = group["messages"]
+            group_status = "pending" # 그룹 상태: pending, success, fail, skip
+            error_reason = None # 오류 사유
+            first_message_success = False # 첫 메시지 전송 및 확인 성공 여부 추적
+            verification_pending = False # OCR 확인이 워커에서 진행 중인지 여부
+            sent_messages = [] # 일괄 검증용 (메시지 인덱스 목록, 타입, 전송 성공 여부) 전송 단위 목록
+            deferred_outcome = None # 일괄 검증 동기 실행 결과
+            chat_opened = False # 채팅창이 열렸는지 여부 (열린 경우에만 닫기)
+            chat_window = None # 열린 채팅창 AXNode (AX 사용 불가 시 None)
+            unsent = [] # 첫 메시지 실패로 보내지 않은 나머지 메시지 (재전송 대기)
+            held_steps = None # 첫 메시지 판정을 기다리며 보류한 나머지 전송 단계
+
+            # 이전 사용자들의 완료된 백그라운드 확인 결과 반영 (확인된 사용자는 보류한 메시지를 이어서 전송)
+            if pipeline is not None:
+                _apply_verification_results(pipeline.collect_ready(), results, group_messages, deferred, held)
+
+            log.info(f"--- 사용자 처리 시작: {username} ---")
+
+            # 잘못된 입력은 채팅창을 열기 전에 실패 처리
             if not messages:
                 log.warning(f"사용자 {username}에게 보낼 메시지가 없습니다. 건너뜁니다.")
-                group_status = "skip"
-                error_reason = "제공된 메시지 없음"
-                # 채팅 창 닫기 (열렸다고 가정)
-                pyautogui.hotkey('command', 'w')
-                time.sleep(MEDIUM_SLEEP)
-                continue # 다음 사용자로 건너뛰기
-
-            log.info(f"사용자 {username} 메시지 전송 루프 시작.") # 루프 시작 로그 추가
-            # --- 메시지 전송 ---
-            for idx, msg in enumerate(messages):
-                msg_type = msg.get("type", "unknown") # 메시지 타입 가져오기
-                content = msg.get("content", "") # 메시지 내용 가져오기
-                send_success = False # 전송 성공 여부 플래그
-
-                # 내용이 비어 있으면 건너뛰기
-                if not content:
-                    log.warning(f"{username}의 메시지 #{idx+1} ({msg_type}) 내용이 비어 있습니다. 메시지를 건너뛰습니다.")
-                    continue
+                results.append({"username": username, "status": "skip", "reason": "제공된 메시지 없음"})
+                continue
+            if prepared_group.error:
+                log.error(f"사용자 {username} 입력 오류로 전송하지 않습니다: {prepared_group.error}")
+                results.append({"username": username, "status": "fail", "reason": f"입력 오류: {prepared_group.error}"})
+                continue
+            resolution, matches = FRIEND_INDEX.resolve(username)
+            if resolution == MISSING:
+                # 친구 목록을 모두 읽은 색인에 없음: 검색/채팅창 열기 없이 바로 실패 (일부만 읽었으면 UNKNOWN으로 검색)
+                log.error(f"사용자 {username}이(가) 친구 목록에 없어 전송하지 않습니다.")
+                results.append({"username": username, "status": "fail", "reason": "친구 목록에 없는 사용자"})
+                continue
+            if resolution == AMBIGUOUS:
+                log.error(f"사용자 {username}과(와) 같은 이름의 친구가 {len(matches)}명 있어 전송하지 않습니다.")
+                results.append({"username": username, "status": "fail",
+                                "reason": f"같은 이름의 친구가 {len(matches)}명 있어 받는 사람을 특정할 수 없음"})
+                continue
+
+            # 실행 계획 컴파일 (중복 활성화/비우기 제거, 연속 이미지 합치기)
+            plan = compile_message_plan(prepared_group.messages, plan_timings(verification_mode))
+            if not plan:
+                log.error(f"사용자 {username}: 전송할 내용이 있는 메시지가 없습니다.")
+                results.append({"username": username, "status": "fail", "reason": "전송할 내용이 있는 메시지 없음"})
+                continue
+            estimate = estimate_plan(plan)
+            log.info(f"사용자 {username} 실행 계획: {estimate['steps']}단계 {estimate['actions']}동작, "
+                     f"예상 {estimate['total_seconds']:.1f}초")
 
-                log.info(f"{username}에게 메시지 #{idx+1} ({msg_type}) 전송 시도...") # 전송 시도 로그 추가
-
-                # 메시지 타입에 따라 전송 함수 호출
-                if msg_type == "text":
-                    send_success = _send_text(content)
-                elif msg_type == "image":
-                    # content는 이제 절대 경로여야 함
-                    abs_path = content # os.path.abspath 제거
-                    # 전송 전 경로 유효성 검사 (문자열이고 절대 경로인지)
-                    if not isinstance(abs_path, str) or not os.path.isabs(abs_path):
-                         log.error(f"잘못된 절대 이미지 경로 수신: {abs_path}. 메시지 건너뜁니다.")
-                         continue # 이 메시지 건너뛰기
-                    filename = os.path.basename(abs_path) # 파일 이름 추출
-                    send_success = _send_image(abs_path, filename)
+            try:
+                # 1. 열어 둔 채팅창이 있으면 검색 없이 재사용, 없으면 검색 후 열기 (검색 결과/창 제목을 AX 트리로 확인)
+                app = kakao_ax.kakao_app() if CHAT_WINDOWS.enabled else None
+                chat_window = CHAT_WINDOWS.activate(app, username) if app is not None else None
+                if chat_window is not None:
+                    chat_opened = True
+                    UI_SESSION.note(frontmost=True, window=window_key(chat_window.title), field=MESSAGE_FIELD)
                 else:
-                    # 지원되지 않는 타입이면 경고 로그 남기고 건너뛰기
-                    log.warning(f"메시지 #{idx+1}의 지원되지 않는 메시지 타입 '{msg_type}'. 건너뜁니다.")
-                    continue # 이 특정 메시지 건너뛰기
-
-                log.info(f"{username} 메시지 #{idx+1} ({msg_type}) 전송 결과: {send_success}") # 전송 결과 로그 추가
+                    chat_opened, chat_window, open_error = open_chat_window(username)
+                if not chat_opened:
+                    group_status = "fail"
+                    error_reason = f"채팅창 열기 실패: {open_error}"
+                    log.error(f"사용자 {username} {error_reason}")
+                    continue
 
-                # --- 첫 메시지 상태 확인 ---
-                if idx == 0: # 첫 번째 메시지인 경우
-                    if not send_success: # 전송 실패 시
-                        error_reason = f"첫 메시지 ({msg_type}) 전송 실패."
-                        log.error(error_reason)
+                log.info(f"사용자 {username} 채팅창 열기 성공.") # 채팅창 열기 성공 로그 추가
+
+                timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S') # 타임스탬프 생성
+
+                log.info(f"사용자 {username} 메시지 전송 루프 시작.") # 루프 시작 로그 추가
+                # --- 메시지 전송 ---
+                for step_no, step in enumerate(plan):
+                    numbers = [i + 1 for i in step.indices]
+                    log.info(f"{username}에게 메시지 {numbers} ({step.type}) 전송 시도...") # 전송 시도 로그 추가
+                    send_success = _execute_plan_step(step, prepared_group.messages, settle=not deferred)
+                    log.info(f"{username} 메시지 {numbers} ({step.type}) 전송 결과: {send_success}") # 전송 결과 로그 추가
+
+                    # --- 일괄 검증 모드: 중간 확인 없이 계속 전송 ---
+                    if deferred:
+                        sent_messages.append((step.indices, step.type, send_success))
+                        if not send_success:
+                            log.warning(f"{username}에게 메시지 {numbers} ({step.type}) 전송 실패. 계속 진행합니다...")
+                        continue
+
+                    # --- 첫 메시지 상태 확인 ---
+                    if step_no == 0: # 첫 번째 전송 단위인 경우
+                        if not send_success: # 전송 실패 시
+                            error_reason = f"첫 메시지 ({step.type}) 전송 실패."
+                            log.error(error_reason)
+                            group_status = "fail"
+                            log.info(f"{username}: 첫 메시지 전송 실패, 루프 중단.") # 루프 중단 로그 추가
+                            unsent = _step_messages(messages, plan[1:])
+                            break # 이 사용자에 대한 나머지 메시지 전송 중단
+
+                        # 지연 후 OCR을 통한 상태 확인
+                        time.sleep(EXTRA_LONG_SLEEP) # 메시지 표시 및 상태 업데이트 가능성 대기
+                        if pipeline is not None:
+                            # UI 스레드에서는 캡처만 하고 OCR은 워커에 넘긴 뒤 바로 진행
+                            capture_path, capture_error = capture_message_status_frame(username, timestamp)
+                            if capture_path is None:
+                                error_reason = f"첫 메시지 상태 확인 실패: {capture_error}"
+                                log.error(error_reason)
+                                group_status = "fail"
+                                log.info(f"{username}: 첫 메시지 캡처 실패, 루프 중단.")
+                                unsent = _step_messages(messages, plan[1:])
+                                break
+                            pipeline.submit(len(results), capture_path) # 이 사용자의 결과가 기록될 인덱스
+                            verification_pending = True
+                            first_message_success = True # 잠정 성공, 최종 판정은 OCR 결과 반영 시
+                            if len(plan) > 1:
+                                # 나머지 메시지는 첫 메시지 판정이 나올 때까지 보류하고 그동안 다음 사용자로 진행
+                                held_steps = HeldSteps(plan[1:], prepared_group.messages, messages)
+                            log.info(f"{username}: 첫 메시지 캡처 완료, 상태 확인(OCR)은 백그라운드에서 진행"
+                                     f"{f' (나머지 전송 단계 {len(plan) - 1}개 보류)' if held_steps else ''}.")
+                            break
+
+                        log.info(f"{username}: 첫 메시지 상태 확인(OCR) 시작...") # OCR 시작 로그 추가
+                        status_ok, check_error = check_message_status(username, timestamp)
+                        log.info(f"{username}: 첫 메시지 상태 확인(OCR) 결과: status_ok={status_ok}, check_error='{check_error}'") # OCR 결과 로그 추가
+                        if not status_ok: # 상태 확인 실패 시
+                            error_reason = f"첫 메시지 상태 확인 실패: {check_error}"
+                            log.error(error_reason)
+                            group_status = "fail"
+                            log.info(f"{username}: 첫 메시지 OCR 실패, 루프 중단.") # 루프 중단 로그 추가
+                            unsent = _step_messages(messages, plan[1:])
+                            break # 이 사용자에 대한 나머지 메시지 전송 중단
+                        else: # 상태 확인 성공 시
+                            log.info(f"{username}: 첫 메시지 전송 및 상태 확인 성공.")
+                            first_message_success = True
+                    else: # 두 번째 이후 전송 단위인 경우
+                        # 실패 시 로그 남기고 계속 진행 (선택 사항)
+                        if not send_success:
+                            log.warning(f"{username}에게 메시지 {numbers} ({step.type}) 전송 실패. 계속 진행합니다...")
+                # --- 메시지 루프 종료 ---
+                log.info(f"사용자 {username} 메시지 전송 루프 종료.") # 루프 종료 로그 추가
+
+                # --- 일괄 검증: 대화 하단 캡처 한 장으로 전체 메시지 확인 ---
+                if deferred and group_status == "pending":
+                    if not any(sent_ok for _, _, sent_ok in sent_messages):
                         group_status = "fail"
-                        log.info(f"{username}: 첫 메시지 전송 실패, 루프 중단.") # 루프 중단 로그 추가
-                        break # 이 사용자에 대한 나머지 메시지 전송 중단
-
-                    # 지연 후 OCR을 통한 상태 확인
-                    time.sleep(EXTRA_LONG_SLEEP) # 메시지 표시 및 상태 업데이트 가능성 대기
-                    log.info(f"{username}: 첫 메시지 상태 확인(OCR) 시작...") # OCR 시작 로그 추가
-                    status_ok, check_error = check_message_status(username, timestamp)
-                    log.info(f"{username}: 첫 메시지 상태 확인(OCR) 결과: status_ok={status_ok}, check_error='{check_error}'") # OCR 결과 로그 추가
-                    if not status_ok: # 상태 확인 실패 시
-                        error_reason = f"첫 메시지 상태 확인 실패: {check_error}"
-                        log.error(error_reason)
+                        error_reason = "전송에 성공한 메시지 없음"
+                    else:
+                        time.sleep(EXTRA_LONG_SLEEP) # 마지막 메시지 표시 및 상태 업데이트 대기
+                        capture_path, capture_error = capture_message_status_frame(username, timestamp)
+                        if capture_path is None:
+                            group_status = "fail"
+                            error_reason = f"대화 검증 실패: {capture_error}"
+                        elif pipeline is not None:
+                            pipeline.submit(len(results), capture_path, sent_messages)
+                            verification_pending = True
+                            group_status = "success" # 잠정 성공, 최종 판정은 검증 결과 반영 시
+                            log.info(f"{username}: 대화 캡처 완료, 일괄 검증은 백그라운드에서 진행.")
+                        else:
+                            deferred_outcome = analyze_conversation_tail(capture_path, sent_messages)
+                            group_status = "success"
+
+                # 아직 fail/skip으로 설정되지 않은 경우 최종 그룹 상태 결정
+                if group_status == "pending":
+                    if first_message_success: # 첫 메시지 성공 시
+                        group_status = "success"
+                        log.info(f"{username}에게 메시지 전송 성공 (첫 메시지 확인됨).")
+                    else: # 첫 메시지 성공 확인 안 된 경우 (이론상 도달하기 어려움)
                         group_status = "fail"
-                        log.info(f"{username}: 첫 메시지 OCR 실패, 루프 중단.") # 루프 중단 로그 추가
-                        break # 이 사용자에 대한 나머지 메시지 전송 중단
-                    else: # 상태 확인 성공 시
-                        log.info(f"{username}: 첫 메시지 전송 및 상태 확인 성공.")
-                        first_message_success = True
-                else: # 두 번째 이후 메시지인 경우
-                    # 실패 시 로그 남기고 계속 진행 (선택 사항)
-                    if not send_success:
-                        log.warning(f"{username}에게 메시지 #{idx+1} ({msg_type}) 전송 실패. 계속 진행합니다...")
-                        # 필요하다면 이 특정 실패 기록 가능
-            # --- 메시지 루프 종료 ---
-            log.info(f"사용자 {username} 메시지 전송 루프 종료.") # 루프 종료 로그 추가
-
-            # 아직 fail/skip으로 설정되지 않은 경우 최종 그룹 상태 결정
-            if group_status == "pending":
-                if first_message_success: # 첫 메시지 성공 시
-                    group_status = "success"
-                    log.info(f"{username}에게 메시지 전송 성공 (첫 메시지 확인됨).")
-                else: # 첫 메시지 성공 확인 안 된 경우 (이론상 도달하기 어려움)
-                    group_status = "fail"
-                    error_reason = error_reason or "특정 오류는 포착되지 않았지만 첫 메시지가 성공적으로 확인되지 않음."
-                    log.error(f"{username}을(를) 실패로 표시. 사유: {error_reason}")
-
-            # 다음 사용자 처리 전 채팅 창 닫기 (finally 블록으로 이동 고려)
-            # log.info(f"{username}: try 블록 끝, 창 닫기 시도.") # 창 닫기 시도 로그 추가
-            # keyboard.press(Key.cmd)
-            # keyboard.press('w')
-            # keyboard.release('w')
-            # keyboard.release(Key.cmd)
-            # time.sleep(MEDIUM_SLEEP)
-
-        except Exception as e:  # 예기치 않은 오류 발생 시
-            log.error(f"사용자 {username} 처리 중 예상치 못한 오류 발생: {e}", exc_info=True)
-            group_status = "fail"
-            error_reason = f"처리되지 않은 예외: {e}"
-            # 오류 발생 시 잠재적으로 열려 있는 창 닫기 시도
-            try:
-                log.warning(f"{username}: 예외 발생, 창 닫기 시도 (except 블록).") # except 블록 창 닫기 로그
-                focus_kakaotalk()  # 닫기 명령 보내기 전 KakaoTalk 활성화 확인
-                keyboard.press(Key.cmd)
-                keyboard.press('w')
-                keyboard.release('w')
-                keyboard.release(Key.cmd)
-                time.sleep(MEDIUM_SLEEP)
-            except Exception as close_e:
-                log.warning(f"창 닫기 실패 (except 블록): {close_e}")
-
-        finally: # 항상 실행
-            log.info(f"{username}: finally 블록 시작.") # finally 시작 로그
-            # 현재 사용자에 대한 결과 기록
-            results.append({
-                "username": username,
-                "status": group_status,
-                "reason": error_reason if error_reason else "" # 오류 사유가 있으면 기록
-            })
-            # finally 블록에서 창 닫기 (중복 닫기 방지 위해 try 끝부분 주석 처리)
-            try:
-                log.info(f"{username}: finally 블록, 창 닫기 시도.") # finally 블록 창 닫기 로그
-                focus_kakaotalk()
-                keyboard.press(Key.cmd)
-                keyboard.press('w')
-                keyboard.release('w')
-                keyboard.release(Key.cmd)
-                time.sleep(MEDIUM_SLEEP)
-            except Exception as close_e:
-                log.warning(f"창 닫기 실패 (finally 블록): {close_e}")
-
-            log.info(f"--- 사용자 처리 완료: {username} (상태: {group_status}) ---")
-            time.sleep(SHORT_SLEEP) # 다음 사용자 전 짧은 지연
-
-    log.info("모든 메시지 그룹 처리 완료.")
-    return results
\ No newline at end of file
+                        error_reason = error_reason or "특정 오류는 포착되지 않았지만 첫 메시지가 성공적으로 확인되지 않음."
+                        log.error(f"{username}을(를) 실패로 표시. 사유: {error_reason}")
+
+                # 다음 사용자 처리 전 채팅 창 닫기 (finally 블록으로 이동 고려)
+                # log.info(f"{username}: try 블록 끝, 창 닫기 시도.") # 창 닫기 시도 로그 추가
+                # INPUT.run("close")
+                # time.sleep(MEDIUM_SLEEP)
+
+            except Exception as e:  # 예기치 않은 오류 발생 시
+                log.error(f"사용자 {username} 처리 중 예상치 못한 오류 발생: {e}", exc_info=True)
+                group_status = "fail"
+                error_reason = f"처리되지 않은 예외: {e}"
+                # 오류 발생 시 잠재적으로 열려 있는 창 닫기 시도
+                if chat_opened:
+                    try:
+                        log.warning(f"{username}: 예외 발생, 창 닫기 시도 (except 블록).") # except 블록 창 닫기 로그
+                        focus_kakaotalk()  # 닫기 명령 보내기 전 KakaoTalk 활성화 확인
+                        INPUT.run("close")
+                        time.sleep(MEDIUM_SLEEP)
+                        chat_opened = False # finally 블록에서 다시 닫지 않도록
+                    except Exception as close_e:
+                        log.warning(f"창 닫기 실패 (except 블록): {close_e}")
+
+            finally: # 항상 실행
+                log.info(f"{username}: finally 블록 시작.") # finally 시작 로그
+                # 현재 사용자에 대한 결과 기록
+                results.append({
+                    "username": username,
+                    "status": group_status,
+                    "reason": error_reason if error_reason else "" # 오류 사유가 있으면 기록
+                })
+                if unsent:
+                    results[-1]["retry_messages"] = unsent
+                if deferred_outcome is not None:
+                    _apply_verification(results[-1], deferred_outcome, messages)
+                if verification_pending:
+                    group_messages[len(results) - 1] = messages if deferred else _step_messages(messages, plan[1:])
+                if held_steps is not None:
+                    held[len(results) - 1] = held_steps
+                # 채팅창 정리 (채팅창이 열린 경우에만, 메인 창을 닫지 않도록)
+                if chat_opened:
+                    _release_chat_window(username, chat_window)
+
+                log.info(f"--- 사용자 처리 완료: {username} (상태: {group_status}) ---")
+                time.sleep(SHORT_SLEEP) # 다음 사용자 전 짧은 지연
+
+        # 남은 백그라운드 확인 결과를 기다려 순서대로 반영
+        if pipeline is not None:
+            log.info(f"백그라운드 상태 확인 {pipeline.pending_count()}건 대기 중...")
+            _apply_verification_results(pipeline.drain(), results, group_messages, deferred, held)
+    finally:
+        if pipeline is not None:
+            pipeline.shutdown() # 처리 중 예외가 나도 검증 워커 정리
+
+    log.info(f"모든 메시지 그룹 처리 완료. (페이로드 준비 공유 {prefetcher.reused}건, "
+             f"클립보드 기록 {STAGED_CLIPBOARD.writes}건/생략 {STAGED_CLIPBOARD.reused}건)")
+    # 요청 순서대로 결과 복원
+    restored = [None] * len(results)
+    for position, index in enumerate(order):
+        restored[index] = results[position]
+    return restored
\ No newline at end of file
@@ -0,0 +1,41 @@
+# flake8: noqa
+
+import logging
+import numpy as np
+try:
+    import Quartz
+except ImportError:
+    # macOS가 아닌 환경: 프로세스 내 화면 캡처 사용 불가
+    Quartz = None
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 함수 정의 ---
+
+# 프로세스 내 화면 캡처를 사용할 수 있는지 반환합니다.
+def is_available():
+    """Quartz로 화면을 직접 캡처할 수 있으면 True."""
+    return Quartz is not None
+
+# 화면 영역을 BGR 배열로 캡처합니다.
+def grab_region(region, nominal=True):
+    """
+    화면 영역 (x, y, w, h)을 Quartz로 직접 캡처해 BGR numpy 배열로 반환합니다 (screencapture 프로세스/파일 없음).
+    nominal=True면 Retina 화면에서도 포인트 해상도(1배율)로 캡처해 픽셀 수를 줄입니다.
+    캡처할 수 없으면 None.
+    """
+    if Quartz is None:
+        return None
+    x, y, w, h = region
+    option = Quartz.kCGWindowImageNominalResolution if nominal else Quartz.kCGWindowImageDefault
+    image = Quartz.CGWindowListCreateImage(
+        Quartz.CGRectMake(x, y, w, h), Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID, option)
+    if image is None:
+        log.debug(f"화면 영역 캡처 실패: {region}")
+        return None
+    width, height = Quartz.CGImageGetWidth(image), Quartz.CGImageGetHeight(image)
+    row_bytes = Quartz.CGImageGetBytesPerRow(image)
+    data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(image))
+    pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, row_bytes // 4, 4)[:, :width]
+    return np.ascontiguousarray(pixels[:, :, :3]) # BGRA -> BGR
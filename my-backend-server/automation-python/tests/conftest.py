@@ -0,0 +1,21 @@
+# flake8: noqa
+
+import sys
+import pathlib
+
+# 테스트에서 automation-python 모듈을 바로 import할 수 있도록 경로 추가
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import pytest
+from kakao_ax import FakeAXNode, fake_element
+
+
+@pytest.fixture
+def fake_app():
+    """
+    창 목록으로 가짜 KakaoTalk 앱 노드(FakeAXNode)를 만드는 함수를 반환합니다.
+    app.element["AXWindows"]를 바꾸면 다음 조회에 바로 반영됩니다.
+    """
+    def make(*windows, focused=None, **attributes):
+        return FakeAXNode(fake_element("AXApplication", AXWindows=list(windows), AXFocusedWindow=focused, **attributes))
+    return make
@@ -0,0 +1,28 @@
+# flake8: noqa
+
+from payload_prefetcher import prepare_group
+from action_plan import compile_message_plan, describe_plan
+
+
+def test_dry_run_plan_does_not_prepare_images(tmp_path):
+    first, second = tmp_path / "a.png", tmp_path / "b.png"
+    first.write_bytes(b"")
+    second.write_bytes(b"")
+    group = {"username": "김민수", "messages": [
+        {"type": "text", "content": "안녕하세요"},
+        {"type": "image", "content": str(first)},
+        {"type": "image", "content": f"{first},{second}"},
+    ]}
+    prepared = prepare_group(group, None) # 이미지 캐시 없이 검증만
+    assert prepared.error is None
+    assert all(not msg.images for msg in prepared.messages)
+    plan = compile_message_plan(prepared.messages)
+    assert describe_plan(plan) == [
+        {"messages": [1], "type": "text", "actions": ["focus", "clear+0.1s", "input(5자)", "send+0.1s"]},
+        {"messages": [2, 3], "type": "image", "actions": ["stage(files, 3개 파일)", "paste+0.8s", "send+0.5s"]},
+    ]
+
+
+def test_dry_run_reports_invalid_paths(tmp_path):
+    prepared = prepare_group({"username": "김민수", "messages": [{"type": "image", "content": str(tmp_path / "x.png")}]}, None)
+    assert "이미지 파일 없음" in prepared.error
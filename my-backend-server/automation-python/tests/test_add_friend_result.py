@@ -0,0 +1,61 @@
+# flake8: noqa
+
+import pytest
+from kakao_ax import fake_element
+from add_friend_result import (add_friend_outcome, classify_add_friend_result, find_add_friend_result_text,
+                               OCR_SUCCESS, OCR_ALREADY_REGISTERED, OCR_NOT_ALLOWED)
+
+
+def _popup(*texts):
+    return fake_element("AXWindow", *[fake_element("AXStaticText", AXValue=text) for text in texts], AXTitle="")
+
+
+@pytest.mark.parametrize("label, reason", [
+    ("success", "친구 추가 성공."),
+    ("already_registered", "이미 등록된 친구입니다."),
+    ("not_allowed", "이 번호는 친구로 추가할 수 없습니다."),
+])
+def test_add_friend_outcome_labels(label, reason):
+    assert add_friend_outcome(label) == (label, reason)
+
+
+@pytest.mark.parametrize("text, label", [
+    (OCR_SUCCESS, "success"),
+    ("친구 추가가 완료되었습니다.", "success"),
+    (OCR_ALREADY_REGISTERED, "already_registered"),
+    ("이미 등룩된 친구입니다", "already_registered"), # 한 글자 오인식
+    (OCR_NOT_ALLOWED, "not_allowed"),
+])
+def test_classify_add_friend_result(text, label):
+    status, reason = classify_add_friend_result(text)
+    assert status == label
+    assert reason == add_friend_outcome(label)[1]
+
+
+def test_classify_add_friend_result_unrecognized():
+    status, reason = classify_add_friend_result("알 수 없는 문구")
+    assert status == "fail"
+    assert "알 수 없는 문구" in reason
+
+
+@pytest.mark.parametrize("text, label", [
+    (OCR_SUCCESS, "success"),
+    (OCR_ALREADY_REGISTERED, "already_registered"),
+    (OCR_NOT_ALLOWED, "not_allowed"),
+])
+def test_find_add_friend_result_text(fake_app, text, label):
+    assert find_add_friend_result_text(fake_app(_popup("친구 추가", text))) == (label, text)
+
+
+def test_find_add_friend_result_text_missing(fake_app):
+    assert find_add_friend_result_text(fake_app(_popup("친구 추가", "전화번호"))) is None
+
+
+def test_find_add_friend_result_text_skips_main_window_and_lists(fake_app):
+    main = fake_element("AXWindow", fake_element("AXStaticText", AXValue=OCR_SUCCESS), AXTitle="카카오톡")
+    listed = fake_element("AXTable", fake_element("AXRow", fake_element("AXStaticText", AXValue=OCR_SUCCESS)))
+    dialog = fake_element("AXWindow", listed, AXTitle="친구 추가")
+    app = fake_app(main, dialog)
+    assert find_add_friend_result_text(app) is None
+    dialog["AXChildren"].append(fake_element("AXStaticText", AXValue=OCR_NOT_ALLOWED))
+    assert find_add_friend_result_text(app) == ("not_allowed", OCR_NOT_ALLOWED)
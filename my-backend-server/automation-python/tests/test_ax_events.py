@@ -0,0 +1,46 @@
+# flake8: noqa
+
+import pytest
+import ax_events
+from ax_events import EventBus, WINDOW_CREATED, TITLE_CHANGED, FOCUSED_WINDOW_CHANGED
+from kakao_ax import FakeAXNode, fake_element
+from ui_state import ADD_FRIEND_DIALOG_TITLES, ADD_FRIEND_DIALOG_SUBROLES
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr(ax_events, "AX_EVENTS", bus)
+    monkeypatch.setattr(ax_events, "observing", lambda: True)
+    return bus
+
+
+def _wait(mark):
+    return ax_events.wait_for_window(ADD_FRIEND_DIALOG_TITLES, 0.05, after=mark, subroles=ADD_FRIEND_DIALOG_SUBROLES)
+
+
+def test_untitled_dialog_is_matched_by_subrole(bus):
+    mark = bus.mark()
+    bus.publish(WINDOW_CREATED, "", FakeAXNode(fake_element("AXWindow", AXSubrole="AXStandardWindow")))
+    dialog = FakeAXNode(fake_element("AXWindow", AXSubrole="AXDialog"))
+    bus.publish(WINDOW_CREATED, "", dialog)
+    event = _wait(mark)
+    assert event is not None and event.node == dialog
+
+
+def test_dialog_is_matched_by_title(bus):
+    mark = bus.mark()
+    bus.publish(TITLE_CHANGED, "친구 추가", FakeAXNode(fake_element("AXWindow")))
+    assert _wait(mark).kind == TITLE_CHANGED
+
+
+def test_other_windows_time_out(bus):
+    mark = bus.mark()
+    bus.publish(FOCUSED_WINDOW_CHANGED, "홍길동", FakeAXNode(fake_element("AXWindow", AXSubrole="AXStandardWindow")))
+    bus.publish(TITLE_CHANGED, "", FakeAXNode(fake_element("AXStaticText", AXSubrole="AXDialog")))
+    assert _wait(mark) is None
+
+
+def test_no_wait_without_observer(monkeypatch):
+    monkeypatch.setattr(ax_events, "observing", lambda: False)
+    assert ax_events.wait_for_window(ADD_FRIEND_DIALOG_TITLES, 1.0, subroles=ADD_FRIEND_DIALOG_SUBROLES) is None
@@ -0,0 +1,84 @@
+# flake8: noqa
+
+from click_strategies import StrategySelector, ClickStrategy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _strategy(clock, name, seconds, point=(1, 2), blind=False):
+    """호출되면 seconds만큼 시계를 진행하고 point를 반환하는 전략을 만듭니다."""
+    def locate():
+        clock.now += seconds
+        return point
+    return ClickStrategy(name, locate, blind)
+
+
+def _selector(clock, path=None, explore_every=0):
+    return StrategySelector(path=path, host="test-host", explore_every=explore_every, clock=clock)
+
+
+def test_order_prefers_lowest_expected_cost():
+    clock = FakeClock()
+    selector = _selector(clock)
+    fast, slow = _strategy(clock, "fast", 0.1), _strategy(clock, "slow", 0.2)
+    assert [s.name for s in selector.order("add", [slow, fast])] == ["slow", "fast"] # 기록이 없으면 주어진 순서
+    selector.record("add", "slow", True, 0.2)
+    selector.record("add", "fast", True, 0.1)
+    assert [s.name for s in selector.order("add", [slow, fast])] == ["fast", "slow"]
+    for _ in range(4):
+        selector.record("add", "fast", False, 0.1) # 자주 실패하면 빨라도 기대 비용이 커짐
+    assert [s.name for s in selector.order("add", [slow, fast])] == ["slow", "fast"]
+
+
+def test_run_stops_at_first_success_and_records_latency():
+    clock = FakeClock()
+    selector = _selector(clock)
+    missing, found = _strategy(clock, "missing", 0.2, point=None), _strategy(clock, "found", 0.3, point=(5, 6))
+    clicks = []
+    outcome = selector.run("add", [missing, found], click=lambda x, y: clicks.append((x, y)))
+    assert outcome == ("found", (5, 6), ["missing", "found"])
+    assert clicks == [(5, 6)]
+    table = selector.stats()["targets"]["-|add"]
+    assert [(item["strategy"], item["successes"], item["latency"]) for item in table] == [("found", 1, 0.3), ("missing", 0, 0.2)]
+
+
+def test_every_nth_run_explores_least_tried_strategy():
+    clock = FakeClock()
+    selector = _selector(clock, explore_every=3)
+    best, other = _strategy(clock, "best", 0.1), _strategy(clock, "other", 0.5)
+    selector.record("add", "best", True, 0.1)
+    selector.record("add", "other", True, 0.5)
+    firsts = [selector.order("add", [best, other])[0].name for _ in range(6)]
+    assert firsts == ["best", "best", "other", "best", "best", "other"]
+    assert selector.stats()["explored"] == 2
+
+
+def test_blind_strategy_is_not_recorded_without_confirm():
+    clock = FakeClock()
+    selector = _selector(clock)
+    guess = _strategy(clock, "guess", 0.1, blind=True)
+    selector.run("add", [guess], click=lambda x, y: None)
+    assert selector.stats()["targets"] == {}
+    selector.run("add", [guess], click=lambda x, y: None, confirm=lambda: False)
+    assert selector.stats()["targets"]["-|add"][0]["attempts"] == 1
+
+
+def test_stats_persist_per_host_and_context(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "click-strategies.json"
+    selector = _selector(clock, path=path)
+    selector.record("add", "template", True, 0.4, context="800x600")
+    selector.record("add", "template", False, 0.6, context="800x600")
+
+    reloaded = _selector(clock, path=path)
+    entry = reloaded.stats()["targets"]["800x600|add"][0]
+    assert (entry["strategy"], entry["attempts"], entry["successes"]) == ("template", 2, 1)
+    assert entry["latency"] == round(0.7 * 0.4 + 0.3 * 0.6, 4)
+    other_host = StrategySelector(path=path, host="other-host", clock=clock)
+    assert other_host.stats()["targets"] == {}
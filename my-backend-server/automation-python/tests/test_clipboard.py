@@ -0,0 +1,36 @@
+# flake8: noqa
+
+import pytest
+import clipboard
+from clipboard import Pasteboard, FakePasteboard, StagedClipboard, create_pasteboard
+
+
+def test_pasteboard_is_abstract():
+    with pytest.raises(TypeError):
+        Pasteboard()
+
+
+def test_incomplete_pasteboard_cannot_be_created():
+    class TextOnly(Pasteboard):
+        def set_text(self, text):
+            pass
+
+    with pytest.raises(TypeError):
+        TextOnly()
+
+
+def test_create_pasteboard_raises_without_appkit(monkeypatch):
+    monkeypatch.setattr(clipboard, "NSPasteboard", None)
+    with pytest.raises(RuntimeError):
+        create_pasteboard()
+
+
+def test_staged_clipboard_skips_unchanged_payload():
+    pasteboard = FakePasteboard()
+    staged = StagedClipboard(pasteboard)
+    assert staged.stage("text", "안녕") is True
+    assert staged.stage("text", "안녕") is False
+    pasteboard.set_text("다른 앱")
+    assert staged.stage("text", "안녕") is True
+    assert (staged.writes, staged.reused) == (2, 1)
+    assert pasteboard.contents() == ("text", "안녕")
@@ -0,0 +1,90 @@
+# flake8: noqa
+
+import cv2
+import numpy as np
+import pytest
+from detection_profiles import (DetectionEnvironment, DetectionProfile, DetectionProfiles, match_score, fit_hsv_range, fit_icon_area,
+                                BASE_COLORS)
+
+DARK_RETINA = DetectionEnvironment("25.4.1", "dark", 2.0)
+
+
+def _profiles(tmp_path, frame=None, environment=DARK_RETINA):
+    return DetectionProfiles(root=tmp_path / "profiles", detect=lambda: environment,
+                             capture=lambda rect, nominal=True: frame)
+
+
+def _button(color=(0, 200, 255)):
+    """BGR 단색 버튼 바탕에 흰 글자 줄이 있는 프레임."""
+    frame = np.zeros((20, 40, 3), dtype=np.uint8)
+    frame[:] = color
+    frame[8:12, 5:35] = 255
+    return frame
+
+
+@pytest.mark.parametrize("match, score", [
+    ({}, 0),
+    ({"app_version": "25.4"}, 1),
+    ({"app_version": "25.4.1", "appearance": "dark"}, 2),
+    ({"appearance": "dark", "scale": 2}, 2),
+    ({"app_version": "25.41"}, None), # 앞부분 일치는 점 단위
+    ({"appearance": "light"}, None),
+    ({"scale": 1.0}, None),
+])
+def test_match_score(match, score):
+    assert match_score(match, DARK_RETINA) == score
+
+
+def test_match_score_unknown_environment_does_not_match_conditions():
+    assert match_score({"app_version": "25.4"}, DetectionEnvironment(None, None, None)) is None
+
+
+def test_select_prefers_most_specific_profile(tmp_path):
+    profiles = _profiles(tmp_path)
+    profiles.profiles.append(DetectionProfile("dark", match={"appearance": "dark"}, fallback=profiles.base))
+    profiles.profiles.append(DetectionProfile(
+        "dark-25.4", match={"appearance": "dark", "app_version": "25.4"}, colors={"yellow": ([1, 2, 3], [4, 5, 6])},
+        fallback=profiles.base))
+    assert profiles.select().name == "dark-25.4"
+    assert profiles.select(DetectionEnvironment("25.5", "dark", 2.0)).name == "dark"
+    light = profiles.select(DetectionEnvironment("25.4.1", "light", 2.0))
+    assert light is profiles.base
+    assert [list(v) for v in light.color("yellow")] == list(BASE_COLORS["yellow"])
+
+
+def test_fit_hsv_range_ignores_unsaturated_pixels():
+    low, high = fit_hsv_range([_button()], margin=(0, 0, 0))
+    hue, saturation, value = cv2.cvtColor(_button()[:1, :1], cv2.COLOR_BGR2HSV)[0, 0]
+    assert low == [hue, saturation, value] == high # 흰 글자 픽셀은 범위에 들어가지 않음
+
+
+def test_fit_hsv_range_without_colored_pixels_raises():
+    with pytest.raises(ValueError):
+        fit_hsv_range([np.full((10, 10, 3), 128, dtype=np.uint8)])
+
+
+def test_fit_icon_area_scales_largest_contour():
+    icon = np.full((30, 30, 3), 255, dtype=np.uint8)
+    icon[5:16, 5:16] = 0 # 11x11 검은 사각형 (윤곽 면적 10x10)
+    assert fit_icon_area(icon, area_range=(0.5, 2.0)) == (50, 200)
+    with pytest.raises(ValueError):
+        fit_icon_area(np.full((30, 30, 3), 255, dtype=np.uint8))
+
+
+def test_calibrate_saves_template_and_colors(tmp_path):
+    profiles = _profiles(tmp_path, frame=_button())
+    fitted = profiles.calibrate("confirm_button", (0, 0, 40, 20), samples=1)
+    assert fitted["profile"] == "25.4.1-dark-2x"
+    reloaded = _profiles(tmp_path)
+    profile = reloaded.select()
+    assert profile.name == "25.4.1-dark-2x"
+    assert profile.template("add_btn") == fitted["template"]
+    assert [list(v) for v in profile.color("yellow")] == list(fitted["yellow"])
+
+
+def test_failed_fit_leaves_profiles_untouched(tmp_path):
+    profiles = _profiles(tmp_path, frame=np.full((20, 40, 3), 128, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        profiles.calibrate("confirm_button", (0, 0, 40, 20), samples=1)
+    assert profiles.profiles == []
+    assert not (tmp_path / "profiles").exists()
@@ -0,0 +1,79 @@
+# flake8: noqa
+
+import numpy as np
+from frame_poller import ChangeAwarePoller, frame_digest
+
+REGION = (0, 0, 48, 48)
+
+
+class FakeTime:
+    """sleep()이 시계를 진행시키고 잠든 간격을 기록하는 가짜 시간."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 4))
+        self.now += seconds
+
+
+def _frame(value):
+    return np.full((48, 48, 3), value, dtype=np.uint8)
+
+
+def _poller(frames, fake):
+    """frames를 차례로 캡처하고 (마지막 프레임은 계속 반복) 가짜 시간으로 폴링하는 폴러."""
+    frames = list(frames)
+    def capture(region):
+        return frames.pop(0) if len(frames) > 1 else frames[0]
+    return ChangeAwarePoller(capture, min_interval=0.1, max_interval=0.4, backoff=2.0, clock=fake.clock, sleep=fake.sleep)
+
+
+def test_unchanged_frames_skip_match_and_back_off_to_cap():
+    fake = FakeTime()
+    poller = _poller([_frame(0)], fake)
+    matched = []
+    assert poller.wait(lambda: REGION, lambda frame, region: matched.append(region), timeout=1.5) is None
+    assert len(matched) == 1 # 같은 화면은 한 번만 매칭
+    assert fake.sleeps[:4] == [0.1, 0.2, 0.4, 0.4]
+    assert max(fake.sleeps) == 0.4
+    stats = poller.stats()
+    assert stats["matches"] == 1
+    assert stats["skipped_matches"] == stats["polls"] - 1
+    assert stats["timeouts"] == 1 and stats["found"] == 0
+
+
+def test_changed_frame_is_matched_and_interval_resets():
+    fake = FakeTime()
+    frames = [_frame(0)] * 4 + [_frame(200)] * 2 + [_frame(100)]
+    poller = _poller(frames, fake)
+    seen = []
+    def match(frame, region):
+        seen.append(int(frame[0, 0, 0]))
+        return "found" if frame[0, 0, 0] == 100 else None
+    assert poller.wait(lambda: REGION, match, timeout=5) == "found"
+    assert seen == [0, 200, 100]
+    assert fake.sleeps == [0.1, 0.2, 0.4, 0.4, 0.1, 0.2] # 바뀐 화면을 매칭한 뒤 최소 간격으로 복귀
+    stats = poller.stats()
+    assert (stats["polls"], stats["matches"], stats["skipped_matches"], stats["found"]) == (7, 3, 4, 1)
+    assert stats["time_to_match"]["last"] == round(sum(fake.sleeps), 3)
+
+
+def test_capture_failure_backs_off_without_matching():
+    fake = FakeTime()
+    poller = ChangeAwarePoller(lambda region: None, min_interval=0.1, max_interval=0.4, backoff=2.0,
+                               clock=fake.clock, sleep=fake.sleep)
+    assert poller.wait(lambda: REGION, lambda frame, region: "found", timeout=1.0) is None
+    assert fake.sleeps[:3] == [0.2, 0.4, 0.4]
+    assert poller.stats()["polls"] == 0
+
+
+def test_frame_digest_ignores_capture_noise():
+    noisy = _frame(100)
+    noisy[0, 0] = 102
+    assert frame_digest(_frame(100)) == frame_digest(noisy)
+    assert frame_digest(_frame(100)) != frame_digest(_frame(160))
@@ -0,0 +1,45 @@
+# flake8: noqa
+
+from kakao_ax import fake_element
+from friend_index import FriendIndex, read_friend_rows, read_friend_list, FOUND, AMBIGUOUS, MISSING, UNKNOWN
+
+
+def _row(*texts):
+    return fake_element("AXRow", *[fake_element("AXStaticText", AXValue=text) for text in texts])
+
+
+def _main_window(*rows):
+    return fake_element("AXWindow", fake_element("AXTable", *rows), AXTitle="KakaoTalk")
+
+
+def test_rows_with_same_text_are_separate_friends(fake_app):
+    app = fake_app(_main_window(_row("김민수"), _row("김민수"), _row("이영희", "상태 메시지")))
+    assert [entry.name for entry in read_friend_rows(app)] == ["김민수", "김민수", "이영희"]
+
+
+def test_favorites_section_is_not_counted_twice(fake_app):
+    app = fake_app(_main_window(_row("즐겨찾기 1"), _row("김민수"), _row("친구 2"), _row("김민수"), _row("이영희")))
+    assert [entry.name for entry in read_friend_rows(app)] == ["김민수", "이영희"]
+
+
+def test_resolve(fake_app):
+    index = FriendIndex()
+    assert index.resolve("김민수")[0] == UNKNOWN
+    assert index.refresh(fake_app(_main_window(_row("김민수"), _row("김민수"), _row("이영희")))) == 3
+    assert index.resolve("이영희")[0] == FOUND
+    assert index.resolve(" 김민수 ") == (AMBIGUOUS, index.resolve("김민수")[1])
+    assert index.resolve("박철수")[0] == UNKNOWN # 친구 수 머리글이 없어 전체 목록인지 알 수 없음
+
+
+def test_friend_count_header_marks_complete_list(fake_app):
+    app = fake_app(_main_window(_row("즐겨찾기 1"), _row("김민수"), _row("친구 1,002"), _row("김민수"), _row("이영희")))
+    assert read_friend_list(app)[1:] == (1002, 2)
+    index = FriendIndex()
+    index.refresh(app)
+    assert not index.complete
+    assert index.resolve("박철수")[0] == UNKNOWN
+
+    index.refresh(fake_app(_main_window(_row("친구 2"), _row("김민수"), _row("이영희"))))
+    assert index.complete
+    assert index.resolve("박철수")[0] == MISSING
+    assert index.resolve("이영희")[0] == FOUND
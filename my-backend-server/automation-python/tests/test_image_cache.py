@@ -0,0 +1,26 @@
+# flake8: noqa
+
+import image_cache
+from PIL import Image
+from image_cache import ImageCache
+
+
+def test_exif_orientation_is_applied(tmp_path):
+    source = tmp_path / "photo.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6 # 시계 방향 90도 회전해서 봐야 하는 사진
+    Image.new("RGB", (40, 20), "red").save(source, exif=exif)
+    prepared = ImageCache(cache_dir=tmp_path / "cache").prepare(str(source))
+    assert (prepared.width, prepared.height) == (20, 40)
+    with Image.open(prepared.path) as img:
+        assert img.size == (20, 40)
+
+
+def test_digest_memory_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_cache, "DIGEST_CACHE_SIZE", 3)
+    cache = ImageCache(cache_dir=tmp_path / "cache")
+    for number in range(5):
+        path = tmp_path / f"{number}.png"
+        Image.new("RGB", (4, 4), (number, 0, 0)).save(path)
+        cache.prepare(str(path))
+    assert list(cache._digests) == [str(tmp_path / f"{number}.png") for number in (2, 3, 4)]
@@ -0,0 +1,40 @@
+# flake8: noqa
+
+import pytest
+from phone_registry import PhoneRegistry, normalize_phone
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("010-1234-5678", "+821012345678"),
+    ("+82 10-1234-5678", "+821012345678"),
+    ("+82 010-1234-5678", "+821012345678"),
+    ("82 010 1234 5678", "+821012345678"),
+    ("821012345678", "+821012345678"),
+    ("0082-10-1234-5678", "+821012345678"),
+    ("00820-10-1234-5678", "+821012345678"),
+    ("+1 (415) 555-0100", "+14155550100"),
+    ("1234", None),
+    ("", None),
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "phones.sqlite3"
+    registry = PhoneRegistry(path=path)
+    assert not path.exists()
+    assert registry.record("+821012345678", "success", username="홍길동", now=100.0)
+    assert path.exists()
+    assert registry.lookup("+821012345678", now=200.0).username == "홍길동"
+    registry.close()
+    registry.close()
+
+
+def test_expired_and_unsaved_results_miss(tmp_path):
+    registry = PhoneRegistry(path=tmp_path / "phones.sqlite3", ttl={"success": 10})
+    assert not registry.record("+821012345678", "fail")
+    registry.record("+821012345678", "success", now=0.0)
+    assert registry.lookup("+821012345678", now=5.0) is not None
+    assert registry.lookup("+821012345678", now=11.0) is None
+    assert registry.stats() == {"entries": {"success": 1}, "hits": 1, "misses": 1}
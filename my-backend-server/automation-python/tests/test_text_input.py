@@ -0,0 +1,62 @@
+# flake8: noqa
+
+import pytest
+import text_input
+from kakao_ax import FakeAXNode, fake_element
+from clipboard import FakePasteboard
+from text_input import TextInput
+
+
+@pytest.fixture(autouse=True)
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(text_input, "PASTE_VERIFY_TIMEOUT", 0.05)
+
+
+def _setup(field=None, paste_applies=True):
+    """(TextInput, 클립보드, 입력창 요소)를 만듭니다. 붙여넣기는 입력창이 있으면 클립보드 텍스트를 값에 넣습니다."""
+    pasteboard = FakePasteboard()
+    pasteboard.set_text("사용자 클립보드")
+    app = FakeAXNode(fake_element("AXApplication", AXFocusedUIElement=field))
+
+    def paste():
+        if field is not None and paste_applies:
+            field["AXValue"] = pasteboard.get_text()
+
+    typed = TextInput(pasteboard, paste=paste, select_all=lambda: None, app_provider=lambda: app)
+    return typed, pasteboard, field
+
+
+def test_direct_set_without_confirm():
+    typed, pasteboard, field = _setup(fake_element("AXTextArea", AXValue=""))
+    assert typed.enter("안녕하세요") == "ax"
+    assert field["AXValue"] == "안녕하세요"
+    assert pasteboard.get_text() == "사용자 클립보드"
+
+
+def test_unprocessed_direct_set_is_retried_by_paste():
+    typed, pasteboard, field = _setup(fake_element("AXTextArea", AXValue=""))
+    processed = []
+    typed._paste = lambda: processed.append(True)
+    assert typed.enter("안녕하세요", confirm=lambda: bool(processed), confirm_timeout=0.05) == "paste"
+    assert typed.counts["ax_unprocessed"] == 1
+    assert pasteboard.get_text() == "사용자 클립보드" # 처리 확인 후 복원
+
+
+def test_clipboard_restored_after_field_changes():
+    typed, pasteboard, field = _setup(fake_element("AXTextArea", AXValue=""))
+    assert typed.enter("안녕하세요", method="paste") == "paste"
+    assert field["AXValue"] == "안녕하세요"
+    assert pasteboard.get_text() == "사용자 클립보드"
+
+
+def test_clipboard_kept_when_paste_cannot_be_verified():
+    typed, pasteboard, _ = _setup(field=None)
+    assert typed.enter("안녕하세요") == "paste"
+    assert pasteboard.get_text() == "안녕하세요" # 늦게 처리된 붙여넣기가 이전 클립보드를 넣지 않도록 유지
+    assert typed.counts["clipboard_kept"] == 1
+
+
+def test_unconfirmed_paste_returns_none():
+    typed, pasteboard, field = _setup(fake_element("AXTextArea", AXValue=""), paste_applies=False)
+    assert typed.enter("안녕하세요", method="paste", confirm=lambda: False, confirm_timeout=0.05) is None
+    assert pasteboard.get_text() == "안녕하세요"
@@ -0,0 +1,110 @@
+# flake8: noqa
+
+import pytest
+from ui_session import ScriptedKakao, UISession, FRIENDS_TAB_TARGET, WINDOW, TAB, FIELD, SEARCH_FIELD
+from ui_state import FRIENDS_TAB, CHAT_LIST, SEARCH_RESULTS, MAIN_WINDOW
+
+
+def _to_friends_tab(session, kakao):
+    return session.ensure("friends_tab", lambda: kakao.press("cmd+1"), **FRIENDS_TAB_TARGET)
+
+
+def _activate(session, kakao):
+    return session.ensure("activate", kakao.activate, frontmost=True)
+
+
+def test_satisfied_navigation_is_skipped():
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=100, verify_after=1e9)
+    for _ in range(3):
+        assert _activate(session, kakao)
+        assert _to_friends_tab(session, kakao)
+    assert kakao.actions == ["activate", "cmd+1"]
+    assert session.skipped == {"activate": 2, "friends_tab": 2}
+    assert session.performed == {"activate": 1, "friends_tab": 1}
+
+
+def test_effects_are_recorded_with_target():
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=100, verify_after=1e9)
+    _to_friends_tab(session, kakao)
+    session.ensure("search", lambda: kakao.press("cmd+f"), {TAB: SEARCH_RESULTS}, field=SEARCH_FIELD)
+    session.ensure("search", lambda: kakao.press("cmd+f"), {TAB: SEARCH_RESULTS}, field=SEARCH_FIELD)
+    assert kakao.actions == ["cmd+1", "cmd+f"]
+    assert session.known(TAB) == SEARCH_RESULTS
+
+
+def test_external_change_with_event_is_followed():
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=100, verify_after=1e9)
+    _activate(session, kakao)
+    _to_friends_tab(session, kakao)
+    kakao.user(frontmost=False)
+    kakao.user(window="홍길동")
+    assert session.known(WINDOW) == "홍길동"
+    _activate(session, kakao)
+    _to_friends_tab(session, kakao)
+    assert kakao.actions == ["activate", "cmd+1", "activate", "cmd+1"]
+    assert session.drifts == 0
+
+
+def test_silent_drift_is_fixed_by_periodic_verify():
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=2, verify_after=1e9)
+    _activate(session, kakao)
+    _to_friends_tab(session, kakao)
+    kakao.user(silent=True, tab=CHAT_LIST)
+    assert _to_friends_tab(session, kakao) # 아직 모름: 생략
+    assert _to_friends_tab(session, kakao)
+    assert kakao.actions == ["activate", "cmd+1"]
+    _to_friends_tab(session, kakao) # 생략이 쌓여 확인 -> 어긋남을 바로잡고 다시 이동
+    assert kakao.actions == ["activate", "cmd+1", "cmd+1"]
+    assert session.drifts == 1
+    assert kakao.state[TAB] == FRIENDS_TAB
+
+
+def test_silent_drift_is_fixed_after_verify_interval():
+    now = [0.0]
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=100, verify_after=30.0, clock=lambda: now[0])
+    _activate(session, kakao)
+    kakao.user(silent=True, frontmost=False)
+    _activate(session, kakao)
+    assert kakao.actions == ["activate"]
+    now[0] = 31.0
+    _activate(session, kakao)
+    assert kakao.actions == ["activate", "activate"]
+    assert session.verifications == 1 and session.drifts == 1
+
+
+def test_failed_or_raising_action_forgets_target():
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=100, verify_after=1e9)
+    _to_friends_tab(session, kakao)
+    assert not session.ensure("friends_tab", lambda: False, tab=CHAT_LIST)
+    assert session.known(TAB) is None
+
+    def broken():
+        raise RuntimeError("입력 실패")
+
+    with pytest.raises(RuntimeError):
+        session.ensure("search", broken, field=SEARCH_FIELD)
+    assert session.known(FIELD) is None
+    assert session.known(WINDOW) == MAIN_WINDOW
+
+
+def test_nothing_is_skipped_without_observer():
+    kakao = ScriptedKakao()
+    session = UISession(bus=kakao.bus, observing=lambda: False, probe=lambda: dict(kakao.state))
+    _to_friends_tab(session, kakao)
+    _to_friends_tab(session, kakao)
+    assert kakao.actions == ["cmd+1", "cmd+1"]
+
+
+def test_new_window_forgets_focus():
+    kakao = ScriptedKakao()
+    session = kakao.session(verify_every=100, verify_after=1e9)
+    session.note(window=MAIN_WINDOW, field=SEARCH_FIELD)
+    kakao.user(window="홍길동")
+    assert session.known(WINDOW) == "홍길동"
+    assert session.known(FIELD) is None
@@ -0,0 +1,50 @@
+# flake8: noqa
+
+import numpy as np
+import pytest
+import vision_workers
+from vision_workers import VisionWorkerPool
+
+
+def _screen_with_template():
+    screen = np.zeros((40, 60), dtype=np.uint8)
+    screen[10:20, 30:40] = np.arange(100, dtype=np.uint8).reshape(10, 10) # 구분되는 무늬
+    return screen, screen[10:20, 30:40].copy()
+
+
+def test_run_task_without_pool_runs_in_process(monkeypatch):
+    monkeypatch.setattr(vision_workers, "_pool", None)
+    screen, template = _screen_with_template()
+    score, location = vision_workers.match_template(screen, template)
+    assert score == pytest.approx(1.0)
+    assert location == (30, 10)
+
+
+def test_dead_worker_is_restarted_before_task():
+    pool = VisionWorkerPool(num_workers=1)
+    try:
+        screen, template = _screen_with_template()
+        assert pool.run("match_template", [screen, template])[1] == (30, 10)
+        worker = pool._workers[0]
+        worker.process.kill()
+        worker.process.join()
+        score, location = pool.run("match_template", [screen, template])
+        assert (round(score, 3), location) == (1.0, (30, 10))
+        stats = pool.stats()
+        assert stats["workers"][0]["restarts"] == 1
+        assert stats["workers"][0]["alive"]
+        assert stats["tasks"] == 2
+    finally:
+        pool.close()
+
+
+def test_worker_is_recycled_after_task_limit():
+    pool = VisionWorkerPool(num_workers=1, max_tasks_per_worker=2)
+    try:
+        screen, template = _screen_with_template()
+        for _ in range(3):
+            pool.run("match_template", [screen, template])
+        worker = pool.stats()["workers"][0]
+        assert (worker["restarts"], worker["tasks_done"]) == (1, 1)
+    finally:
+        pool.close()
@@ -0,0 +1,274 @@
+# flake8: noqa
+
+import time
+import logging
+import threading
+from collections import Counter
+import kakao_ax
+import ax_events
+from ui_state import UIStateClassifier, FRIENDS_TAB, CHAT_LIST, SEARCH_RESULTS, MAIN_WINDOW, MAIN_WINDOW_STATES
+
+# --- 상수 정의 ---
+UI_SESSION_VERIFY_EVERY = 10 # 이동 생략이 이만큼 쌓이면 실제 상태를 다시 확인
+UI_SESSION_VERIFY_AFTER = 30.0 # 마지막 확인 후 이 시간(초)이 지나면 생략 전에 실제 상태를 다시 확인
+
+# 세션이 추적하는 상태 항목
+FRONTMOST = "frontmost" # KakaoTalk이 앞에 있는지 (True/False)
+WINDOW = "window" # 포커스된 창 (메인 창이면 MAIN_WINDOW, 그 외에는 정규화된 창 제목)
+TAB = "tab" # 메인 창 탭/검색 상태 (FRIENDS_TAB/CHAT_LIST/SEARCH_RESULTS)
+FIELD = "field" # 포커스된 입력란
+SEARCH_FIELD = "search" # 메인 창 검색창
+MESSAGE_FIELD = "message" # 채팅창 메시지 입력창
+FRIENDS_TAB_TARGET = {FRONTMOST: True, WINDOW: MAIN_WINDOW, TAB: FRIENDS_TAB} # Cmd+1(친구 탭 이동)이 만드는 상태
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 함수 정의 ---
+
+# 창 제목을 세션의 WINDOW 값으로 변환합니다.
+def window_key(title):
+    """메인 창 제목(앱 이름)이면 MAIN_WINDOW, 그 외에는 정규화된 제목을 반환합니다. 제목이 없으면 None."""
+    title = kakao_ax.normalize_title(title) if title else ""
+    if not title:
+        return None
+    return MAIN_WINDOW if title in kakao_ax.KAKAO_APP_NAMES else title
+
+# 실제 KakaoTalk 상태를 읽습니다.
+def observe_kakao(classifier=None, app_provider=kakao_ax.kakao_app):
+    """
+    Accessibility와 화면 상태 판별기로 실제 상태 {항목: 값}을 읽어 반환합니다.
+    탭은 메인 창이 앞에 있고 화면으로 구분될 때만 포함합니다. Accessibility를 쓸 수 없으면 None.
+    """
+    app = app_provider()
+    if app is None:
+        return None
+    window = kakao_ax.focused_window(app)
+    key = window_key(window.title) if window is not None else None
+    facts = {FRONTMOST: app.get("AXFrontmost") is True, WINDOW: key, FIELD: None}
+    if kakao_ax.focused_text_field(app) is not None:
+        facts[FIELD] = SEARCH_FIELD if key == MAIN_WINDOW else MESSAGE_FIELD
+    if key == MAIN_WINDOW and classifier is not None:
+        reading = classifier.classify()
+        if reading.state in MAIN_WINDOW_STATES:
+            facts[TAB] = reading.state
+    return facts
+
+# --- 클래스 정의 ---
+
+class UISession:
+    """
+    KakaoTalk UI의 마지막으로 알려진 상태(앱 활성화, 포커스 창, 메인 창 탭, 포커스 입력란, 클립보드)를
+    직접 수행한 동작(note)과 옵저버가 발행한 창 이벤트로 추적합니다.
+    ensure()는 목표 상태가 이미 알려져 있으면 이동 동작과 그 대기를 생략하고, 생략이 일정 횟수/시간 쌓이면
+    실제 상태를 다시 읽어(verify) 어긋남을 바로잡습니다. 창 이벤트를 받지 못하는 동안(옵저버 없음)에는 생략하지 않습니다.
+    """
+
+    def __init__(self, bus=None, observing=None, probe=None, verify_every=UI_SESSION_VERIFY_EVERY,
+                 verify_after=UI_SESSION_VERIFY_AFTER, clock=time.monotonic):
+        self.bus = bus if bus is not None else ax_events.AX_EVENTS
+        self._observing = observing or ax_events.observing
+        self._probe = probe or (lambda: observe_kakao(UIStateClassifier()))
+        self.verify_every = verify_every
+        self.verify_after = verify_after
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._state = {} # 항목 -> 마지막으로 알려진 값 (모르면 없음)
+        self._seen = self.bus.mark() # 마지막으로 반영한 이벤트 순번
+        self._pending_skips = 0 # 마지막 확인 이후 생략 횟수
+        self._verified_at = clock()
+        self.clipboard = None # 클립보드 추적기 (StagedClipboard, 전송 모듈이 연결)
+        self.skipped = Counter() # 이동 이름 -> 생략 횟수
+        self.performed = Counter() # 이동 이름 -> 실행 횟수
+        self.verifications = 0
+        self.drifts = 0 # 확인 때 알려진 상태와 실제 상태가 달랐던 항목 수
+
+    # 알려진 상태 값을 반환합니다.
+    def known(self, key):
+        """항목의 마지막으로 알려진 값을 반환합니다 (모르면 None)."""
+        with self._lock:
+            self.sync()
+            return self._state.get(key)
+
+    # 직접 수행한 동작의 결과를 기록합니다.
+    def note(self, **facts):
+        """동작 결과로 알게 된 상태를 기록합니다. 값이 None인 항목은 모르는 상태로 되돌립니다."""
+        with self._lock:
+            self.sync() # 동작 이전에 발행된 이벤트가 기록을 덮어쓰지 않도록 먼저 반영
+            for key, value in facts.items():
+                if value is None:
+                    self._state.pop(key, None)
+                else:
+                    self._state[key] = value
+
+    # 알려진 상태를 잊습니다.
+    def forget(self, *keys):
+        """주어진 항목(없으면 전부)을 모르는 상태로 되돌립니다."""
+        with self._lock:
+            if not keys:
+                self._state.clear()
+            for key in keys:
+                self._state.pop(key, None)
+
+    # 이벤트 버스의 새 이벤트를 상태에 반영합니다.
+    def sync(self):
+        """마지막으로 반영한 이후 발행된 창 이벤트를 상태에 반영합니다."""
+        with self._lock:
+            events = self.bus.since(self._seen)
+            if not events:
+                return
+            if events[0].seq > self._seen + 1:
+                log.debug("UI 이벤트 일부가 보관 한도를 넘어 버려져 알려진 상태를 모두 잊습니다.")
+                self._state.clear()
+            for event in events:
+                self._apply(event)
+            self._seen = events[-1].seq
+
+    def _apply(self, event):
+        if event.kind == ax_events.APP_ACTIVATED:
+            self._state[FRONTMOST] = True
+        elif event.kind == ax_events.APP_DEACTIVATED:
+            self._state[FRONTMOST] = False
+        elif event.kind == ax_events.FOCUSED_WINDOW_CHANGED:
+            key = window_key(event.title)
+            if key is None:
+                self._state.pop(WINDOW, None)
+            elif key != self._state.get(WINDOW):
+                self._state[WINDOW] = key
+                self._state.pop(FIELD, None) # 창이 바뀌면 입력란 포커스도 바뀜
+        elif event.kind in (ax_events.WINDOW_CREATED, ax_events.ELEMENT_DESTROYED):
+            # 새 창이 생기거나 창이 닫히면 포커스가 옮겨감 (이어지는 포커스 창 변경 알림으로 다시 알게 됨)
+            self._state.pop(WINDOW, None)
+            self._state.pop(FIELD, None)
+
+    # 실제 상태를 읽어 알려진 상태를 바로잡습니다.
+    def verify(self):
+        """실제 상태를 읽어 알려진 상태와 비교하고 바로잡습니다. 읽을 수 없으면 모두 잊고 False."""
+        with self._lock:
+            self.sync()
+            self._pending_skips = 0
+            self._verified_at = self._clock()
+            self.verifications += 1
+            observed = self._probe()
+            if observed is None:
+                self._state.clear()
+                return False
+            for key, value in observed.items():
+                known = self._state.get(key)
+                if known is not None and known != value:
+                    self.drifts += 1
+                    log.warning(f"UI 상태 어긋남 감지: {key} 알려진 값={known}, 실제={value}")
+                if value is None:
+                    self._state.pop(key, None)
+                else:
+                    self._state[key] = value
+            return True
+
+    def _verify_due(self):
+        return (self._pending_skips >= self.verify_every
+                or self._clock() - self._verified_at >= self.verify_after)
+
+    # 목표 상태가 이미 알려져 있는지 확인합니다.
+    def satisfied(self, **target):
+        """목표 상태 {항목: 값}이 모두 알려진 값과 같으면 True (창 이벤트를 받는 중일 때만, 필요하면 먼저 확인)."""
+        with self._lock:
+            if not self._observing():
+                return False
+            self.sync()
+            if self._verify_due():
+                self.verify()
+            return all(self._state.get(key) == value for key, value in target.items())
+
+    # 목표 상태가 아닐 때만 이동 동작을 실행합니다.
+    def ensure(self, name, action, effects=None, **target):
+        """
+        목표 상태 {항목: 값}이 이미 알려져 있으면 action(과 그 안의 대기)을 생략하고 True를 반환합니다.
+        아니면 action()을 실행하고, 실패(False 반환)하면 목표 항목을 잊고 False, 성공하면 목표와 effects를 기록하고 True.
+        action에서 예외가 나면 목표 항목을 잊고 그대로 전달합니다.
+        """
+        with self._lock:
+            if self.satisfied(**target):
+                self.skipped[name] += 1
+                self._pending_skips += 1
+                log.debug(f"UI 이동 생략: {name} (이미 {target})")
+                return True
+        self.performed[name] += 1
+        try:
+            result = action()
+        except Exception:
+            self.forget(*target)
+            raise
+        if result is False:
+            self.forget(*target)
+            return False
+        self.note(**target, **(effects or {}))
+        return True
+
+    # 세션 상태를 반환합니다.
+    def stats(self):
+        """알려진 상태, 이동별 생략/실행 횟수, 확인/어긋남 횟수, 클립보드 기록/재사용 수를 반환합니다."""
+        with self._lock:
+            self.sync()
+            state = dict(self._state)
+        clipboard = self.clipboard
+        return {"state": state, "skipped": dict(self.skipped), "performed": dict(self.performed),
+                "verifications": self.verifications, "drifts": self.drifts,
+                "clipboard": {"writes": clipboard.writes, "reused": clipboard.reused} if clipboard is not None else None}
+
+
+class ScriptedKakao:
+    """
+    UISession을 실제 앱 없이 확인하기 위한 가짜 KakaoTalk입니다. 실제 상태를 따로 들고 있다가
+    activate()/press()에 따라 바꾸고, 옵저버처럼 이벤트 버스에 활성화/포커스 창 알림을 발행합니다.
+    user()로 사용자가 직접 조작한 것처럼 상태를 바꿀 수 있으며, silent=True면 알림 없이 바꿔(알림 누락)
+    주기적 확인이 어긋남을 바로잡는지 볼 수 있습니다.
+    """
+
+    def __init__(self, bus=None):
+        self.bus = bus if bus is not None else ax_events.EventBus()
+        self.state = {FRONTMOST: False, WINDOW: MAIN_WINDOW, TAB: CHAT_LIST, FIELD: None}
+        self.actions = [] # 실제로 수행된 동작 기록
+
+    # 가짜 앱에 연결된 세션을 만듭니다.
+    def session(self, **kwargs):
+        """이 가짜 앱의 이벤트와 상태를 보는 UISession을 반환합니다."""
+        return UISession(bus=self.bus, observing=lambda: True, probe=lambda: dict(self.state), **kwargs)
+
+    def activate(self):
+        self.actions.append("activate")
+        self._change(frontmost=True)
+        return True
+
+    # 단축키를 누른 결과를 흉내 냅니다.
+    def press(self, chord):
+        """Cmd+1(친구 탭), Cmd+2(채팅 탭), Cmd+F(검색창), Escape(검색 닫기) 입력 결과를 흉내 냅니다."""
+        self.actions.append(chord)
+        if chord == "cmd+1":
+            self._change(window=MAIN_WINDOW, tab=FRIENDS_TAB, field=None)
+        elif chord == "cmd+2":
+            self._change(window=MAIN_WINDOW, tab=CHAT_LIST, field=None)
+        elif chord == "cmd+f" and self.state[WINDOW] == MAIN_WINDOW:
+            self._change(field=SEARCH_FIELD, tab=SEARCH_RESULTS)
+        elif chord == "escape":
+            self._change(field=None)
+
+    # 사용자가 직접 조작한 것처럼 상태를 바꿉니다.
+    def user(self, silent=False, **changes):
+        """상태를 바꾸고 (silent=False면) 그에 해당하는 알림을 발행합니다."""
+        self._change(silent=silent, **changes)
+
+    def _change(self, silent=False, **changes):
+        before = dict(self.state)
+        self.state.update(changes)
+        if silent:
+            return
+        if self.state[FRONTMOST] != before[FRONTMOST]:
+            self.bus.publish(ax_events.APP_ACTIVATED if self.state[FRONTMOST] else ax_events.APP_DEACTIVATED,
+                             kakao_ax.KAKAO_APP_NAMES[0])
+        if self.state[WINDOW] != before[WINDOW]:
+            title = kakao_ax.KAKAO_APP_NAMES[0] if self.state[WINDOW] == MAIN_WINDOW else self.state[WINDOW]
+            self.bus.publish(ax_events.FOCUSED_WINDOW_CHANGED, title)
+
+
+# 전송/친구 추가가 함께 쓰는 KakaoTalk UI 세션 (같은 앱을 조작하므로 하나만 둠)
+UI_SESSION = UISession()
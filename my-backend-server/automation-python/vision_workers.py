@@ -0,0 +1,346 @@
+# flake8: noqa
+
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+# --- 상수 정의 ---
+VISION_WORKER_COUNT = max(1, min(4, (os.cpu_count() or 2) // 2)) # 비전/OCR 워커 프로세스 수
+VISION_TASK_TIMEOUT = 30 # 작업당 최대 대기 시간(초). 초과 시 워커를 강제 종료 후 재시작
+VISION_MAX_TASKS_PER_WORKER = 200 # 워커당 최대 처리 작업 수 (누수 방지를 위해 이후 재시작)
+VISION_ACQUIRE_TIMEOUT = 60 # 유휴 워커를 기다리는 최대 시간(초)
+SHM_MIN_SIZE = 8 * 1024 * 1024 # 워커별 공유 메모리 최소 크기 (8MB)
+SHM_ALIGN = 64 # 프레임 간 바이트 정렬
+WORKER_STOP_TIMEOUT = 3 # 워커 정상 종료 대기 시간(초)
+
+# --- 로깅 설정 ---
+log = logging.getLogger(__name__)
+
+# --- 워커 프로세스 측 ---
+
+# 공유 메모리 블록에 연결합니다 (리소스 트래커 중복 등록 방지).
+def _attach_shared_memory(name):
+    """공유 메모리 블록에 연결합니다. 소유권은 부모 프로세스에 있으므로 추적하지 않습니다."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False) # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+# OCR 작업: 프레임에서 텍스트를 인식합니다.
+def _task_ocr(frames, config="", lang=None):
+    """첫 번째 프레임을 tesseract로 인식해 텍스트를 반환합니다."""
+    import pytesseract
+    kwargs = {"config": config}
+    if lang:
+        kwargs["lang"] = lang
+    return pytesseract.image_to_string(frames[0], **kwargs)
+
+# 템플릿 매칭 작업: 화면 프레임에서 템플릿 최고 점수 위치를 찾습니다.
+def _task_match_template(frames, method=None):
+    """(screen, template) 프레임으로 matchTemplate을 수행해 (최고 점수, (x, y))를 반환합니다."""
+    import cv2
+    screen, template = frames[0], frames[1]
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED if method is None else method)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return float(max_val), (int(max_loc[0]), int(max_loc[1]))
+
+# 워커에서 실행 가능한 작업 목록
+TASKS = {
+    "ocr": _task_ocr,
+    "match_template": _task_match_template,
+}
+
+# 워커 프로세스 메인 루프입니다.
+def _worker_main(conn):
+    """부모로부터 (작업명, 공유 메모리 이름, 프레임 명세, 파라미터)를 받아 처리하고 결과만 돌려보냅니다."""
+    shm = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None: # 종료 신호
+                break
+            task_name, shm_name, specs, params = message
+            try:
+                if shm is None or shm.name != shm_name:
+                    if shm is not None:
+                        shm.close()
+                    shm = _attach_shared_memory(shm_name)
+                # 복사 없이 공유 메모리 위에 numpy 뷰 생성
+                frames = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+                          for offset, shape, dtype in specs]
+                result = TASKS[task_name](frames, **params)
+                del frames # 공유 메모리 버퍼에 대한 참조 해제
+                conn.send(("ok", result))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        if shm is not None:
+            try:
+                shm.close()
+            except BufferError:
+                pass
+
+# --- 부모 프로세스 측 ---
+
+class VisionWorkerError(Exception):
+    """워커가 작업 처리 중 오류를 보고했거나 비정상 종료된 경우 발생합니다."""
+
+
+class _WorkerHandle:
+    """워커 프로세스 하나와 전용 공유 메모리 블록을 관리합니다."""
+
+    def __init__(self, ctx, index):
+        self.ctx = ctx
+        self.index = index
+        self.shm = None
+        self.process = None
+        self.conn = None
+        self.tasks_done = 0
+        self.restarts = 0
+        self.start()
+
+    # 워커 프로세스를 시작합니다.
+    def start(self):
+        """워커 프로세스를 시작합니다."""
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=_worker_main, args=(child_conn,),
+                                        name=f"vision-worker-{self.index}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.tasks_done = 0
+
+    # 필요한 크기 이상의 공유 메모리를 확보합니다.
+    def ensure_capacity(self, nbytes):
+        """필요한 크기 이상의 공유 메모리를 확보합니다. 부족하면 두 배씩 키워 새로 만듭니다."""
+        if self.shm is not None and self.shm.size >= nbytes:
+            return
+        size = max(SHM_MIN_SIZE, nbytes)
+        if self.shm is not None:
+            size = max(size, self.shm.size * 2)
+            self._release_shm()
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+
+    # 공유 메모리를 해제합니다.
+    def _release_shm(self):
+        """공유 메모리를 해제합니다."""
+        if self.shm is None:
+            return
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except Exception as e:
+            log.warning(f"공유 메모리 해제 실패: {e}")
+        self.shm = None
+
+    # 워커 프로세스를 종료합니다.
+    def stop(self, graceful=True):
+        """워커 프로세스를 종료합니다. graceful=False면 즉시 강제 종료합니다."""
+        if self.process is None:
+            return
+        try:
+            if graceful and self.process.is_alive():
+                self.conn.send(None)
+                self.process.join(WORKER_STOP_TIMEOUT)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(WORKER_STOP_TIMEOUT)
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.process = None
+
+    # 워커 프로세스를 재시작합니다.
+    def restart(self, reason, graceful=False):
+        """워커 프로세스를 재시작합니다 (멈춤, 비정상 종료, 작업 수 한도 초과 시)."""
+        log.warning(f"비전 워커 #{self.index} 재시작: {reason}")
+        self.stop(graceful=graceful)
+        self.restarts += 1
+        self.start()
+
+    # 모든 자원을 해제합니다.
+    def close(self):
+        """워커를 종료하고 공유 메모리를 해제합니다."""
+        self.stop()
+        self._release_shm()
+
+
+class VisionWorkerPool:
+    """
+    OpenCV/Tesseract 작업을 별도 프로세스에서 실행하는 워커 풀입니다.
+    프레임은 워커별 공유 메모리에 한 번 복사되고 워커는 복사 없이 numpy 뷰로 읽습니다.
+    멈추거나 죽은 워커는 강제 종료 후 재시작됩니다.
+    """
+
+    def __init__(self, num_workers=VISION_WORKER_COUNT, task_timeout=VISION_TASK_TIMEOUT,
+                 max_tasks_per_worker=VISION_MAX_TASKS_PER_WORKER):
+        self.task_timeout = task_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        # macOS에서 Cocoa/Quartz가 로드된 프로세스는 fork가 안전하지 않으므로 spawn 사용
+        ctx = multiprocessing.get_context("spawn")
+        self._workers = [_WorkerHandle(ctx, i) for i in range(num_workers)]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"tasks": 0, "errors": 0, "timeouts": 0}
+        log.info(f"비전 워커 풀 시작: 워커 {num_workers}개")
+
+    # 작업을 워커에서 실행하고 결과를 반환합니다.
+    def run(self, task_name, frames, timeout=None, **params):
+        """
+        작업을 워커 프로세스에서 실행하고 결과를 반환합니다 (호출 스레드는 결과까지 대기).
+
+        Args:
+            task_name (str): TASKS에 등록된 작업 이름
+            frames (list): numpy 배열 목록 (공유 메모리로 전달)
+            timeout (float): 작업 타임아웃(초). None이면 풀 기본값.
+            **params: 작업 함수에 전달할 추가 파라미터 (작은 값만)
+
+        Raises:
+            TimeoutError: 작업이 타임아웃을 넘긴 경우 (워커는 재시작됨)
+            VisionWorkerError: 워커가 오류를 보고했거나 비정상 종료된 경우
+        """
+        if self._closed:
+            raise VisionWorkerError("비전 워커 풀이 이미 종료되었습니다.")
+        if task_name not in TASKS:
+            raise ValueError(f"알 수 없는 비전 작업: {task_name}")
+        timeout = self.task_timeout if timeout is None else timeout
+
+        try:
+            worker = self._idle.get(timeout=VISION_ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            raise TimeoutError(f"{VISION_ACQUIRE_TIMEOUT}초 내에 유휴 비전 워커를 얻지 못했습니다.")
+        started = time.time()
+        try:
+            specs = self._write_frames(worker, frames)
+            if not worker.process.is_alive():
+                worker.restart("프로세스가 종료되어 있음")
+            worker.conn.send((task_name, worker.shm.name, specs, params))
+            if not worker.conn.poll(timeout):
+                self._count("timeouts")
+                worker.restart(f"작업 '{task_name}' {timeout}초 초과")
+                raise TimeoutError(f"비전 작업 '{task_name}'이(가) {timeout}초 내에 끝나지 않았습니다.")
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                self._count("errors")
+                worker.restart(f"작업 중 비정상 종료: {e}")
+                raise VisionWorkerError(f"비전 워커가 작업 '{task_name}' 중 비정상 종료되었습니다.")
+
+            worker.tasks_done += 1
+            self._count("tasks")
+            if worker.tasks_done >= self.max_tasks_per_worker:
+                worker.restart(f"작업 {worker.tasks_done}건 처리 (주기적 재시작)", graceful=True)
+            if status != "ok":
+                self._count("errors")
+                raise VisionWorkerError(f"비전 작업 '{task_name}' 실패: {payload}")
+            log.debug(f"비전 작업 '{task_name}' 완료 (워커 #{worker.index}, {time.time() - started:.3f}초)")
+            return payload
+        finally:
+            self._idle.put(worker)
+
+    # 프레임들을 워커의 공유 메모리에 기록하고 (offset, shape, dtype) 명세를 반환합니다.
+    def _write_frames(self, worker, frames):
+        """프레임들을 워커의 공유 메모리에 연속으로 기록하고 (offset, shape, dtype) 명세를 반환합니다."""
+        arrays = [np.ascontiguousarray(frame) for frame in frames]
+        layout = []
+        total = 0
+        for array in arrays:
+            layout.append(total)
+            total += -(-array.nbytes // SHM_ALIGN) * SHM_ALIGN
+        worker.ensure_capacity(total)
+        specs = []
+        for offset, array in zip(layout, arrays):
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=worker.shm.buf, offset=offset)
+            np.copyto(view, array)
+            del view
+            specs.append((offset, array.shape, array.dtype.str))
+        return specs
+
+    # 통계 카운터를 증가시킵니다.
+    def _count(self, key):
+        """통계 카운터를 증가시킵니다."""
+        with self._lock:
+            self._stats[key] += 1
+
+    # 풀 상태를 반환합니다.
+    def stats(self):
+        """헬스 체크용 풀 상태(워커 생존 여부, 재시작 수, 처리 통계)를 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = [
+            {"index": w.index, "alive": bool(w.process and w.process.is_alive()),
+             "tasks_done": w.tasks_done, "restarts": w.restarts}
+            for w in self._workers
+        ]
+        stats["idle"] = self._idle.qsize()
+        return stats
+
+    # 모든 워커를 종료합니다.
+    def close(self):
+        """모든 워커를 종료하고 공유 메모리를 해제합니다."""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.close()
+        log.info("비전 워커 풀 종료 완료.")
+
+
+# --- 모듈 수준 API (풀이 없으면 현재 프로세스에서 실행) ---
+_pool = None
+_pool_lock = threading.Lock()
+
+# 전역 비전 워커 풀을 시작합니다.
+def start_pool(**kwargs):
+    """전역 비전 워커 풀을 시작합니다. 이미 실행 중이면 기존 풀을 반환합니다."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = VisionWorkerPool(**kwargs)
+        return _pool
+
+# 전역 비전 워커 풀을 종료합니다.
+def stop_pool():
+    """전역 비전 워커 풀을 종료합니다."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+# 전역 비전 워커 풀을 반환합니다.
+def get_pool():
+    """전역 비전 워커 풀을 반환합니다. 시작되지 않았으면 None."""
+    return _pool
+
+# 작업을 풀(있으면) 또는 현재 프로세스에서 실행합니다.
+def run_task(task_name, frames, **params):
+    """작업을 전역 풀에서 실행합니다. 풀이 없으면 현재 프로세스에서 직접 실행합니다."""
+    pool = _pool
+    if pool is None:
+        return TASKS[task_name]([np.asarray(frame) for frame in frames], **params)
+    return pool.run(task_name, frames, **params)
+
+# 이미지를 OCR로 인식합니다.
+def image_to_string(image, config="", lang=None):
+    """이미지(numpy 배열 또는 PIL Image)를 OCR로 인식해 텍스트를 반환합니다."""
+    return run_task("ocr", [np.asarray(image)], config=config, lang=lang)
+
+# 템플릿 매칭을 수행합니다.
+def match_template(screen, template):
+    """화면과 템플릿(numpy 배열)으로 템플릿 매칭을 수행해 (최고 점수, (x, y))를 반환합니다."""
+    return run_task("match_template", [screen, template])